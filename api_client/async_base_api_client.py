@@ -0,0 +1,83 @@
+import time
+from typing import Any, Mapping, Optional
+
+import httpx
+from tenacity import AsyncRetrying
+
+from .base_api_client import BaseApiClient
+from .dto.api_config import ApiConfig
+from .dto.http_transport import AsyncHttpTransport
+
+
+class AsyncBaseApiClient(BaseApiClient):
+    """
+    Async-вариант BaseApiClient:
+    - httpx.AsyncClient внутри AsyncHttpTransport
+    - retry через tenacity.AsyncRetrying (ожидание без блокировки event loop)
+    - те же ApiConfig, RetryPolicy, AuthStrategy и RateLimitState
+
+    Чтобы сотни одновременных запросов шли через один пул соединений, создайте AsyncHttpTransport
+    один раз и передайте его в transport= всем клиентам. Закрывать общий транспорт — забота владельца.
+    """
+
+    transport: AsyncHttpTransport
+
+    def _create_transport(self, config: ApiConfig, httpx_auth: Optional[Any]) -> AsyncHttpTransport:
+        return AsyncHttpTransport(config=config, auth=httpx_auth)
+
+    def _build_async_retrying(self) -> AsyncRetrying:
+        retrying = self.retry_policy.build_async_retrying()
+        retrying.before = self._before_attempt
+        return retrying
+
+    async def _request(
+            self,
+            method: str,
+            path: str,
+            *,
+            query: Optional[Mapping[str, Any]] = None,
+            json: Any = None,
+            data: Any = None,
+            files: Any = None,
+            extra_headers: Optional[Mapping[str, str]] = None,
+    ) -> httpx.Response:
+        url = self._build_url(path)
+
+        async def send() -> httpx.Response:
+            headers: dict[str, str] = {}
+            if extra_headers:
+                headers.update(extra_headers)
+
+            self.auth_strategy.apply(headers)
+            await self._acquire_rate_limit()
+
+            self.on_before_request(method, url, headers, query, json, data, files)
+
+            start = time.perf_counter()
+            resp = await self.transport.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=query,
+                json=json,
+                data=data,
+                files=files,
+            )
+            elapsed = time.perf_counter() - start
+
+            self.on_after_response(resp, elapsed)
+            if self.rate_limit_feedback is not None:
+                self.rate_limit_feedback.on_response(resp)
+            self._check_response(resp)
+            return resp
+
+        retrying = self._build_async_retrying()
+        return await retrying(send)
+
+    async def _acquire_rate_limit(self) -> None:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(timeout=self.rate_limit_max_wait)
+        self._check_rate_limit_state()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -1,5 +1,6 @@
 import logging
 import time
+from datetime import datetime, timezone
 
 import httpx
 from tenacity import RetryCallState, Retrying
@@ -12,6 +13,8 @@ from .dto.dto import LogLevel
 from .dto.http_transport import HttpTransport
 from .dto.rate_limit_state import RateLimitState
 from .dto.retry_policy import RetryPolicy
+from .rate_limit_feedback import RateLimitFeedback
+from .rate_limiter import RateLimiter
 
 from typing import Any, Optional, Mapping
 
@@ -37,19 +40,29 @@ class BaseApiClient:
             rate_limit_state: Optional[RateLimitState] = None,
             httpx_auth: Optional[Any] = None,  # объект из httpx-auth
             auth_strategy: Optional[AuthStrategy] = None,
+            transport: Optional[HttpTransport] = None,  # общий транспорт (и пул соединений) на несколько клиентов
+            rate_limiter: Optional[RateLimiter] = None,  # ждёт свободный слот вместо RateLimitError
+            rate_limit_max_wait: Optional[float] = None,  # дольше ждать не будем — RateLimitError
+            rate_limit_feedback: Optional[RateLimitFeedback] = None,  # подстройка лимитера по ответам сервера
     ) -> None:
         self.config = config
         self.credentials = credentials
         self.auth_state = auth_state or AuthState()
         self.retry_policy = retry_policy
         self.rate_limit_state = rate_limit_state
-        self.transport = HttpTransport(config=config, auth=httpx_auth)
+        self.rate_limiter = rate_limiter
+        self.rate_limit_max_wait = rate_limit_max_wait
+        self.rate_limit_feedback = rate_limit_feedback
+        self.transport = transport or self._create_transport(config, httpx_auth)
 
         self.auth_strategy = auth_strategy or NoAuthStrategy(self.credentials, self.auth_state)
 
         self.logger = logging.getLogger(self.__class__.__name__)
         self._configure_logger()
 
+    def _create_transport(self, config: ApiConfig, httpx_auth: Optional[Any]) -> HttpTransport:
+        return HttpTransport(config=config, auth=httpx_auth)
+
     def _configure_logger(self) -> None:
         if self.config.log_level == LogLevel.DEBUG:
             self.logger.setLevel(logging.DEBUG)
@@ -62,15 +75,13 @@ class BaseApiClient:
 
     def _build_retrying(self) -> Retrying:
         retrying = self.retry_policy.build_retrying()
-
-        # для логирования попыток tenacity-хуком
-        def before(retry_state: RetryCallState) -> None:
-            if self.logger.isEnabledFor(logging.INFO) and retry_state.attempt_number > 1:
-                self.logger.info("Retry attempt %s", retry_state.attempt_number)
-
-        retrying.before = before
+        retrying.before = self._before_attempt  # для логирования попыток tenacity-хуком
         return retrying
 
+    def _before_attempt(self, retry_state: RetryCallState) -> None:
+        if self.logger.isEnabledFor(logging.INFO) and retry_state.attempt_number > 1:
+            self.logger.info("Retry attempt %s", retry_state.attempt_number)
+
     def _request(
             self,
             method: str,
@@ -107,22 +118,46 @@ class BaseApiClient:
             elapsed = time.perf_counter() - start
 
             self.on_after_response(resp, elapsed)
+            if self.rate_limit_feedback is not None:
+                self.rate_limit_feedback.on_response(resp)
+            self._check_response(resp)
+            return resp
 
-            if self._is_auth_error(resp):
-                if self._handle_auth_error(resp):
-                    raise RetryableError("Auth refreshed, retry", status_code=resp.status_code, response=resp)
-                self._raise_auth_error(resp)
+        retrying = self._build_retrying()
+        return retrying(send)
 
-            if self.retry_policy.is_retry_status(resp.status_code):
-                raise RetryableError(f"Retryable status {resp.status_code}", status_code=resp.status_code,
-                                     response=resp)
 
-            self._raise_for_status(resp)
-            return resp
+    def on_before_request(
+            self,
+            method: str,
+            url: str,
+            headers: dict[str, str],
+            query: Optional[Mapping[str, Any]],
+            json: Any,
+            data: Any,
+            files: Any,
+    ) -> None:
+        """Хук перед отправкой запроса (можно дописать заголовки, залогировать тело и т.п.)."""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s %s params=%s", method, url, query)
 
-        retrying = self._build_retrying()
-        return retrying.call(send)
+    def on_after_response(self, resp: httpx.Response, elapsed: float) -> None:
+        """Хук после получения ответа (до разбора ошибок)."""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s %s -> %s in %.3fs", resp.request.method, resp.url, resp.status_code, elapsed)
+
+    def _check_response(self, resp: httpx.Response) -> None:
+        """Разбор ответа: auth-ошибки, статусы для ретрая, остальные ошибки API."""
+        if self._is_auth_error(resp):
+            if self._handle_auth_error(resp):
+                raise RetryableError("Auth refreshed, retry", status_code=resp.status_code, response=resp)
+            self._raise_auth_error(resp)
 
+        if self.retry_policy.is_retry_status(resp.status_code):
+            raise RetryableError(f"Retryable status {resp.status_code}", status_code=resp.status_code,
+                                 response=resp)
+
+        self._raise_for_status(resp)
 
     def _build_url(self, path: str) -> str:
         # httpx.Client уже знает base_url, поэтому:
@@ -130,11 +165,18 @@ class BaseApiClient:
 
 
     def _check_rate_limit(self) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(timeout=self.rate_limit_max_wait)
+        self._check_rate_limit_state()
+
+    def _check_rate_limit_state(self) -> None:
+        """Старая модель фиксированного окна: не ждёт, а сразу кидает RateLimitError."""
         if not self.rate_limit_state:
             return
-        if not self.rate_limit_state.can_request():
+        now = datetime.now(timezone.utc)
+        if not self.rate_limit_state.can_request(now=now):
             raise RateLimitError("Rate limit exceeded")
-        self.rate_limit_state.register_request()
+        self.rate_limit_state.register_request(now=now)
 
 
     def _is_auth_error(self, resp: httpx.Response) -> bool:
@@ -158,6 +200,15 @@ class BaseApiClient:
         raise ApiError(msg, status_code=resp.status_code, response=resp)
 
 
+    @staticmethod
+    def _truncate_safe_text(resp: httpx.Response, limit: int = 500) -> str:
+        try:
+            text = resp.text
+        except (httpx.ResponseNotRead, UnicodeDecodeError):
+            return "<unreadable body>"
+        return text if len(text) <= limit else f"{text[:limit]}..."
+
+
 """
 import httpx_auth
 
@@ -1,5 +1,5 @@
 from dataclasses import field, dataclass
-from typing import Mapping, Tuple
+from typing import Mapping, Optional, Tuple
 
 from .dto import LogLevel
 
@@ -13,6 +13,12 @@ class ApiConfig:
     default_headers: Mapping[str, str] = field(default_factory=dict)
     verify_ssl: bool = True
     log_level: LogLevel = LogLevel.ERROR
+    # пул соединений (None — без ограничения)
+    max_connections: Optional[int] = 100
+    max_keepalive_connections: Optional[int] = 20
+    keepalive_expiry: Optional[float] = 5.0      # сколько держим простаивающее соединение, сек
+    pool_timeout: Optional[float] = None          # ожидание свободного соединения; None — как read_timeout
+    http2: bool = False                           # требует пакет h2 (pip install httpx[http2])
 
     @property
     def timeout(self) -> Tuple[float, float]:
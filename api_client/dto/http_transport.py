@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from dataclasses import field, dataclass
 from typing import Any, Dict, Iterable, Mapping, Optional
 
@@ -20,17 +21,7 @@ class HttpTransport:
     stats: TransportStats = field(default_factory=TransportStats)
 
     def __post_init__(self) -> None:
-        timeout = httpx.Timeout(
-            self.config.read_timeout,
-            connect=self.config.connect_timeout,
-        )
-        self.client = httpx.Client(
-            base_url=self.config.base_url,
-            timeout=timeout,
-            verify=self.config.verify_ssl,
-            headers=dict(self.config.default_headers),
-            auth=self.auth,
-        )
+        self.client = httpx.Client(**_client_kwargs(self.config, self.auth))
 
     def close(self) -> None:
         self.client.close()
@@ -46,11 +37,10 @@ class HttpTransport:
         data: Any = None,
         files: Any = None,
     ) -> httpx.Response:
-        import time
         merged_headers = dict(self.client.headers)
         if headers:
             merged_headers.update(headers)
-        start = time.perf_counter()
+        pool_timer = _PoolWaitTimer()
         resp = self.client.request(
             method=method,
             url=url,
@@ -59,10 +49,97 @@ class HttpTransport:
             data=data,
             files=files,
             headers=merged_headers,
+            extensions={"trace": pool_timer.trace},
+        )
+        elapsed = time.perf_counter() - pool_timer.start
+        self.stats.record(resp.status_code, elapsed, pool_timer.pool_wait or 0.0,
+                          method=method, path=resp.request.url.path)
+        return resp
+
+
+@dataclass()
+class AsyncHttpTransport:
+    """
+    Обёртка над httpx.AsyncClient — async-аналог HttpTransport.
+    Один экземпляр можно отдать нескольким AsyncBaseApiClient: все запросы пойдут через общий пул соединений.
+    """
+    config: ApiConfig
+    auth: Optional[Any] = None  # сюда попадает любой httpx.Auth
+    client: httpx.AsyncClient = field(init=False)
+    stats: TransportStats = field(default_factory=TransportStats)
+
+    def __post_init__(self) -> None:
+        self.client = httpx.AsyncClient(**_client_kwargs(self.config, self.auth))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+        params: Optional[Mapping[str, Any]] = None,
+        json: Any = None,
+        data: Any = None,
+        files: Any = None,
+    ) -> httpx.Response:
+        pool_timer = _PoolWaitTimer()
+        resp = await self.client.request(
+            method=method,
+            url=url,
+            params=params,
+            json=json,
+            data=data,
+            files=files,
+            headers=headers,  # заголовки по умолчанию httpx добавит сам
+            extensions={"trace": pool_timer.atrace},
         )
-        elapsed = time.perf_counter() - start
-        self.stats.total_requests += 1
-        self.stats.last_status_code = resp.status_code
-        self.stats.latencies.append(elapsed)
+        elapsed = time.perf_counter() - pool_timer.start
+        self.stats.record(resp.status_code, elapsed, pool_timer.pool_wait or 0.0,
+                          method=method, path=resp.request.url.path)
         return resp
 
+
+class _PoolWaitTimer:
+    """Замер ожидания соединения из пула через trace-расширение httpcore.
+
+    Первое trace-событие (connect_tcp для нового соединения или send_request_headers для
+    переиспользованного) приходит сразу после того, как пул выдал соединение.
+    """
+    __slots__ = ("start", "pool_wait")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.pool_wait: Optional[float] = None
+
+    def trace(self, event_name: str, info: Mapping[str, Any]) -> None:
+        if self.pool_wait is None:
+            self.pool_wait = time.perf_counter() - self.start
+
+    async def atrace(self, event_name: str, info: Mapping[str, Any]) -> None:
+        self.trace(event_name, info)
+
+
+def _client_kwargs(config: ApiConfig, auth: Optional[Any]) -> Dict[str, Any]:
+    """Общие параметры httpx.Client/httpx.AsyncClient из ApiConfig."""
+    timeout = httpx.Timeout(
+        config.read_timeout,
+        connect=config.connect_timeout,
+        pool=config.pool_timeout if config.pool_timeout is not None else config.read_timeout,
+    )
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive_connections,
+        keepalive_expiry=config.keepalive_expiry,
+    )
+    return dict(
+        base_url=config.base_url,
+        timeout=timeout,
+        limits=limits,
+        http2=config.http2,
+        verify=config.verify_ssl,
+        headers=dict(config.default_headers),
+        auth=auth,
+    )
@@ -1,29 +1,36 @@
 from __future__ import annotations
 
 from dataclasses import field, dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, Mapping, MutableMapping, Optional, Sequence, Tuple, Type
 
 
 @dataclass()
 class RateLimitState:
-    """Простая модель лимитов за окно времени."""
+    """Простая модель лимитов за окно времени. Время — в UTC; наивный window_start считается UTC."""
     limit_per_window: int
     window_size: timedelta
     window_start: datetime
     used_in_window: int = 0
 
     def can_request(self, *, now: Optional[datetime] = None) -> bool:
-        now = now or datetime.utcnow()
+        now = now or datetime.now(timezone.utc)
         self._maybe_roll_window(now)
         return self.used_in_window < self.limit_per_window
 
     def register_request(self, *, now: Optional[datetime] = None) -> None:
-        now = now or datetime.utcnow()
+        now = now or datetime.now(timezone.utc)
         self._maybe_roll_window(now)
         self.used_in_window += 1
 
     def _maybe_roll_window(self, now: datetime) -> None:
+        if (self.window_start.tzinfo is None) != (now.tzinfo is None):  # старые вызовы с datetime.utcnow()
+            self.window_start = _as_utc(self.window_start)
+            now = _as_utc(now)
         if now - self.window_start >= self.window_size:
             self.window_start = now
             self.used_in_window = 0
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
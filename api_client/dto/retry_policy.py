@@ -3,7 +3,14 @@ from enum import Enum, auto
 from typing import Any, Optional, Sequence, Tuple, Type
 
 import httpx
-from tenacity import Retrying, stop_after_attempt, wait_fixed, wait_exponential, retry_if_exception_type
+from tenacity import (
+    AsyncRetrying, RetryCallState, Retrying, stop_after_attempt, wait_fixed, wait_exponential,
+    retry_if_exception_type,
+)
+from tenacity.wait import wait_base
+
+from ..errors import ApiError, RetryableError
+from ..rate_limit_feedback import parse_retry_after
 
 
 class BackoffStrategy(Enum):
@@ -11,25 +18,56 @@ class BackoffStrategy(Enum):
     EXPONENTIAL = auto()
 
 
+class wait_retry_after(wait_base):
+    """Ожидание tenacity: если сервер прислал Retry-After — ждём столько (не дольше max_wait), иначе fallback."""
+
+    def __init__(self, fallback: wait_base, max_wait: float):
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        fallback = self.fallback(retry_state)
+        outcome = retry_state.outcome
+        exc = outcome.exception() if outcome is not None and outcome.failed else None
+        if isinstance(exc, ApiError) and exc.response is not None:
+            retry_after = parse_retry_after(exc.response)
+            if retry_after is not None:
+                return min(self.max_wait, max(fallback, retry_after))
+        return fallback
+
+
 @dataclass(frozen=True)
 class RetryPolicy:
     max_attempts: int = 3
     backoff_strategy: BackoffStrategy = BackoffStrategy.EXPONENTIAL
     base_delay: float = 0.5
     max_delay: float = 10.0
+    # 429 не повторяем по умолчанию: включается явно, retry_statuses=(429, 500, 502, 503, 504),
+    # и тогда пауза берётся из Retry-After (respect_retry_after)
     retry_statuses: Sequence[int] = field(default_factory=lambda: (500, 502, 503, 504))
     retry_exceptions: Tuple[Type[BaseException], ...] = (
         httpx.ConnectError,
         httpx.ReadTimeout,
         httpx.RemoteProtocolError,
     )
+    respect_retry_after: bool = True  # пауза перед повтором не меньше Retry-After из ответа
+    max_retry_after: float = 60.0     # но не дольше этого, сек
 
     def build_retrying(self) -> Retrying:
+        return Retrying(**self._retrying_kwargs())
+
+    def build_async_retrying(self) -> AsyncRetrying:
+        """То же, что build_retrying, но для async-кода (ожидание через asyncio.sleep)."""
+        return AsyncRetrying(**self._retrying_kwargs())
+
+    def _retrying_kwargs(self) -> dict[str, Any]:
         if self.backoff_strategy == BackoffStrategy.FIXED:
             wait = wait_fixed(self.base_delay)
         else:
             wait = wait_exponential(multiplier=self.base_delay, max=self.max_delay)
-        return Retrying(
+        if self.respect_retry_after:
+            wait = wait_retry_after(wait, self.max_retry_after)
+        return dict(
             stop=stop_after_attempt(self.max_attempts),
             wait=wait,
             retry=retry_if_exception_type(self.retry_exceptions + (RetryableError,)),
@@ -1,16 +1,236 @@
+import math
+import re
+import threading
+import warnings
 from dataclasses import field, dataclass
-from statistics import mean
-from typing import Any, Mapping, Optional
+from typing import Callable, Optional, Sequence
 
-import httpx
+# сегменты пути, которые считаем идентификаторами: числа, UUID, длинные hex-строки
+_ID_SEGMENT_RE = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$"
+)
+
+EndpointKey = tuple[str, str, int]  # (method, path template, status)
+
+
+def path_template(path: str) -> str:
+    """/v1/deals/123/items -> /v1/deals/{id}/items: чтобы разбивка по эндпоинтам не росла от id."""
+    return "/".join("{id}" if _ID_SEGMENT_RE.match(part) else part for part in path.split("/"))
+
+
+class LatencyHistogram:
+    """
+    Гистограмма с логарифмическими корзинами фиксированного размера (как HDR, но проще).
+
+    Корзина i покрывает (min_value * growth**(i-1), min_value * growth**i]; при growth = 2**(1/8)
+    относительная ошибка перцентиля — не больше ~9%. Последняя корзина собирает всё выше max_value,
+    её граница — фактический максимум. Память не зависит от числа замеров.
+    """
+    __slots__ = ("min_value", "growth", "counts", "count", "total", "max")
+
+    def __init__(self, min_value: float = 1e-4, max_value: float = 600.0, growth: float = 2 ** (1 / 8)):
+        self.min_value = min_value
+        self.growth = growth
+        size = int(math.ceil(math.log(max_value / min_value, growth))) + 2
+        self.counts = [0] * size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = min(len(self.counts) - 1, int(math.ceil(math.log(value / self.min_value, self.growth))))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Верхняя граница корзины, в которую попал q-й перцентиль (q от 0 до 100)."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * q / 100)))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(self.max, self.upper_bound(index))
+        return self.max
+
+    def cumulative_counts(self, bounds: Sequence[float]) -> list[int]:
+        """Накопленные счётчики под границы bounds (по возрастанию), как le-корзины Prometheus.
+        Корзина учитывается в границе, если её верхняя граница не больше неё (с точностью до корзины)."""
+        result: list[int] = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            while index < len(self.counts) and self.upper_bound(index) <= bound * (1 + 1e-9):
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def upper_bound(self, index: int) -> float:
+        if index == len(self.counts) - 1:
+            return self.max  # корзина переполнения
+        return self.min_value * self.growth ** index
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def clear(self) -> None:
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram.__new__(LatencyHistogram)
+        clone.min_value, clone.growth = self.min_value, self.growth
+        clone.counts = list(self.counts)
+        clone.count, clone.total, clone.max = self.count, self.total, self.max
+        return clone
+
+
+def _endpoint_histogram() -> LatencyHistogram:
+    return LatencyHistogram(growth=2 ** 0.5)  # грубее общей (~41%), зато ~50 корзин на эндпоинт
+
+
+@dataclass()
+class EndpointStats:
+    count: int = 0
+    latency_total: float = 0.0
+    latency: LatencyHistogram = field(default_factory=_endpoint_histogram)
+
+    @property
+    def avg_latency(self) -> Optional[float]:
+        return self.latency_total / self.count if self.count else None
+
+
+@dataclass(frozen=True)
+class TransportStatsSnapshot:
+    """Неизменяемый срез статистики: можно отдавать в метрики/логи без блокировок."""
+    total_requests: int
+    last_status_code: Optional[int]
+    avg_latency: Optional[float]
+    p50: Optional[float]
+    p95: Optional[float]
+    p99: Optional[float]
+    max_latency: Optional[float]
+    pool_wait_total: float
+    pool_wait_max: float
+    latency: LatencyHistogram
+    by_endpoint: dict[EndpointKey, EndpointStats]
 
 
 @dataclass()
 class TransportStats:
+    """
+    Статистика транспорта с фиксированным расходом памяти.
+    - латентность (время ответа сервера, без ожидания пула) — в LatencyHistogram, есть p50/p95/p99;
+    - счётчики по (method, шаблон пути, статус), не больше max_endpoints ключей, остальное — в ("*", "*", status);
+    - snapshot()/reset() для периодической выгрузки; record() потокобезопасен.
+    """
     total_requests: int = 0
     last_status_code: Optional[int] = None
-    latencies: list[float] = field(default_factory=list)
+    pool_wait_total: float = 0.0
+    pool_wait_max: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    by_endpoint: dict[EndpointKey, EndpointStats] = field(default_factory=dict)
+    max_endpoints: int = 500
+    path_template: Callable[[str], str] = path_template
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     @property
     def avg_latency(self) -> Optional[float]:
-        return mean(self.latencies) if self.latencies else None
+        return self.latency.mean
+
+    @property
+    def latencies(self) -> list[float]:
+        """Устарело: раньше — список всех замеров. Сырых значений больше нет: отдаётся по одному значению
+        на непустую корзину (её верхняя граница), по возрастанию — размер ограничен числом корзин.
+        Используйте percentile()/snapshot()."""
+        warnings.warn("TransportStats.latencies is deprecated, use percentile() or snapshot()",
+                      DeprecationWarning, stacklevel=2)
+        with self._lock:
+            histogram = self.latency
+            return [
+                min(histogram.max, histogram.upper_bound(index))
+                for index, bucket in enumerate(histogram.counts)
+                if bucket
+            ]
+
+    @property
+    def avg_pool_wait(self) -> Optional[float]:
+        return self.pool_wait_total / self.total_requests if self.total_requests else None
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            return self.latency.percentile(q)
+
+    def record(
+            self,
+            status_code: int,
+            elapsed: float,
+            pool_wait: float = 0.0,
+            *,
+            method: Optional[str] = None,
+            path: Optional[str] = None,
+    ) -> None:
+        """Учитывает запрос: elapsed — полное время, pool_wait — его часть на ожидание соединения из пула."""
+        latency = max(0.0, elapsed - pool_wait)
+        key: Optional[EndpointKey] = None
+        if method is not None and path is not None:
+            key = (method.upper(), self.path_template(path), status_code)
+        with self._lock:
+            self.total_requests += 1
+            self.last_status_code = status_code
+            self.latency.record(latency)
+            self.pool_wait_total += pool_wait
+            self.pool_wait_max = max(self.pool_wait_max, pool_wait)
+            if key is not None:
+                endpoint = self.by_endpoint.get(key)
+                if endpoint is None:
+                    if len(self.by_endpoint) >= self.max_endpoints:
+                        key = ("*", "*", status_code)
+                    endpoint = self.by_endpoint.setdefault(key, EndpointStats())
+                endpoint.count += 1
+                endpoint.latency_total += latency
+                endpoint.latency.record(latency)
+
+    def snapshot(self, *, reset: bool = False) -> TransportStatsSnapshot:
+        """Срез статистики; reset=True атомарно обнуляет счётчики (удобно для выгрузки дельт)."""
+        with self._lock:
+            latency = self.latency.copy()
+            snapshot = TransportStatsSnapshot(
+                total_requests=self.total_requests,
+                last_status_code=self.last_status_code,
+                avg_latency=latency.mean,
+                p50=latency.percentile(50),
+                p95=latency.percentile(95),
+                p99=latency.percentile(99),
+                max_latency=latency.max if latency.count else None,
+                pool_wait_total=self.pool_wait_total,
+                pool_wait_max=self.pool_wait_max,
+                latency=latency,
+                by_endpoint={
+                    key: EndpointStats(s.count, s.latency_total, s.latency.copy()) for key, s in self.by_endpoint.items()
+                },
+            )
+            if reset:
+                self._reset_locked()
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self) -> None:
+        self.total_requests = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+        self.latency.clear()
+        self.by_endpoint = {}
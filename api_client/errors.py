@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from typing import Optional
 import logging
 
+import httpx
+
 
 class ApiError(Exception):
     def __init__(self, message: str, *, status_code: Optional[int] = None, response: Optional[httpx.Response] = None):
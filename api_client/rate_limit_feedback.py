@@ -0,0 +1,193 @@
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, Protocol
+
+import httpx
+
+from .rate_limiter import RateLimiter
+
+
+class RateLimitFeedback(Protocol):
+    """Обратная связь от сервера: вызывается на каждый ответ до разбора ошибок."""
+
+    def on_response(self, resp: httpx.Response) -> None:
+        ...
+
+
+@dataclass(frozen=True)
+class RateLimitSignal:
+    """Что сервер сообщил о лимитах в одном ответе."""
+    throttled: bool = False                 # сервер отказал из-за лимита (429, QUERY_LIMIT_EXCEEDED и т.п.)
+    retry_after: Optional[float] = None     # сколько ждать до следующего запроса, сек
+    remaining: Optional[int] = None         # X-RateLimit-Remaining
+    reset_after: Optional[float] = None     # через сколько секунд лимит обновится
+    pressure: bool = False                  # лимит ещё не исчерпан, но близко — притормозить
+    ok: bool = True                         # успешный ответ (2xx): только такие разгоняют скорость
+
+
+def parse_retry_after(resp: httpx.Response, *, now: Optional[float] = None) -> Optional[float]:
+    """Retry-After в секундах: число секунд или HTTP-дата. None — заголовка нет или он битый."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - (time.time() if now is None else now))
+
+
+def _header_number(resp: httpx.Response, *names: str) -> Optional[float]:
+    for name in names:
+        value = resp.headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value.strip())
+        except ValueError:
+            continue
+    return None
+
+
+def _seconds_until(value: Optional[float], now: float) -> Optional[float]:
+    """Reset бывает дельтой в секундах или unix-временем — различаем по величине."""
+    if value is None:
+        return None
+    if value > 1_000_000_000:
+        value -= now
+    return max(0.0, value)
+
+
+class AdaptiveRateLimitFeedback:
+    """
+    Подстраивает RateLimiter под реальный лимит сервера по схеме AIMD:
+    - отказ по лимиту — скорость умножается на decrease_factor, не чаще раза в decrease_cooldown;
+      отказом считается 429, а 503 — только с Retry-After или исчерпанным X-RateLimit-Remaining
+      (голый 503 — сбой сервера, от снижения скорости он не пройдёт);
+    - успешный (2xx) ответ — скорость растёт на increase_step запросов/сек, но не выше max_rate;
+    - Retry-After и исчерпанный X-RateLimit-Remaining откладывают все следующие запросы лимитера.
+
+    Разбор ответа вынесен в parse(): наследники добавляют свои сигналы (см. BitrixRateLimitFeedback).
+    """
+
+    throttle_statuses: tuple[int, ...] = (429,)
+    signalled_throttle_statuses: tuple[int, ...] = (503,)  # отказ по лимиту, только если есть заголовки лимита
+
+    def __init__(
+            self,
+            limiter: RateLimiter,
+            *,
+            min_rate: float = 0.1,
+            max_rate: Optional[float] = None,      # None — не разгоняемся выше стартовой скорости
+            increase_step: float = 0.05,
+            decrease_factor: float = 0.5,
+            decrease_cooldown: float = 1.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be in (0, 1)")
+        self.limiter = limiter
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else limiter.rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_decrease: Optional[float] = None
+
+    def on_response(self, resp: httpx.Response) -> None:
+        self.apply(self.parse(resp))
+
+    def parse(self, resp: httpx.Response) -> RateLimitSignal:
+        now = time.time()
+        remaining = _header_number(resp, "X-RateLimit-Remaining", "RateLimit-Remaining")
+        reset_after = _seconds_until(_header_number(resp, "X-RateLimit-Reset", "RateLimit-Reset"), now)
+        retry_after = parse_retry_after(resp, now=now)
+        exhausted = remaining is not None and remaining <= 0
+        throttled = resp.status_code in self.throttle_statuses or (
+            resp.status_code in self.signalled_throttle_statuses and (retry_after is not None or exhausted))
+        return RateLimitSignal(
+            throttled=throttled,
+            retry_after=retry_after,
+            remaining=int(remaining) if remaining is not None else None,
+            reset_after=reset_after,
+            ok=200 <= resp.status_code < 300,
+        )
+
+    def apply(self, signal: RateLimitSignal) -> None:
+        if signal.retry_after:
+            self.limiter.delay_until(signal.retry_after)
+        elif signal.remaining is not None and signal.remaining <= 0 and signal.reset_after:
+            self.limiter.delay_until(signal.reset_after)
+
+        with self._lock:
+            rate = self.limiter.rate
+            if signal.throttled or signal.pressure:
+                now = self._clock()
+                if self._last_decrease is not None and now - self._last_decrease < self.decrease_cooldown:
+                    return  # пачка одновременных отказов — это один сигнал, а не несколько
+                self._last_decrease = now
+                self.limiter.set_rate(max(self.min_rate, rate * self.decrease_factor))
+            elif signal.ok and rate < self.max_rate:
+                self.limiter.set_rate(min(self.max_rate, rate + self.increase_step))
+
+
+class BitrixRateLimitFeedback(AdaptiveRateLimitFeedback):
+    """
+    Bitrix24 REST: кроме HTTP-статусов смотрит в тело ответа.
+    - error=QUERY_LIMIT_EXCEEDED — отказ по частоте запросов;
+    - time.operating — сколько секунд метод уже «отработал» в текущем окне; при приближении
+      к operating_limit притормаживаем, а при исчерпании ждём до time.operating_reset_at.
+    """
+
+    throttle_errors: tuple[str, ...] = ("QUERY_LIMIT_EXCEEDED", "OPERATION_TIME_LIMIT")
+
+    def __init__(self, limiter: RateLimiter, *, operating_limit: float = 480.0,
+                 operating_pressure: float = 0.8, **options: Any):
+        super().__init__(limiter, **options)
+        self.operating_limit = operating_limit
+        self.operating_pressure = operating_pressure
+
+    def parse(self, resp: httpx.Response) -> RateLimitSignal:
+        signal = super().parse(resp)
+        body = self._json_body(resp)
+        if not isinstance(body, dict):
+            return signal
+
+        throttled = signal.throttled or body.get("error") in self.throttle_errors
+        retry_after = signal.retry_after
+        pressure = False
+        timing = body.get("time")
+        if isinstance(timing, dict) and isinstance(timing.get("operating"), (int, float)):
+            operating = float(timing["operating"])
+            pressure = operating >= self.operating_limit * self.operating_pressure
+            reset_at = timing.get("operating_reset_at")
+            if operating >= self.operating_limit and isinstance(reset_at, (int, float)):
+                retry_after = max(retry_after or 0.0, _seconds_until(float(reset_at), time.time()))
+        return RateLimitSignal(
+            throttled=throttled,
+            retry_after=retry_after,
+            remaining=signal.remaining,
+            reset_after=signal.reset_after,
+            pressure=pressure,
+            ok=signal.ok and not throttled,
+        )
+
+    @staticmethod
+    def _json_body(resp: httpx.Response) -> Any:
+        if "json" not in resp.headers.get("Content-Type", ""):
+            return None
+        try:
+            return resp.json()
+        except (ValueError, httpx.ResponseNotRead, UnicodeDecodeError):
+            return None
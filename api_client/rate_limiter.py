@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .errors import RateLimitError
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов: token bucket (rate в секунду, всплеск до burst)
+    плюс необязательное скользящее окно (не больше window_limit запросов за window_size секунд).
+
+    - считает по монотонным часам, не зависит от перевода системного времени;
+    - не отказывает, а ждёт: acquire() блокирует поток, acquire_async() — await;
+    - потокобезопасен: один экземпляр можно отдать нескольким клиентам в процессе.
+
+    Реализован как GCRA с резервированием: каждый вызов сразу получает свой момент старта,
+    поэтому ждущие не толкаются и обслуживаются по очереди.
+
+    Пример для Bitrix24: RateLimiter(rate=2, burst=50).
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: int = 1,
+            *,
+            window_limit: Optional[int] = None,
+            window_size: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if (window_limit is None) != (window_size is None):
+            raise ValueError("window_limit and window_size must be set together")
+        self.burst = max(1, burst)
+        self.window_limit = window_limit
+        self.window_size = window_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._interval = 1.0 / rate
+        self._tat = clock()  # theoretical arrival time следующего запроса
+        self._window: deque[float] = deque()
+
+    @property
+    def rate(self) -> float:
+        return 1.0 / self._interval
+
+    def set_rate(self, rate: float) -> None:
+        """Меняет скорость на лету (используется адаптивным ограничением)."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._interval = 1.0 / rate
+
+    @property
+    def tokens(self) -> float:
+        """Сколько запросов можно сделать прямо сейчас без ожидания (по token bucket)."""
+        with self._lock:
+            available = (self._clock() - self._tat) / self._interval + self.burst
+        return min(float(self.burst), max(0.0, available))
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Ждёт разрешения на запрос; если ждать дольше timeout — RateLimitError без резервирования."""
+        delay = self._reserve(timeout)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> None:
+        delay = self._reserve(timeout)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def delay_until(self, seconds: float) -> None:
+        """Откладывает все следующие запросы минимум на seconds (например, по Retry-After)."""
+        with self._lock:
+            not_before = self._clock() + seconds
+            tolerance = (self.burst - 1) * self._interval
+            self._tat = max(self._tat, not_before + tolerance)
+
+    def _reserve(self, timeout: Optional[float]) -> float:
+        with self._lock:
+            now = self._clock()
+            tolerance = (self.burst - 1) * self._interval
+            start = max(now, self._tat - tolerance)
+            if self.window_limit is not None and len(self._window) >= self.window_limit:
+                start = max(start, self._window[0] + self.window_size)
+            delay = start - now
+            if timeout is not None and delay > timeout:
+                raise RateLimitError(f"Rate limit wait {delay:.2f}s exceeds timeout {timeout:.2f}s")
+
+            self._tat = max(self._tat, start) + self._interval
+            if self.window_limit is not None:
+                self._window.append(start)
+                while len(self._window) > self.window_limit:
+                    self._window.popleft()
+            return delay
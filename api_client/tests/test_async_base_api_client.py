@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+import httpx
+
+from sync_utils.api_client.async_base_api_client import AsyncBaseApiClient
+from sync_utils.api_client.auth_strategy import AuthStrategy
+from sync_utils.api_client.dto.api_config import ApiConfig
+from sync_utils.api_client.dto.credentials import Credentials
+from sync_utils.api_client.dto.http_transport import AsyncHttpTransport
+from sync_utils.api_client.dto.retry_policy import BackoffStrategy, RetryPolicy
+from sync_utils.api_client.errors import ApiError, AuthError
+
+CONFIG = ApiConfig(base_url="https://api.example.com", default_headers={"User-Agent": "test"})
+NO_WAIT = RetryPolicy(max_attempts=3, backoff_strategy=BackoffStrategy.FIXED, base_delay=0)
+
+
+class Responses:
+    """Обработчик httpx.MockTransport: отдаёт статусы по очереди и запоминает запросы."""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return httpx.Response(status, json={"status": status})
+
+
+def mock_transport(handler: Responses) -> AsyncHttpTransport:
+    transport = AsyncHttpTransport(config=CONFIG)
+    transport.client = httpx.AsyncClient(
+        base_url=CONFIG.base_url, headers=dict(CONFIG.default_headers), transport=httpx.MockTransport(handler))
+    return transport
+
+
+def make_client(handler: Responses, **kwargs) -> AsyncBaseApiClient:
+    kwargs.setdefault("transport", mock_transport(handler))
+    return AsyncBaseApiClient(config=CONFIG, credentials=Credentials(), retry_policy=NO_WAIT, **kwargs)
+
+
+class RefreshingAuth(AuthStrategy):
+    def apply(self, headers):
+        headers["Authorization"] = f"Bearer {self.auth_state.access_token}"
+
+    def handle_unauthorized(self, response):
+        if self.auth_state.access_token == "fresh":
+            return False
+        self.auth_state.access_token = "fresh"
+        return True
+
+
+class AsyncBaseApiClientTest(unittest.TestCase):
+    def test_retries_retryable_status(self):
+        handler = Responses(503, 502, 200)
+
+        resp = asyncio.run(make_client(handler)._request("GET", "/v1/items", query={"page": 2}))
+
+        self.assertEqual(resp.json(), {"status": 200})
+        self.assertEqual(len(handler.requests), 3)
+        self.assertEqual(str(handler.requests[0].url), "https://api.example.com/v1/items?page=2")
+        self.assertEqual(handler.requests[0].headers["User-Agent"], "test")
+
+    def test_gives_up_after_max_attempts(self):
+        handler = Responses(503)
+
+        with self.assertRaises(ApiError) as ctx:
+            asyncio.run(make_client(handler)._request("GET", "/v1/items"))
+
+        self.assertEqual(ctx.exception.status_code, 503)
+        self.assertEqual(len(handler.requests), 3)
+
+    def test_client_error_is_not_retried(self):
+        handler = Responses(404)
+
+        with self.assertRaises(ApiError) as ctx:
+            asyncio.run(make_client(handler)._request("GET", "/v1/items/1"))
+
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertIn('"status":404', str(ctx.exception).replace(" ", ""))
+        self.assertEqual(len(handler.requests), 1)
+
+    def test_auth_error_after_refresh_fails(self):
+        handler = Responses(401)
+        client = make_client(handler)
+        client.auth_strategy = RefreshingAuth(client.credentials, client.auth_state)
+
+        with self.assertRaises(AuthError):
+            asyncio.run(client._request("GET", "/v1/me"))
+
+        self.assertEqual([r.headers["Authorization"] for r in handler.requests], ["Bearer None", "Bearer fresh"])
+
+    def test_records_transport_stats(self):
+        handler = Responses(200)
+        client = make_client(handler)
+
+        asyncio.run(client._request("POST", "/v1/items/42", json={"a": 1}))
+
+        snapshot = client.transport.stats.snapshot()
+        self.assertEqual(snapshot.total_requests, 1)
+        self.assertEqual(list(snapshot.by_endpoint), [("POST", "/v1/items/{id}", 200)])
+
+    def test_aclose_closes_client(self):
+        client = make_client(Responses(200))
+
+        asyncio.run(client.aclose())
+
+        self.assertTrue(client.transport.client.is_closed)
+
+    def test_clients_share_transport(self):
+        handler = Responses(200)
+        transport = mock_transport(handler)
+        first, second = make_client(handler, transport=transport), make_client(handler, transport=transport)
+
+        async def _run():
+            await asyncio.gather(first._request("GET", "/a"), second._request("GET", "/b"))
+
+        asyncio.run(_run())
+
+        self.assertIs(first.transport, second.transport)
+        self.assertEqual(transport.stats.total_requests, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from sync_utils.api_client.dto.api_config import ApiConfig
+from sync_utils.api_client.dto.http_transport import AsyncHttpTransport, HttpTransport, _PoolWaitTimer
+
+SERVER_DELAY = 0.2
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(SERVER_DELAY)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        return None
+
+
+class HttpTransportConfigTest(unittest.TestCase):
+    def test_pool_limits_keepalive_and_http2_reach_httpx(self):
+        config = ApiConfig(base_url="https://api.example.com", max_connections=7, max_keepalive_connections=3,
+                           keepalive_expiry=11.0, pool_timeout=2.0, http2=True)
+
+        for transport in (HttpTransport(config=config), AsyncHttpTransport(config=config)):
+            pool = transport.client._transport._pool
+            self.assertEqual(
+                (pool._max_connections, pool._max_keepalive_connections, pool._keepalive_expiry, pool._http2),
+                (7, 3, 11.0, True))
+            self.assertEqual(transport.client.timeout, httpx.Timeout(30.0, connect=5.0, pool=2.0))
+
+    def test_pool_timeout_defaults_to_read_timeout(self):
+        transport = HttpTransport(config=ApiConfig(base_url="https://api.example.com", read_timeout=12.0))
+
+        self.assertEqual(transport.client.timeout.pool, 12.0)
+
+
+class PoolWaitTimerTest(unittest.TestCase):
+    def test_first_trace_event_ends_pool_wait(self):
+        timer = _PoolWaitTimer()
+        time.sleep(0.02)
+        timer.trace("connection.connect_tcp.started", {})
+        first = timer.pool_wait
+        time.sleep(0.02)
+        timer.trace("http11.send_request_headers.started", {})
+
+        self.assertGreaterEqual(first, 0.02)
+        self.assertEqual(timer.pool_wait, first)
+
+
+class PoolWaitIntegrationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_wait_for_single_connection_is_measured_separately(self):
+        transport = AsyncHttpTransport(config=ApiConfig(base_url=self.base_url, max_connections=1))
+
+        async def _run():
+            try:
+                await asyncio.gather(transport.request("GET", "/a"), transport.request("GET", "/b"))
+            finally:
+                await transport.aclose()
+
+        asyncio.run(_run())
+
+        stats = transport.stats.snapshot()
+        self.assertEqual(stats.total_requests, 2)
+        self.assertGreaterEqual(stats.pool_wait_max, SERVER_DELAY * 0.8)  # второй ждал, пока первый освободит пул
+        self.assertLess(stats.max_latency, SERVER_DELAY * 1.8)  # и это ожидание не попало в латентность
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import httpx
+from tenacity import RetryCallState
+
+from sync_utils.api_client.dto.retry_policy import RetryPolicy, wait_retry_after
+from sync_utils.api_client.errors import RetryableError
+from sync_utils.api_client.rate_limit_feedback import (
+    AdaptiveRateLimitFeedback, BitrixRateLimitFeedback, parse_retry_after,
+)
+from sync_utils.api_client.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(status: int, headers=None, json=None) -> httpx.Response:
+    return httpx.Response(status, headers=headers, json=json, request=httpx.Request("GET", "https://api.example.com/"))
+
+
+class AdaptiveRateLimitFeedbackTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=8, burst=1, clock=self.clock)
+        self.limiter.delay_until = mock.Mock(wraps=self.limiter.delay_until)
+        self.feedback = AdaptiveRateLimitFeedback(
+            self.limiter, min_rate=1, max_rate=10, increase_step=0.5, decrease_cooldown=1.0, clock=self.clock)
+
+    def test_429_halves_rate_once_per_cooldown(self):
+        self.feedback.on_response(response(429))
+        self.feedback.on_response(response(429))  # та же пачка отказов
+        self.assertEqual(self.limiter.rate, 4)
+
+        self.clock.now = 1.5
+        self.feedback.on_response(response(429))
+        self.assertEqual(self.limiter.rate, 2)
+
+    def test_rate_never_drops_below_min_rate(self):
+        for step in range(5):
+            self.clock.now = step * 2.0
+            self.feedback.on_response(response(429))
+
+        self.assertEqual(self.limiter.rate, 1)
+
+    def test_success_increases_rate_up_to_max_rate(self):
+        for _ in range(10):
+            self.feedback.on_response(response(200))
+
+        self.assertEqual(self.limiter.rate, 10)
+
+    def test_bare_503_is_not_a_rate_limit(self):
+        self.feedback.on_response(response(503))  # и не повод разгоняться
+
+        self.assertEqual(self.limiter.rate, 8)
+        self.limiter.delay_until.assert_not_called()
+
+    def test_503_with_retry_after_backs_off_and_delays(self):
+        self.feedback.on_response(response(503, headers={"Retry-After": "7"}))
+
+        self.assertEqual(self.limiter.rate, 4)
+        self.limiter.delay_until.assert_called_once_with(7.0)
+
+    def test_exhausted_remaining_waits_for_reset(self):
+        self.feedback.on_response(response(200, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "12"}))
+
+        self.limiter.delay_until.assert_called_once_with(12.0)
+
+    def test_parse_retry_after_http_date(self):
+        resp = response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:30 GMT"})
+
+        self.assertEqual(parse_retry_after(resp, now=1445412500.0), 10.0)
+        self.assertIsNone(parse_retry_after(response(429, headers={"Retry-After": "soon"})))
+
+
+class BitrixRateLimitFeedbackTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=2, burst=50, clock=self.clock)
+        self.feedback = BitrixRateLimitFeedback(self.limiter, operating_limit=100, clock=self.clock)
+
+    def test_query_limit_exceeded_in_body_backs_off(self):
+        self.feedback.on_response(response(503, json={"error": "QUERY_LIMIT_EXCEEDED"}))
+
+        self.assertEqual(self.limiter.rate, 1)
+
+    def test_limit_error_in_200_body_backs_off(self):
+        self.limiter.set_rate(1)
+
+        self.feedback.on_response(response(200, json={"error": "QUERY_LIMIT_EXCEEDED"}))
+
+        self.assertEqual(self.limiter.rate, 0.5)
+
+    def test_operating_time_pressure_slows_down(self):
+        signal = self.feedback.parse(response(200, json={"result": [], "time": {"operating": 85}}))
+
+        self.assertTrue(signal.pressure)
+        self.assertFalse(signal.throttled)
+
+    def test_exhausted_operating_time_waits_for_reset(self):
+        with mock.patch("sync_utils.api_client.rate_limit_feedback.time.time", return_value=1_700_000_000.0):
+            signal = self.feedback.parse(response(
+                200, json={"result": [], "time": {"operating": 120, "operating_reset_at": 1_700_000_030}}))
+
+        self.assertEqual(signal.retry_after, 30.0)
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_429_is_opt_in(self):
+        self.assertFalse(RetryPolicy().is_retry_status(429))
+        self.assertTrue(RetryPolicy(retry_statuses=(429, 503)).is_retry_status(429))
+
+    def test_wait_respects_retry_after_with_cap(self):
+        wait = wait_retry_after(lambda state: 0.5, max_wait=60.0)
+
+        def state_for(resp):
+            retry_state = RetryCallState(retry_object=None, fn=None, args=(), kwargs={})
+            retry_state.set_exception((RetryableError, RetryableError("busy", response=resp), None))
+            return retry_state
+
+        self.assertEqual(wait(state_for(response(429, headers={"Retry-After": "3"}))), 3.0)
+        self.assertEqual(wait(state_for(response(429, headers={"Retry-After": "600"}))), 60.0)
+        self.assertEqual(wait(state_for(response(503))), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
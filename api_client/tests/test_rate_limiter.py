@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import httpx
+
+from sync_utils.api_client import rate_limiter
+from sync_utils.api_client.base_api_client import BaseApiClient
+from sync_utils.api_client.dto.api_config import ApiConfig
+from sync_utils.api_client.dto.credentials import Credentials
+from sync_utils.api_client.dto.http_transport import HttpTransport
+from sync_utils.api_client.dto.rate_limit_state import RateLimitState
+from sync_utils.api_client.dto.retry_policy import RetryPolicy
+from sync_utils.api_client.errors import RateLimitError
+from sync_utils.api_client.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Часы, которые двигает только sleep: как будто поток действительно проспал delay."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(round(delay, 6))
+        self.now += delay
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(rate_limiter.time, "sleep", self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_passes_without_waiting(self):
+        limiter = RateLimiter(rate=2, burst=5, clock=self.clock)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(limiter.tokens, 0.0)
+
+    def test_steady_state_spacing_after_burst(self):
+        limiter = RateLimiter(rate=4, burst=2, clock=self.clock)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [0.25, 0.25, 0.25])
+
+    def test_idle_time_refills_up_to_burst(self):
+        limiter = RateLimiter(rate=1, burst=3, clock=self.clock)
+        for _ in range(3):
+            limiter.acquire()
+
+        self.clock.now += 60
+
+        self.assertEqual(limiter.tokens, 3.0)
+
+    def test_wait_longer_than_max_wait_raises_without_reserving(self):
+        limiter = RateLimiter(rate=1, burst=1, clock=self.clock)
+        limiter.acquire()
+
+        with self.assertRaises(RateLimitError):
+            limiter.acquire(timeout=0.5)
+        limiter.acquire(timeout=1.0)  # отказ выше не занял слот: ждём ровно один интервал
+
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+    def test_sliding_window(self):
+        limiter = RateLimiter(rate=100, burst=100, window_limit=3, window_size=10, clock=self.clock)
+
+        for _ in range(4):
+            limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [10.0])
+
+    def test_async_acquire_waits_with_asyncio_sleep(self):
+        limiter = RateLimiter(rate=2, burst=1, clock=self.clock)
+        sleeps: list[float] = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+
+        async def _run():
+            with mock.patch.object(rate_limiter.asyncio, "sleep", fake_sleep):
+                await limiter.acquire_async()
+                await limiter.acquire_async()
+
+        asyncio.run(_run())
+
+        self.assertEqual(sleeps, [0.5])
+
+    def test_delay_until_pushes_back_next_request(self):
+        limiter = RateLimiter(rate=10, burst=5, clock=self.clock)
+
+        limiter.delay_until(3.0)
+        limiter.acquire()
+
+        self.assertEqual(self.clock.sleeps, [3.0])
+
+    def test_client_raises_when_wait_exceeds_rate_limit_max_wait(self):
+        sent: list[httpx.Request] = []
+        config = ApiConfig(base_url="https://api.example.com")
+        transport = HttpTransport(config=config)
+        transport.client = httpx.Client(
+            base_url=config.base_url, transport=httpx.MockTransport(lambda r: sent.append(r) or httpx.Response(200)))
+        client = BaseApiClient(config, Credentials(), RetryPolicy(), transport=transport,
+                               rate_limiter=RateLimiter(rate=1, burst=1, clock=self.clock), rate_limit_max_wait=0.5)
+
+        client._request("GET", "/a")
+        with self.assertRaises(RateLimitError):
+            client._request("GET", "/b")
+
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(self.clock.sleeps, [])
+
+
+    def test_fixed_window_state_uses_aware_utc_and_accepts_naive_start(self):
+        config = ApiConfig(base_url="https://api.example.com")
+        transport = HttpTransport(config=config)
+        transport.client = httpx.Client(
+            base_url=config.base_url, transport=httpx.MockTransport(lambda r: httpx.Response(200)))
+        start = datetime(2024, 1, 1, 12, 0)  # наивный, как раньше из datetime.utcnow()
+        state = RateLimitState(limit_per_window=1, window_size=timedelta(seconds=60), window_start=start)
+        client = BaseApiClient(config, Credentials(), RetryPolicy(), transport=transport, rate_limit_state=state)
+        now = [start.replace(tzinfo=timezone.utc) + timedelta(seconds=1)]
+
+        with mock.patch("sync_utils.api_client.base_api_client.datetime") as fake_datetime:
+            fake_datetime.now.side_effect = lambda tz=None: now[0]
+            client._request("GET", "/a")
+            with self.assertRaises(RateLimitError):
+                client._request("GET", "/b")
+            now[0] += timedelta(seconds=60)
+            client._request("GET", "/c")
+
+        fake_datetime.now.assert_called_with(timezone.utc)
+        self.assertEqual((state.window_start, state.used_in_window), (now[0], 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import unittest
+
+from sync_utils.api_client.dto.transport_stats import LatencyHistogram, TransportStats, path_template
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        for q, exact in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            value = histogram.percentile(q)
+            self.assertGreaterEqual(value, exact)
+            self.assertLessEqual(value, exact * 1.1)  # верхняя граница корзины, ошибка ~9%
+        self.assertEqual(histogram.percentile(100), 1.0)  # не выше реального максимума
+        self.assertAlmostEqual(histogram.mean, 0.5005)
+
+    def test_extremes_go_to_edge_buckets(self):
+        histogram = LatencyHistogram(min_value=0.001, max_value=1.0)
+        histogram.record(0.0)
+        histogram.record(5000.0)
+
+        self.assertEqual((histogram.counts[0], histogram.counts[-1]), (1, 1))
+        self.assertEqual(histogram.percentile(100), 5000.0)
+        self.assertEqual(histogram.cumulative_counts([2.0, 10000.0]), [1, 2])  # переполнение не попадает в le=2
+
+    def test_cumulative_counts(self):
+        histogram = LatencyHistogram()
+        for value in (0.01, 0.02, 0.2, 2.0):
+            histogram.record(value)
+
+        self.assertEqual(histogram.cumulative_counts([0.05, 0.5, 10.0]), [2, 3, 4])
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+
+        self.assertIsNone(histogram.percentile(50))
+        self.assertIsNone(histogram.mean)
+
+
+class TransportStatsTest(unittest.TestCase):
+    def test_latency_excludes_pool_wait(self):
+        stats = TransportStats()
+
+        stats.record(200, 1.5, pool_wait=1.0)
+
+        self.assertAlmostEqual(stats.avg_latency, 0.5)
+        self.assertEqual((stats.pool_wait_total, stats.pool_wait_max, stats.avg_pool_wait), (1.0, 1.0, 1.0))
+
+    def test_snapshot_reset_returns_delta(self):
+        stats = TransportStats()
+        stats.record(200, 0.1, method="get", path="/v1/deals/1")
+        stats.record(500, 0.3, method="get", path="/v1/deals/2")
+
+        first = stats.snapshot(reset=True)
+        stats.record(200, 0.2, method="get", path="/v1/deals/3")
+        second = stats.snapshot()
+
+        self.assertEqual(first.total_requests, 2)
+        self.assertEqual(first.by_endpoint[("GET", "/v1/deals/{id}", 500)].count, 1)
+        self.assertEqual(first.latency.count, 2)  # срез не меняется после reset
+        self.assertEqual(second.total_requests, 1)
+        self.assertEqual(list(second.by_endpoint), [("GET", "/v1/deals/{id}", 200)])
+        self.assertEqual(second.last_status_code, 200)
+
+    def test_endpoints_over_max_go_to_overflow_key(self):
+        stats = TransportStats(max_endpoints=2)
+
+        for path in ("/a", "/b", "/c", "/d"):
+            stats.record(200, 0.1, method="GET", path=path)
+        stats.record(200, 0.1, method="GET", path="/a")
+
+        self.assertEqual(stats.by_endpoint[("GET", "/a", 200)].count, 2)
+        self.assertEqual(stats.by_endpoint[("*", "*", 200)].count, 2)
+        self.assertEqual(len(stats.by_endpoint), 3)
+
+    def test_path_template_collapses_ids(self):
+        self.assertEqual(
+            path_template("/v1/deals/123/items/550e8400-e29b-41d4-a716-446655440000/0123456789abcdef0"),
+            "/v1/deals/{id}/items/{id}/{id}")
+        self.assertEqual(path_template("/v1/crm.deal.list"), "/v1/crm.deal.list")
+
+    def test_latencies_compatibility(self):
+        stats = TransportStats()
+        for _ in range(1000):
+            stats.record(200, 0.1)
+        stats.record(200, 0.2)
+
+        with self.assertWarns(DeprecationWarning):
+            latencies = stats.latencies
+
+        self.assertEqual(len(latencies), 2)  # по значению на корзину, а не на запрос
+        self.assertLessEqual(abs(latencies[0] - 0.1), 0.01)
+        self.assertEqual(latencies[1], 0.2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+from .collectors import ApiClientCollector
+from .exposition import CONTENT_TYPE_OPENMETRICS, CONTENT_TYPE_TEXT, generate_text, write_textfile
+from .registry import REGISTRY, Counter, Gauge, Histogram, MetricFamily, Registry, Sample
+from .sync import SyncMetrics
+
+__all__ = [
+    "ApiClientCollector",
+    "CONTENT_TYPE_OPENMETRICS",
+    "CONTENT_TYPE_TEXT",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricFamily",
+    "REGISTRY",
+    "Registry",
+    "Sample",
+    "SyncMetrics",
+    "generate_text",
+    "write_textfile",
+]
@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Optional, Sequence
+
+from .registry import DEFAULT_LATENCY_BUCKETS, MetricFamily, Registry, Sample, get_registry, histogram_samples
+
+
+class ApiClientCollector:
+    """
+    Выгрузка метрик API-клиентов при сборе: TransportStats.snapshot() и состояние RateLimiter
+    читаются только в момент экспозиции, в запросах ничего дополнительно не считается.
+
+    Клиенты с общим транспортом делят и статистику — регистрируйте такой транспорт один раз.
+    Не вызывайте TransportStats.snapshot(reset=True) у зарегистрированных клиентов: счётчики
+    Prometheus должны только расти.
+    """
+
+    def __init__(self, *, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, registry: Optional[Registry] = None):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stats: dict[str, Any] = {}
+        self._limiters: dict[str, Any] = {}
+        get_registry(registry).register_collector(self)
+
+    def add_client(self, name: str, client: Any) -> None:
+        """Клиент BaseApiClient/AsyncBaseApiClient: берёт client.transport.stats и client.rate_limiter."""
+        self.add_stats(name, client.transport.stats)
+        limiter = getattr(client, "rate_limiter", None)
+        if limiter is not None:
+            self.add_rate_limiter(name, limiter)
+
+    def add_stats(self, name: str, stats: Any) -> None:
+        with self._lock:
+            self._stats[name] = stats
+
+    def add_rate_limiter(self, name: str, limiter: Any) -> None:
+        with self._lock:
+            self._limiters[name] = limiter
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._stats.pop(name, None)
+            self._limiters.pop(name, None)
+
+    def __call__(self) -> list[MetricFamily]:
+        with self._lock:
+            stats_items, limiter_items = list(self._stats.items()), list(self._limiters.items())
+
+        requests = MetricFamily("api_client_requests", "counter", "HTTP requests by endpoint and status")
+        duration = MetricFamily(
+            "api_client_request_duration_seconds", "histogram", "HTTP response time without pool wait")
+        pool_wait = MetricFamily("api_client_pool_wait_seconds", "counter", "Time spent waiting for a pooled connection")
+        for client, stats in stats_items:
+            snapshot = stats.snapshot()
+            pool_wait.samples.append(Sample("_total", {"client": client}, snapshot.pool_wait_total))
+            for (method, path, status), endpoint in sorted(snapshot.by_endpoint.items()):
+                labels = {"client": client, "method": method, "path": path, "status": str(status)}
+                requests.samples.append(Sample("_total", labels, endpoint.count))
+                cumulative = endpoint.latency.cumulative_counts(self.buckets) + [endpoint.count]
+                duration.samples.extend(histogram_samples(labels, self.buckets, cumulative, endpoint.latency_total))
+
+        tokens = MetricFamily("api_client_rate_limit_tokens", "gauge", "Requests available right now without waiting")
+        rate = MetricFamily("api_client_rate_limit_rate", "gauge", "Current rate limit, requests per second")
+        for client, limiter in limiter_items:
+            tokens.samples.append(Sample("", {"client": client}, limiter.tokens))
+            rate.samples.append(Sample("", {"client": client}, limiter.rate))
+        return [requests, duration, pool_wait, tokens, rate]
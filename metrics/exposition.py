@@ -0,0 +1,62 @@
+import os
+import tempfile
+from typing import Optional
+
+from .registry import MetricFamily, Registry, format_value, get_registry
+
+CONTENT_TYPE_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+CONTENT_TYPE_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_family(family: MetricFamily, openmetrics: bool) -> list[str]:
+    # в text 0.0.4 имя счётчика в TYPE/HELP — вместе с _total, в OpenMetrics — без
+    header_name = family.name if openmetrics or family.type != "counter" else f"{family.name}_total"
+    lines = [
+        f"# HELP {header_name} {_escape_help(family.help)}",
+        f"# TYPE {header_name} {family.type}",
+    ]
+    for sample in family.samples:
+        if sample.labels:
+            labels = ",".join(f'{name}="{_escape_label(value)}"' for name, value in sample.labels.items())
+            lines.append(f"{family.name}{sample.suffix}{{{labels}}} {format_value(sample.value)}")
+        else:
+            lines.append(f"{family.name}{sample.suffix} {format_value(sample.value)}")
+    return lines
+
+
+def generate_text(registry: Optional[Registry] = None, *, openmetrics: bool = False) -> str:
+    """Экспозиция всех метрик реестра: формат Prometheus text 0.0.4 или OpenMetrics (openmetrics=True)."""
+    lines: list[str] = []
+    for family in get_registry(registry).collect():
+        lines.extend(_format_family(family, openmetrics))
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str, registry: Optional[Registry] = None, *, openmetrics: bool = False) -> None:
+    """
+    Пишет метрики в файл для textfile-коллектора node_exporter — без HTTP-сервера и pushgateway,
+    удобно в конце management-команды из cron. Запись атомарная: временный файл + os.replace,
+    коллектор никогда не увидит файл наполовину.
+    """
+    text = generate_text(registry, openmetrics=openmetrics)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".prom.tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            tmp.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,224 @@
+import bisect
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional, Sequence
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass(frozen=True)
+class Sample:
+    suffix: str                  # "", "_total", "_bucket", "_count", "_sum"
+    labels: dict[str, str]
+    value: float
+
+
+@dataclass(frozen=True)
+class MetricFamily:
+    """Срез одной метрики на момент сбора — то, что уходит в экспозицию."""
+    name: str
+    type: str                    # counter / gauge / histogram
+    help: str
+    samples: list[Sample] = field(default_factory=list)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Дочерняя серия с этими значениями меток; держите её у себя — повторный поиск не нужен."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {values}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            family.samples.extend(self._samples(labels, child))
+        return family
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, labels: dict[str, str], child) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self, labels, child):
+        yield Sample("_total", labels, child.value)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _samples(self, labels, child):
+        yield Sample("", labels, child.value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # последняя — +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _samples(self, labels, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        yield from histogram_samples(labels, self.buckets, _accumulate(counts), total)
+
+
+def _accumulate(counts: list[int]) -> list[int]:
+    result, seen = [], 0
+    for count in counts:
+        seen += count
+        result.append(seen)
+    return result
+
+
+def histogram_samples(
+        labels: dict[str, str], bounds: Sequence[float], cumulative: Sequence[int], total: float,
+) -> Iterable[Sample]:
+    """Сэмплы гистограммы из накопленных счётчиков: len(cumulative) == len(bounds) + 1 (последний — +Inf)."""
+    for bound, count in zip(bounds, cumulative):
+        yield Sample("_bucket", {**labels, "le": format_value(bound)}, count)
+    yield Sample("_bucket", {**labels, "le": "+Inf"}, cumulative[-1])
+    yield Sample("_count", labels, cumulative[-1])
+    yield Sample("_sum", labels, total)
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value))
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class Registry:
+    """
+    Набор метрик процесса. Метрики обновляются в горячем пути (inc/observe по заранее взятым labels()),
+    коллекторы (register_collector) вызываются только при сборе — так выгружаются TransportStats,
+    RateLimiter и т.п. без затрат на каждый запрос.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Collector) -> Collector:
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def unregister_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.remove(collector)
+
+    def collect(self) -> list[MetricFamily]:
+        with self._lock:
+            metrics, collectors = list(self._metrics.values()), list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered as {metric.type} {metric.labelnames}")
+            return metric
+
+
+REGISTRY = Registry()
+
+
+def get_registry(registry: Optional[Registry] = None) -> Registry:
+    return registry if registry is not None else REGISTRY
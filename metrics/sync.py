@@ -0,0 +1,87 @@
+import time
+from typing import Any, Callable, Optional, Sequence
+
+from .registry import DEFAULT_LATENCY_BUCKETS, Registry, get_registry
+
+_OUTCOMES = ("created", "updated", "skipped", "failed", "deleted")
+
+
+class SyncMetrics:
+    """
+    Метрики SyncJob: SyncJob(metrics=SyncMetrics()).
+
+    - sync_items_total{stream, outcome} — из SyncResult в конце run() (и при падении), не по элементу;
+    - sync_item_duration_seconds{stream} — время обработки элемента (в пакетном режиме — доля пачки);
+    - sync_checkpoint_timestamp_seconds / sync_checkpoint_lag_seconds{stream} — для чекпоинтов updated_at;
+    - sync_last_run_timestamp_seconds, sync_last_success_timestamp_seconds, sync_last_run_duration_seconds;
+    - проход run_retries() пишет в те же sync_items_total, а время и объём — в sync_last_retries_*
+      и sync_retries_due{stream}, чтобы не маскировать падения основного run().
+    """
+
+    def __init__(self, registry: Optional[Registry] = None, *, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+                 clock: Callable[[], float] = time.time):
+        registry = get_registry(registry)
+        self.clock = clock
+        self.items = registry.counter("sync_items", "Processed sync items by outcome", ("stream", "outcome"))
+        self.item_duration = registry.histogram(
+            "sync_item_duration_seconds", "Time to sync one item", ("stream",), buckets=buckets)
+        self.checkpoint_timestamp = registry.gauge(
+            "sync_checkpoint_timestamp_seconds", "Unix time the saved updated_at checkpoint points to", ("stream",))
+        self.checkpoint_lag = registry.gauge(
+            "sync_checkpoint_lag_seconds", "How far the updated_at checkpoint was behind when saved", ("stream",))
+        self.last_run = registry.gauge("sync_last_run_timestamp_seconds", "End of the last run", ("stream",))
+        self.last_success = registry.gauge(
+            "sync_last_success_timestamp_seconds", "End of the last run that finished without an exception", ("stream",))
+        self.last_run_duration = registry.gauge(
+            "sync_last_run_duration_seconds", "Duration of the last run", ("stream",))
+        self.last_retries = registry.gauge(
+            "sync_last_retries_timestamp_seconds", "End of the last retry-queue pass", ("stream",))
+        self.last_retries_success = registry.gauge(
+            "sync_last_retries_success_timestamp_seconds",
+            "End of the last retry-queue pass that finished without an exception", ("stream",))
+        self.retries_due = registry.gauge(
+            "sync_retries_due", "Keys taken from the retry queue by the last retry pass", ("stream",))
+
+    def time_items(self, stream: str, fn: Callable, count_of: Callable[..., int]) -> Callable:
+        """Оборачивает обработчик элементов: время вызова делится поровну на count_of(*args) элементов."""
+        observe = self.item_duration.labels(stream).observe
+        perf_counter = time.perf_counter
+
+        def _timed(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                count = count_of(*args, **kwargs)
+                if count:
+                    share = (perf_counter() - started) / count
+                    for _ in range(count):
+                        observe(share)
+
+        return _timed
+
+    def observe_run(self, stream: str, result: Any, duration: float, *, success: bool) -> None:
+        self._count_items(stream, result)
+        now = self.clock()
+        self.last_run.labels(stream).set(now)
+        self.last_run_duration.labels(stream).set(duration)
+        if success:
+            self.last_success.labels(stream).set(now)
+
+    def observe_retries(self, stream: str, result: Any, due: int, *, success: bool) -> None:
+        self._count_items(stream, result)
+        now = self.clock()
+        self.retries_due.labels(stream).set(due)
+        self.last_retries.labels(stream).set(now)
+        if success:
+            self.last_retries_success.labels(stream).set(now)
+
+    def observe_checkpoint(self, stream: str, timestamp: float) -> None:
+        self.checkpoint_timestamp.labels(stream).set(timestamp)
+        self.checkpoint_lag.labels(stream).set(max(0.0, self.clock() - timestamp))
+
+    def _count_items(self, stream: str, result: Any) -> None:
+        for outcome in _OUTCOMES:
+            value = getattr(result, outcome, 0)
+            if value:
+                self.items.labels(stream, outcome).inc(value)
@@ -1,12 +1,17 @@
 __all__ = [
     "BaseStateStore",
+    "CachedStateStore",
     "DefaultStateStore",
     "AbstractSyncBinding",
     "AbstractSyncCheckpoint",
     "AbstractSyncItemState",
+    "AbstractSyncLease",
+    "AbstractSyncRetry",
     "SyncBinding",
     "SyncCheckpoint",
     "SyncItemState",
+    "SyncLease",
+    "SyncRetry",
 ]
 
 
@@ -17,13 +22,20 @@ def __getattr__(name):
     if name == "DefaultStateStore":
         from .stores.default import DefaultStateStore
         return DefaultStateStore
+    if name == "CachedStateStore":
+        from .stores.cached import CachedStateStore
+        return CachedStateStore
     if name in {
         "AbstractSyncBinding",
         "AbstractSyncCheckpoint",
         "AbstractSyncItemState",
+        "AbstractSyncLease",
+        "AbstractSyncRetry",
         "SyncBinding",
         "SyncCheckpoint",
         "SyncItemState",
+        "SyncLease",
+        "SyncRetry",
     }:
         from .models import default
         return getattr(default, name)
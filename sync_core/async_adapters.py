@@ -0,0 +1,210 @@
+"""
+Адаптеры синхронных Source/Target/StateStore к async-контрактам.
+
+Вызовы уходят не в executor loop'а по умолчанию (asyncio.to_thread), а в свой пул: после каждого
+вызова поток закрывает отжившие Django-соединения (close_old_connections, с учётом CONN_MAX_AGE),
+иначе каждый поток пула держал бы своё соединение с БД бесконечно.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, Mapping, Optional
+
+from .dto import ExternalKey, Payload, Projection, Binding, SyncItemState
+from .interfaces import Source, Target, StateStore, AsyncSource, AsyncTarget, AsyncStateStore, AsyncFetchResult
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _db_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="sync-async")
+        return _executor
+
+
+async def _run_in(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Как asyncio.to_thread (в т.ч. с копией contextvars), но в заданном executor."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def _to_thread(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await _run_in(_db_executor(), _call_closing_connections, fn, *args, **kwargs)
+
+
+def _call_closing_connections(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _close_db_connections(only_old=True)
+
+
+def _close_db_connections(*, only_old: bool = False) -> None:
+    """Django-соединения текущего потока: отжившие (only_old) или все. Без Django — ничего."""
+    try:
+        from django.conf import settings
+        if not settings.configured:
+            return
+        from django.db import close_old_connections, connections
+    except ImportError:
+        return
+    if only_old:
+        close_old_connections()
+    else:
+        connections.close_all()
+
+
+class AsyncSourceAdapter(AsyncSource):
+    """Синхронный Source как AsyncSource.
+
+    Итератор источника читается пачками по pull_size в одном выделенном на выдачу потоке: курсор БД
+    (QuerySet.iterator) не переходит между потоками, а его соединение закрывается, когда выдача
+    кончилась. Отложенный чекпоинт снимается в том же потоке после каждого элемента, а наружу
+    отдаётся чекпоинт последнего выданного элемента — так пачка, прочитанная впрок, не двигает
+    чекпоинт вперёд.
+    """
+
+    def __init__(self, source: Source, *, pull_size: int = 100):
+        self.source = source
+        self.pull_size = max(1, pull_size)
+
+    async def fetch(self, since_token: Optional[str]) -> AsyncFetchResult:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-async-source")
+        try:
+            items, checkpoint = await _run_in(executor, self.source.fetch, since_token)
+        except BaseException:
+            _release_source_thread(executor)
+            raise
+        if not callable(checkpoint):
+            return self._iter_items(executor, iter(items), None), checkpoint
+
+        current: list[Optional[str]] = [None]
+        return self._iter_items(executor, iter(items), checkpoint, current), lambda: current[0]
+
+    def validate(self, key: ExternalKey, payload: Payload) -> None:
+        self.source.validate(key, payload)
+
+    async def _iter_items(
+            self,
+            executor: ThreadPoolExecutor,
+            iterator: Iterator[tuple[ExternalKey, Payload]],
+            getter: Optional[Any],
+            current: Optional[list[Optional[str]]] = None,
+    ) -> AsyncIterator[tuple[ExternalKey, Payload]]:
+        try:
+            while True:
+                pulled = await _run_in(executor, self._pull, iterator, getter)
+                if not pulled:
+                    return
+                for key, payload, checkpoint in pulled:
+                    if current is not None:
+                        current[0] = checkpoint
+                    yield key, payload
+        finally:
+            _release_source_thread(executor)
+
+    def _pull(self, iterator: Iterator[tuple[ExternalKey, Payload]], getter: Optional[Any]) -> list:
+        return [
+            (key, payload, getter() if getter is not None else None)
+            for key, payload in islice(iterator, self.pull_size)
+        ]
+
+
+def _release_source_thread(executor: ThreadPoolExecutor) -> None:
+    """Закрывает соединения потока выдачи и отпускает поток, не дожидаясь его."""
+    executor.submit(_close_db_connections)
+    executor.shutdown(wait=False)
+
+
+class AsyncTargetAdapter(AsyncTarget):
+    """Синхронный Target как AsyncTarget: upsert/delete уходят в поток."""
+
+    def __init__(self, target: Target):
+        self.target = target
+
+    async def upsert(self, key: ExternalKey, projection: Projection, *, binding: Optional[Binding] = None) -> str:
+        return await _to_thread(self.target.upsert, key, projection, binding=binding)
+
+    async def delete(self, key: ExternalKey, binding: Binding) -> None:
+        await _to_thread(self.target.delete, key, binding)
+
+    def validate(self, key: ExternalKey, projection: Projection) -> None:
+        self.target.validate(key, projection)
+
+
+class AsyncStateStoreAdapter(AsyncStateStore):
+    """Синхронный StateStore (в т.ч. Django ORM) как AsyncStateStore: каждый вызов уходит в поток."""
+
+    def __init__(self, state: StateStore):
+        self.state = state
+
+    async def get_checkpoint(self, stream: str) -> Optional[str]:
+        return await _to_thread(self.state.get_checkpoint, stream)
+
+    async def save_checkpoint(self, stream: str, token: str) -> None:
+        await _to_thread(self.state.save_checkpoint, stream, token)
+
+    async def bind(self, key: ExternalKey, internal_id: str, version: Optional[str], *,
+                   fingerprints: Optional[Mapping[str, str]] = None) -> None:
+        if fingerprints is None:  # старые StateStore не знают про fingerprints
+            await _to_thread(self.state.bind, key, internal_id, version)
+        else:
+            await _to_thread(self.state.bind, key, internal_id, version, fingerprints=fingerprints)
+
+    async def get_binding(self, key: ExternalKey) -> Optional[Binding]:
+        return await _to_thread(self.state.get_binding, key)
+
+    async def validate_binding(self, key: ExternalKey, binding: Binding) -> None:
+        self.state.validate_binding(key, binding)
+
+    async def get_item_state(self, key: ExternalKey) -> Optional[SyncItemState]:
+        return await _to_thread(self.state.get_item_state, key)
+
+    async def save_item_state(self, state: SyncItemState) -> None:
+        await _to_thread(self.state.save_item_state, state)
+
+    async def get_bindings_bulk(self, keys: Iterable[ExternalKey]) -> dict[ExternalKey, Binding]:
+        keys = list(keys)
+        get_bulk = getattr(self.state, "get_bindings_bulk", None)
+        if get_bulk is None:
+            return await _to_thread(self._point_lookups, self.state.get_binding, keys)
+        return await _to_thread(get_bulk, keys)
+
+    async def get_item_states_bulk(self, keys: Iterable[ExternalKey]) -> dict[ExternalKey, SyncItemState]:
+        keys = list(keys)
+        get_bulk = getattr(self.state, "get_item_states_bulk", None)
+        if get_bulk is None:
+            return await _to_thread(self._point_lookups, self.state.get_item_state, keys)
+        return await _to_thread(get_bulk, keys)
+
+    async def flush(self) -> None:
+        flush = getattr(self.state, "flush", None)
+        if flush is not None:
+            await _to_thread(flush)
+
+    @staticmethod
+    def _point_lookups(getter, keys: list[ExternalKey]) -> dict:
+        found = ((key, getter(key)) for key in keys)
+        return {key: value for key, value in found if value is not None}
+
+
+def as_async_source(source: Any) -> AsyncSource:
+    return source if inspect.iscoroutinefunction(getattr(source, "fetch", None)) else AsyncSourceAdapter(source)
+
+
+def as_async_target(target: Any) -> AsyncTarget:
+    return target if inspect.iscoroutinefunction(getattr(target, "upsert", None)) else AsyncTargetAdapter(target)
+
+
+def as_async_state_store(state: Any) -> AsyncStateStore:
+    if inspect.iscoroutinefunction(getattr(state, "get_checkpoint", None)):
+        return state
+    return AsyncStateStoreAdapter(state)
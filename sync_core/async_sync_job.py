@@ -0,0 +1,271 @@
+import asyncio
+from collections import deque
+from dataclasses import replace
+from typing import Any, AsyncIterable, Callable, Optional
+
+from .async_adapters import as_async_source, as_async_target, as_async_state_store
+from .dto import SyncResult, Binding, Projection, ExternalKey, Payload, SyncItemState, SyncItemStatus
+from .errors import SyncError, TemporaryError, TemporarySourceError, PermanentSourceError
+from .interfaces import Mapper, SyncLogger
+from .sync_job import WorkItem, ItemOutcome
+
+
+class AsyncSyncJob:
+    """Асинхронный вариант SyncJob: те же чекпоинты, ретраи и статусы элементов.
+
+    source/target/state могут быть как async-реализациями (AsyncSource/AsyncTarget/AsyncStateStore),
+    так и обычными синхронными — тогда они оборачиваются адаптерами, работающими в пуле потоков.
+    Одновременно обрабатывается не больше concurrency элементов; элементы одного ключа — по порядку,
+    чекпоинт двигается только по непрерывно завершённому префиксу потока (low-watermark).
+    """
+
+    def __init__(self, stream: str, source: Any, mapper: Mapper, target: Any,
+                 state: Any, logger: SyncLogger, max_attempts: int = 3,
+                 checkpoint_save_every: int = 1000, fetch_chunk_size: int = 500, concurrency: int = 10):
+        self.stream = stream
+        self.source = as_async_source(source)
+        self.mapper = mapper
+        self.target = as_async_target(target)
+        self.state = as_async_state_store(state)
+        self.logger = logger
+        self.max_attempts = max_attempts
+        self.checkpoint_save_every = max(1, checkpoint_save_every)
+        self.fetch_chunk_size = max(1, fetch_chunk_size)
+        self.concurrency = max(1, concurrency)
+        self._last_fetch_checkpoint: Optional[str] = None
+        self._checkpoint_getter: Optional[Callable[[], Optional[str]]] = None
+        self._last_saved_checkpoint: Optional[str] = None
+        self._processed_since_save = 0
+        self._sync_result = SyncResult()
+        self._has_retryable_temp_errors = False
+
+    async def run(self) -> SyncResult:
+        checkpoint: Optional[str] = await self.state.get_checkpoint(self.stream)
+        self._sync_result = SyncResult()
+        self._has_retryable_temp_errors = False
+        self._checkpoint_getter = None
+        self._last_fetch_checkpoint = None
+        self._last_saved_checkpoint = None
+        self._processed_since_save = 0
+
+        try:
+            items = await self._fetch(checkpoint)
+            await self._run_items(items)
+
+            # чекпоинт двигаем только если не осталось TEMP_ERROR с незакрытыми ретраями
+            await self._save_checkpoint_progress(self._has_retryable_temp_errors, force=True)
+            if self._last_fetch_checkpoint is not None and not self._has_retryable_temp_errors:
+                await self._persist_checkpoint(self._last_fetch_checkpoint)
+        finally:
+            await self._flush_state()
+        return self._sync_result
+
+    async def _fetch(self, checkpoint: Optional[str]) -> AsyncIterable[tuple[ExternalKey, Payload]]:
+        try:
+            items, new_checkpoint = await self.source.fetch(checkpoint)
+        except (TemporarySourceError, PermanentSourceError) as exc:
+            self._log_fetch_error(exc)
+            raise
+        if callable(new_checkpoint):
+            self._checkpoint_getter = new_checkpoint
+        else:
+            self._last_fetch_checkpoint = new_checkpoint
+        return items
+
+    async def _run_items(self, items: AsyncIterable[tuple[ExternalKey, Payload]]) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        window: deque[tuple[WorkItem, asyncio.Task]] = deque()  # задачи в порядке выдачи источника
+        last_by_key: dict[ExternalKey, asyncio.Task] = {}
+
+        async def complete_head() -> None:
+            item, task = window.popleft()
+            sync_result, retryable = await task
+            if last_by_key.get(item.key) is task:
+                del last_by_key[item.key]
+            await self._complete_item(item, sync_result, retryable)
+
+        try:
+            async for chunk in self._iter_chunks(items):
+                await self._prefetch_chunk(chunk, busy_keys=last_by_key)
+                for item in chunk:
+                    task = asyncio.create_task(self._run_item(item, last_by_key.get(item.key), semaphore))
+                    last_by_key[item.key] = task
+                    window.append((item, task))
+                    while window and (window[0][1].done() or len(window) > self.fetch_chunk_size):
+                        await complete_head()
+            while window:
+                await complete_head()
+        except BaseException:
+            for _, task in window:
+                task.cancel()
+            raise
+
+    async def _run_item(self, item: WorkItem, previous: Optional[asyncio.Task],
+                        semaphore: asyncio.Semaphore) -> ItemOutcome:
+        if previous is not None:  # порядок по ключу: ждём предыдущее вхождение (его ошибку не пробрасываем)
+            await asyncio.wait([previous])
+        async with semaphore:
+            return await self._sync_item(item)
+
+    async def _iter_chunks(self, items: AsyncIterable[tuple[ExternalKey, Payload]]):
+        chunk: list[WorkItem] = []
+        seq = 0
+        try:
+            async for key, payload in items:
+                item_checkpoint = self._checkpoint_getter() if self._checkpoint_getter is not None else None
+                chunk.append(WorkItem(seq=seq, key=key, payload=payload, checkpoint=item_checkpoint))
+                seq += 1
+                if len(chunk) >= self.fetch_chunk_size:
+                    yield chunk
+                    chunk = []
+        except (TemporarySourceError, PermanentSourceError) as exc:
+            self._log_fetch_error(exc)
+            if chunk:
+                yield chunk
+            raise
+        except Exception:
+            if chunk:
+                yield chunk
+            raise
+        if chunk:
+            yield chunk
+
+    async def _prefetch_chunk(self, chunk: list[WorkItem], busy_keys: dict[ExternalKey, Any]) -> None:
+        keys: dict[ExternalKey, None] = {}
+        for item in chunk:
+            if item.key in keys or item.key in busy_keys:
+                continue
+            keys[item.key] = None
+            item.prefetched = True
+
+        get_states_bulk = getattr(self.state, "get_item_states_bulk", None)
+        get_bindings_bulk = getattr(self.state, "get_bindings_bulk", None)
+        if get_states_bulk is None or get_bindings_bulk is None:
+            for item in chunk:
+                item.prefetched = False
+            return
+        states, bindings = await asyncio.gather(get_states_bulk(list(keys)), get_bindings_bulk(list(keys)))
+        for item in chunk:
+            if item.prefetched:
+                item.stored_state = states.get(item.key)
+                item.binding = bindings.get(item.key)
+
+    async def _sync_item(self, item: WorkItem) -> ItemOutcome:
+        key, payload = item.key, item.payload
+        stored_state: Optional[SyncItemState] = (
+            item.stored_state if item.prefetched else await self.state.get_item_state(key))
+        prev_state: Optional[SyncItemState] = (
+            stored_state
+            if stored_state is not None and stored_state.version == payload.version
+            else None
+        )
+
+        if prev_state is not None:  # не трогаем PERM_ERROR и превышенные попытки
+            if prev_state.status is SyncItemStatus.PERM_ERROR:
+                self.logger.on_skipped(key, "perm_error")
+                return SyncResult().inc(skipped=1), False
+            if prev_state.status is SyncItemStatus.TEMP_ERROR and prev_state.attempts >= self.max_attempts:
+                self.logger.on_skipped(key, "max_attempts")
+                return SyncResult().inc(skipped=1), False
+
+        try:
+            return await self._process_item(item, prev_state), False
+        except TemporaryError as exc:
+            attempts_after = (prev_state.attempts if prev_state else 0) + 1
+            await self._save_state(key, payload, prev_state, SyncItemStatus.TEMP_ERROR, exc)
+            self.logger.on_error(key, exc)
+            return SyncResult().inc(failed=1), attempts_after < self.max_attempts
+        except SyncError as exc:  # PermanentError и прочие SyncError -> PERM_ERROR, как в SyncJob
+            await self._save_state(key, payload, prev_state, SyncItemStatus.PERM_ERROR, exc)
+            self.logger.on_error(key, exc)
+            return SyncResult().inc(failed=1), False
+
+    async def _process_item(self, item: WorkItem, prev_state: Optional[SyncItemState]) -> SyncResult:
+        key, payload = item.key, item.payload
+        self.source.validate(key, payload)
+
+        bound: Optional[Binding] = item.binding if item.prefetched else await self.state.get_binding(key)
+        if bound:
+            await self.state.validate_binding(key, bound)
+
+        if bound and bound.is_up_to_date_for(payload):
+            self.logger.on_skipped(key, "same_version")
+            await self._save_state(key, payload, prev_state, SyncItemStatus.SUCCESS)
+            return SyncResult().inc(skipped=1)
+
+        self.mapper.validate(key, payload)
+        projection: Projection = self.mapper.map(key, payload)
+        if bound and projection.changed_fields is None:
+            projection = replace(projection, changed_fields=payload.changed_fields(bound.fingerprints))
+        self.target.validate(key, projection)
+        internal_id = await self.target.upsert(key, projection, binding=bound)
+        if payload.fingerprints is None:
+            await self.state.bind(key, internal_id, payload.version)
+        else:
+            await self.state.bind(key, internal_id, payload.version, fingerprints=payload.fingerprints)
+        await self._save_state(key, payload, prev_state, SyncItemStatus.SUCCESS)
+
+        if bound:
+            self.logger.on_updated(key, internal_id)
+            return SyncResult().inc(updated=1)
+        self.logger.on_created(key, internal_id)
+        return SyncResult().inc(created=1)
+
+    async def _save_state(
+            self,
+            key: ExternalKey,
+            payload: Payload,
+            prev_state: Optional[SyncItemState],
+            status: SyncItemStatus,
+            exc: Optional[Exception] = None,
+    ) -> None:
+        attempts = (prev_state.attempts + 1) if prev_state else 1
+        await self.state.save_item_state(
+            SyncItemState(
+                key=key,
+                version=payload.version,
+                status=status,
+                attempts=attempts,
+                last_error=str(exc) if exc is not None else None,
+            )
+        )
+
+    async def _complete_item(self, item: WorkItem, sync_result: SyncResult, retryable: bool) -> None:
+        self._sync_result = self._sync_result.merge(sync_result)
+        if retryable:
+            self._has_retryable_temp_errors = True
+        await self._save_checkpoint_progress(self._has_retryable_temp_errors, item.checkpoint)
+
+    async def _save_checkpoint_progress(
+            self,
+            has_retryable_temp_errors: bool,
+            item_checkpoint: Optional[str] = None,
+            force: bool = False,
+    ) -> None:
+        if self._checkpoint_getter is None:
+            return
+        self._processed_since_save += 1
+        if not force and self._processed_since_save < self.checkpoint_save_every:
+            return
+        checkpoint = self._checkpoint_getter() if force else item_checkpoint
+        if checkpoint is None:
+            return
+        self._last_fetch_checkpoint = checkpoint
+        self._processed_since_save = 0
+        if has_retryable_temp_errors or checkpoint == self._last_saved_checkpoint:
+            return
+        await self._persist_checkpoint(checkpoint)
+        self._last_saved_checkpoint = checkpoint
+
+    async def _persist_checkpoint(self, checkpoint: str) -> None:
+        await self._flush_state()
+        await self.state.save_checkpoint(self.stream, checkpoint)
+
+    async def _flush_state(self) -> None:
+        flush = getattr(self.state, "flush", None)
+        if flush is not None:
+            await flush()
+
+    def _log_fetch_error(self, exc: SyncError) -> None:
+        error_key = ExternalKey(system=self.stream, key="__fetch__")
+        self.logger.on_error(error_key, exc)
@@ -1,18 +1,25 @@
+import queue
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Generic, Iterable, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, Generic, Iterable, Iterator, Optional, Sequence, Tuple, TypeVar, Union
 
 import requests
 
+from .datetime_parser import DEFAULT_DATETIME_FORMATS, DateTimeParser
 from .dto import ExternalKey, Payload
-from .errors import TemporarySourceError, PermanentSourceError
+from .errors import SyncError, TemporarySourceError, PermanentSourceError
 from .interfaces import Source, FetchResult
 
 TSource = TypeVar("TSource")
 TItems = Iterable[tuple[ExternalKey, Payload[TSource]]]
 RawCheckpoint = Union[Optional[Any], Callable[[], Optional[Any]]]
 
+_CHECKPOINT_CONTEXT = "__checkpoint__"
+
 
 class CheckpointType(str, Enum):
     """Виды чекпоинтов для Source."""
@@ -26,15 +33,7 @@ class CheckpointType(str, Enum):
 class BaseSource(Source[TSource], Generic[TSource], ABC):
     """Базовый Source с унифицированным парсингом/валидацией чекпоинтов."""
 
-    _FALLBACK_DATETIME_FORMATS = (
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d %H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%d %H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S.%f%z",
-    )
+    _FALLBACK_DATETIME_FORMATS = DEFAULT_DATETIME_FORMATS  # можно переопределить в наследнике
 
     def __init__(
         self,
@@ -43,11 +42,14 @@ class BaseSource(Source[TSource], Generic[TSource], ABC):
         checkpoint_required: bool = True,
         checkpoint_parser: Optional[Callable[[str], Any]] = None,
         checkpoint_formatter: Optional[Callable[[Any], str]] = None,
+        datetime_formats: Optional[Sequence[str]] = None,
     ):
         self.checkpoint_type = checkpoint_type
         self.checkpoint_required = checkpoint_required and checkpoint_type is not CheckpointType.NONE
         self._checkpoint_parser = checkpoint_parser
         self._checkpoint_formatter = checkpoint_formatter
+        # свой парсер на источник: кэш удачного формата по полю не смешивается с другими фидами
+        self.datetime_parser = DateTimeParser(datetime_formats or self._FALLBACK_DATETIME_FORMATS)
 
     def fetch(self, since_token: Optional[str]) -> FetchResult:
         if self.checkpoint_required and since_token is None:
@@ -83,38 +85,117 @@ class BaseSource(Source[TSource], Generic[TSource], ABC):
         start_token: Optional[str],
         fetch_page: Callable[[Optional[str]], tuple[list, Optional[str]]],
     ) -> Tuple[list, Optional[str]]:
-        """Обходит постраничный API: fetch_page(token) -> (items, next_token)."""
-        items: list = []
-        token = start_token
-        last_token = start_token
-        while True:
-            page_items, token = fetch_page(token)
-            items.extend(page_items)
-            if token is None:
-                break
-            last_token = token
-        return items, last_token
+        """Обходит постраничный API: fetch_page(token) -> (items, next_token).
+        Держит в памяти все страницы сразу — для больших выгрузок используйте paginate_iter."""
+        items_iter, checkpoint = self.paginate_iter(start_token, fetch_page)
+        items = list(items_iter)
+        return items, checkpoint() if callable(checkpoint) else checkpoint
 
     def paginate_iter(
         self,
         start_token: Optional[str],
         fetch_page: Callable[[Optional[str]], tuple[list, Optional[str]]],
-    ) -> Tuple[Iterable[tuple], Optional[str]]:
-        """Ленивый обход постраничного API: отдаёт генератор пар и последний next_token."""
+    ) -> Tuple[Iterable[tuple], Optional[Callable[[], Optional[str]]]]:
+        """Ленивый обход постраничного API: в памяти только текущая страница.
+
+        Возвращает генератор пар и чекпоинт-callable: next_token последней полностью отданной страницы
+        (пока не отдана первая — start_token). SyncJob снимает его по ходу обхода, поэтому после падения
+        синк продолжится с границы страницы (у checkpoint_type=NONE чекпоинта нет — None). Ошибка fetch_page — TemporarySourceError (SyncError — как есть).
+        """
+        last_token = start_token
+
+        def _iter():
+            nonlocal last_token
+            for page_items, next_token in _iter_pages(start_token, fetch_page):
+                yield from page_items
+                if next_token is not None:
+                    last_token = next_token
+
+        return _iter(), self._page_checkpoint(lambda: last_token)
+
+    def paginate_prefetch(
+        self,
+        start_token: Optional[str],
+        fetch_page: Callable[[Optional[str]], tuple[list, Optional[str]]],
+        *,
+        prefetch: int = 2,
+    ) -> Tuple[Iterable[tuple], Optional[Callable[[], Optional[str]]]]:
+        """Как paginate_iter, но следующие страницы грузятся заранее в фоновом потоке.
+
+        В очереди не больше prefetch страниц: если потребитель не успевает, загрузка ждёт.
+        Ошибка fetch_page пробрасывается из итератора как TemporarySourceError (SyncError — как есть).
+        Чекпоинт — callable: next_token последней полностью отданной страницы (отложенный чекпоинт SyncJob).
+        """
         last_token = start_token
 
         def _iter():
             nonlocal last_token
-            token = start_token
-            while True:
-                page_items, token = fetch_page(token)
-                for item in page_items:
-                    yield item
-                if token is None:
-                    break
-                last_token = token
+            pages = _iter_pages(start_token, fetch_page)
+            for page_items, next_token in _prefetch_in_background(pages, max(1, prefetch)):
+                yield from page_items
+                if next_token is not None:
+                    last_token = next_token
+
+        return _iter(), self._page_checkpoint(lambda: last_token)
 
-        return _iter(), last_token
+    def paginate_offset_prefetch(
+        self,
+        fetch_page: Callable[[int], tuple[list, Optional[int]]],
+        *,
+        page_size: int,
+        start_offset: int = 0,
+        workers: int = 4,
+    ) -> Tuple[Iterable[tuple], Optional[Callable[[], int]]]:
+        """Постраничный обход API со смещением (Bitrix start=, SQL OFFSET): fetch_page(offset) -> (items, total).
+
+        Если total известен, страницы после первой грузятся параллельно в workers потоков (не больше
+        workers страниц впереди потребителя) и отдаются строго по порядку. Если total=None — по одной,
+        пока страница не окажется короче page_size. Ошибки — как в paginate_prefetch.
+        Чекпоинт — callable: смещение сразу за последней полностью отданной страницей.
+        """
+        last_offset = start_offset
+        workers = max(1, workers)
+
+        def _iter():
+            nonlocal last_offset
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="source-page") as pool:
+                pending: deque[tuple[int, Future]] = deque()
+                try:
+                    offset = start_offset
+                    page_items, total = _call_fetch(fetch_page, offset)
+                    while True:
+                        next_offset = offset + page_size
+                        if total is not None:
+                            while len(pending) < workers:
+                                queued = pending[-1][0] + page_size if pending else next_offset
+                                if queued >= total:
+                                    break
+                                pending.append((queued, pool.submit(_call_fetch, fetch_page, queued)))
+
+                        yield from page_items
+                        last_offset = offset + len(page_items)  # короткая последняя страница — не page_size
+
+                        if total is not None:
+                            if not pending:
+                                return
+                            offset, future = pending.popleft()
+                            page_items, _ = future.result()
+                        else:
+                            if len(page_items) < page_size:
+                                return
+                            offset = next_offset
+                            page_items, total = _call_fetch(fetch_page, offset)
+                finally:
+                    for _, future in pending:
+                        future.cancel()
+
+        return _iter(), self._page_checkpoint(lambda: last_offset)
+
+    def _page_checkpoint(self, getter: Callable[[], Any]) -> Optional[Callable[[], Any]]:
+        """Чекпоинт пагинаторов: у источника без чекпоинта (NONE, снапшот) — None вместо callable."""
+        if self.checkpoint_type is CheckpointType.NONE:
+            return None
+        return getter
 
     def _parse_checkpoint(self, token: str) -> Any:
         """Парсинг входящего чекпоинта (строки из StateStore) в удобный тип для _fetch."""
@@ -162,45 +243,22 @@ class BaseSource(Source[TSource], Generic[TSource], ABC):
 
     # --- helpers for checkpoint types ---
 
-    def _parse_datetime_token(self, token: str) -> datetime:
-        cleaned = token.strip()
-        if cleaned.endswith("Z"):
-            cleaned = f"{cleaned[:-1]}+00:00"
-        try:
-            return datetime.fromisoformat(cleaned)
-        except ValueError:
-            pass
-
-        try:
-            return datetime.fromtimestamp(float(cleaned), tz=timezone.utc)
-        except ValueError:
-            pass
+    def parse_datetime(self, value: Any, *, field: Optional[str] = None) -> datetime:
+        """Дата из данных источника (datetime/timestamp/строка) -> aware datetime; field — ключ кэша формата."""
+        return self.datetime_parser.parse_value(value, context=field)
 
-        for fmt in self._FALLBACK_DATETIME_FORMATS:
-            try:
-                return datetime.strptime(cleaned, fmt).replace(tzinfo=timezone.utc)
-            except ValueError:
-                continue
+    def parse_datetimes(self, values: Iterable[Any], *, field: Optional[str] = None) -> list[datetime]:
+        """parse_datetime для целой страницы (формат подбирается один раз)."""
+        return self.datetime_parser.parse_many(values, context=field)
 
-        raise ValueError("cannot parse datetime")
+    def _parse_datetime_token(self, token: str) -> datetime:
+        return self.datetime_parser.parse(token, context=_CHECKPOINT_CONTEXT)
 
     def _parse_datetime_value(self, value: Any) -> datetime:
-        if isinstance(value, datetime):
-            dt = value
-        elif isinstance(value, (int, float)):
-            dt = datetime.fromtimestamp(float(value), tz=timezone.utc)
-        elif isinstance(value, str):
-            dt = self._parse_datetime_token(value)
-        else:
-            raise ValueError("expected datetime/str/timestamp")
-
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+        return self.datetime_parser.parse_value(value, context=_CHECKPOINT_CONTEXT)
 
     def _format_datetime(self, dt: datetime) -> str:
-        aware = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        return aware.astimezone(timezone.utc).isoformat()
+        return DateTimeParser.format(dt)
 
     @staticmethod
     def _parse_monotonic_token(token: str) -> int:
@@ -229,3 +287,74 @@ class BaseSource(Source[TSource], Generic[TSource], ABC):
         if not token:
             raise ValueError("cursor cannot be empty")
         return token
+
+
+_PAGES_DONE = object()
+
+
+def _as_source_error(exc: Exception) -> SyncError:
+    if isinstance(exc, SyncError):
+        return exc
+    error = TemporarySourceError(str(exc) or exc.__class__.__name__)
+    error.__cause__ = exc
+    return error
+
+
+def _call_fetch(fetch_page: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return fetch_page(*args)
+    except Exception as exc:
+        raise _as_source_error(exc) from exc
+
+
+def _iter_pages(
+        start_token: Optional[str],
+        fetch_page: Callable[[Optional[str]], tuple[list, Optional[str]]],
+) -> Iterator[tuple[list, Optional[str]]]:
+    """(items, next_token) по страницам; курсор, который не двигается, — PermanentSourceError, а не вечный цикл."""
+    token = start_token
+    while True:
+        page_items, next_token = _call_fetch(fetch_page, token)
+        yield page_items, next_token
+        if next_token is None:
+            return
+        if next_token == token:
+            raise PermanentSourceError(f"pagination cursor did not advance: {next_token!r}")
+        token = next_token
+
+
+def _prefetch_in_background(pages: Iterator[Any], prefetch: int) -> Iterator[Any]:
+    """Крутит итератор pages в фоновом потоке, складывая результаты в очередь на prefetch элементов."""
+    buffer: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def _put(entry: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for page in pages:
+                if not _put(page):
+                    return
+            _put(_PAGES_DONE)
+        except Exception as exc:
+            _put(_as_source_error(exc))
+
+    producer = threading.Thread(target=_produce, name="source-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            entry = buffer.get()
+            if entry is _PAGES_DONE:
+                return
+            if isinstance(entry, SyncError):
+                raise entry
+            yield entry
+    finally:
+        stop.set()  # потребитель ушёл раньше (break/ошибка) — фоновый поток больше не грузит
@@ -0,0 +1,167 @@
+"""Синтетические Source/Mapper/Target/StateStore/SyncLogger для бенчмарков SyncJob."""
+import threading
+import zlib
+from typing import Iterable, Mapping, Optional
+
+from ..base_source import BaseSource, CheckpointType
+from ..dto import Binding, ExternalKey, KeyBinding, Payload, Projection, SyncItemState
+from ..errors import PermanentTargetError, TemporaryTargetError
+
+BENCH_SYSTEM = "bench"
+
+
+def _fails(index: int, rate: float, salt: int) -> bool:
+    """Детерминированная «случайная» ошибка: одни и те же элементы падают в каждом прогоне."""
+    return rate > 0 and zlib.crc32(f"{salt}:{index}".encode()) < rate * 0x1_0000_0000
+
+
+class SyntheticSource(BaseSource):
+    """items элементов страницами по page_size; чекпоинт — смещение следующей страницы (CURSOR)."""
+
+    def __init__(self, items: int, *, page_size: int = 500, version: str = "1"):
+        super().__init__(checkpoint_type=CheckpointType.CURSOR, checkpoint_required=False)
+        self.items = items
+        self.page_size = page_size
+        self.version = version
+
+    def _fetch(self, parsed_checkpoint):
+        return self.paginate_iter(parsed_checkpoint, self._fetch_page)
+
+    def _fetch_page(self, token: Optional[str]):
+        start = int(token) if token else 0
+        stop = min(start + self.page_size, self.items)
+        page = [
+            (
+                ExternalKey(BENCH_SYSTEM, str(i)),
+                Payload(data={"id": i, "title": f"item {i}", "amount": i % 1000}, version=self.version),
+            )
+            for i in range(start, stop)
+        ]
+        return page, (str(stop) if stop < self.items else None)
+
+    def validate(self, key, payload):
+        return None
+
+
+class EchoMapper:
+    def validate(self, key, payload):
+        return None
+
+    def map(self, key, payload):
+        return Projection(kind="bench", data=payload.data)
+
+
+class SyntheticTarget:
+    """Пишет «в никуда»; temp_error_rate/perm_error_rate доли элементов падают TEMP/PERM-ошибкой.
+    batch=True — есть upsert_many (как у Bitrix batch)."""
+
+    def __init__(self, *, temp_error_rate: float = 0.0, perm_error_rate: float = 0.0, batch: bool = False):
+        self.temp_error_rate = temp_error_rate
+        self.perm_error_rate = perm_error_rate
+        if batch:
+            self.upsert_many = self._upsert_many
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        index = projection.data["id"]
+        if _fails(index, self.perm_error_rate, 1):
+            raise PermanentTargetError("synthetic permanent error")
+        if _fails(index, self.temp_error_rate, 2):
+            raise TemporaryTargetError("synthetic temporary error")
+        return binding.internal_id if binding else f"int-{index}"
+
+    def _upsert_many(self, items):
+        result = []
+        for key, projection, binding in items:
+            try:
+                result.append(self.upsert(key, projection, binding))
+            except (PermanentTargetError, TemporaryTargetError) as exc:
+                result.append(exc)
+        return result
+
+    def delete(self, key, binding):
+        return None
+
+
+class MemoryStateStore:
+    """StateStore в памяти с bulk-методами; потокобезопасен для workers > 1."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkpoints: dict[str, str] = {}
+        self.bindings: dict[ExternalKey, Binding] = {}
+        self.item_states: dict[ExternalKey, SyncItemState] = {}
+
+    def get_checkpoint(self, stream: str) -> Optional[str]:
+        return self.checkpoints.get(stream)
+
+    def save_checkpoint(self, stream: str, token: str) -> None:
+        self.checkpoints[stream] = token
+
+    def bind(self, key, internal_id, version, *, fingerprints=None) -> None:
+        with self._lock:
+            self.bindings[key] = Binding(internal_id=internal_id, version=version, fingerprints=fingerprints)
+
+    def unbind(self, key) -> None:
+        with self._lock:
+            self.bindings.pop(key, None)
+
+    def get_binding(self, key) -> Optional[Binding]:
+        return self.bindings.get(key)
+
+    def get_bindings_bulk(self, keys: Iterable[ExternalKey]) -> Mapping[ExternalKey, Binding]:
+        bindings = self.bindings
+        return {key: bindings[key] for key in keys if key in bindings}
+
+    def iter_bindings(self, system: str) -> Iterable[KeyBinding]:
+        for key, binding in list(self.bindings.items()):
+            if key.system == system:
+                yield KeyBinding(key=key, binding=binding)
+
+    def validate_binding(self, key, binding) -> None:
+        return None
+
+    def get_item_state(self, key) -> Optional[SyncItemState]:
+        return self.item_states.get(key)
+
+    def get_item_states_bulk(self, keys: Iterable[ExternalKey]) -> Mapping[ExternalKey, SyncItemState]:
+        states = self.item_states
+        return {key: states[key] for key in keys if key in states}
+
+    def save_item_state(self, state: SyncItemState) -> None:
+        with self._lock:
+            self.item_states[state.key] = state
+
+
+class CheckpointCounter:
+    """Обёртка StateStore: считает save_checkpoint, остальное проксирует как есть."""
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.checkpoint_writes = 0
+
+    def save_checkpoint(self, stream: str, token: str) -> None:
+        self.checkpoint_writes += 1
+        self._inner.save_checkpoint(stream, token)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class NullLogger:
+    def on_skipped(self, key, reason):
+        return None
+
+    def on_created(self, key, internal_id):
+        return None
+
+    def on_updated(self, key, internal_id):
+        return None
+
+    def on_deleted(self, key, internal_id):
+        return None
+
+    def on_error(self, key, exc):
+        return None
@@ -0,0 +1,222 @@
+"""
+Бенчмарк горячего пути SyncJob.run на синтетических данных.
+
+    python -m <пакет>.sync_core.benchmarks.sync_job_bench --items 10000 100000 --store memory sqlite \
+        --error-rate 0 0.01 --passes 2
+
+Для каждого сценария (items × store × error-rate) печатает: items/s, SQL-запросов на элемент
+(только sqlite, запросы потока run()), пик памяти Python (tracemalloc, --no-memory отключает —
+трассировка замедляет прогон), число записей чекпоинта и счётчики SyncResult;
+--instrument дополнительно печатает в stderr время по стадиям (SyncInstrumentation).
+Проход 1 — первичная заливка, проходы 2+ — те же данные без изменений (путь skip).
+sqlite — модели sync_core на временном файле SQLite; Django настраивается здесь же, если ещё не настроен.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from ..instrumentation import SyncInstrumentation
+from ..sync_job import SyncJob
+from .fakes import CheckpointCounter, EchoMapper, MemoryStateStore, NullLogger, SyntheticSource, SyntheticTarget
+
+_APP_MODULE = __package__.rsplit(".", 1)[0]  # .../sync_core
+
+
+@dataclass
+class BenchResult:
+    store: str
+    items: int
+    error_rate: float
+    workers: int
+    batch: bool
+    run_pass: int
+    seconds: float
+    items_per_s: float
+    queries_per_item: Optional[float]
+    peak_mb: Optional[float]
+    checkpoint_writes: int
+    created: int
+    updated: int
+    skipped: int
+    failed: int
+
+
+def setup_django(db_path: str) -> None:
+    import django
+    from django.conf import settings
+
+    if not settings.configured:
+        settings.configure(
+            INSTALLED_APPS=[_APP_MODULE],
+            DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": db_path}},
+            DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+            USE_TZ=True,
+        )
+        django.setup()
+    from django.core.management import call_command
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def make_store(kind: str, buffered: bool) -> Callable[[], object]:
+    if kind == "memory":
+        return MemoryStateStore
+
+    def _sqlite_store():
+        from ..models import SyncBinding, SyncCheckpoint, SyncItemState
+        from ..stores import DefaultStateStore
+
+        for model in (SyncBinding, SyncCheckpoint, SyncItemState):
+            model.objects.all().delete()
+        return DefaultStateStore(buffered=buffered)
+
+    return _sqlite_store
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(
+        *,
+        store_kind: str,
+        items: int,
+        error_rate: float,
+        passes: int,
+        workers: int,
+        batch: bool,
+        buffered: bool,
+        trace_memory: bool,
+        checkpoint_save_every: int,
+        instrument: bool = False,
+) -> list[BenchResult]:
+    state = make_store(store_kind, buffered)()
+    target = SyntheticTarget(temp_error_rate=error_rate / 2, perm_error_rate=error_rate / 2, batch=batch)
+    results = []
+    for run_pass in range(1, passes + 1):
+        counted_state = CheckpointCounter(state)
+        instrumentation = SyncInstrumentation() if instrument else None
+        job = SyncJob(
+            stream=f"bench-{run_pass}",  # новый поток — источник отдаёт всё с начала
+            source=SyntheticSource(items),
+            mapper=EchoMapper(),
+            target=target,
+            state=counted_state,
+            logger=NullLogger(),
+            checkpoint_save_every=checkpoint_save_every,
+            workers=workers,
+            instrumentation=instrumentation,
+        )
+        queries = _QueryCounter()
+        if store_kind == "sqlite":
+            from django.db import connection
+            query_context = connection.execute_wrapper(queries)
+        else:
+            query_context = nullcontext()
+
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        with query_context:
+            sync_result = job.run()
+        seconds = time.perf_counter() - started
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+        results.append(BenchResult(
+            store=store_kind,
+            items=items,
+            error_rate=error_rate,
+            workers=workers,
+            batch=batch,
+            run_pass=run_pass,
+            seconds=round(seconds, 3),
+            items_per_s=round(items / seconds, 1) if seconds else 0.0,
+            queries_per_item=round(queries.count / items, 3) if store_kind == "sqlite" and items else None,
+            peak_mb=round(peak, 1) if peak is not None else None,
+            checkpoint_writes=counted_state.checkpoint_writes,
+            created=sync_result.created,
+            updated=sync_result.updated,
+            skipped=sync_result.skipped,
+            failed=sync_result.failed,
+        ))
+        if instrumentation is not None:
+            print(instrumentation.report(), file=sys.stderr)
+    return results
+
+
+def _format_row(result: BenchResult) -> str:
+    queries = f"{result.queries_per_item:.2f}" if result.queries_per_item is not None else "-"
+    peak = f"{result.peak_mb:.1f}" if result.peak_mb is not None else "-"
+    return (
+        f"{result.store:<7}{result.items:>9}{result.error_rate:>7.3f}{result.workers:>4}{result.run_pass:>5}"
+        f"{result.items_per_s:>12.0f}{queries:>8}{peak:>9}{result.checkpoint_writes:>7}"
+        f"{result.created:>9}{result.skipped:>9}{result.failed:>8}"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--store", choices=["memory", "sqlite"], nargs="+", default=["memory"])
+    parser.add_argument("--error-rate", type=float, nargs="+", default=[0.0, 0.01],
+                        help="доля элементов с ошибкой приёмника (пополам TEMP и PERM)")
+    parser.add_argument("--passes", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch", action="store_true", help="у приёмника есть upsert_many")
+    parser.add_argument("--unbuffered", action="store_true", help="sqlite: DefaultStateStore(buffered=False)")
+    parser.add_argument("--checkpoint-save-every", type=int, default=1000)
+    parser.add_argument("--no-memory", action="store_true", help="не трассировать память (быстрее)")
+    parser.add_argument("--db", help="файл SQLite (по умолчанию — временный)")
+    parser.add_argument("--instrument", action="store_true", help="таймеры по стадиям SyncJob (в stderr)")
+    parser.add_argument("--json", action="store_true", help="результаты построчно в JSON")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if "sqlite" in args.store:
+        if args.db is None:
+            tmpdir = tempfile.TemporaryDirectory()
+            args.db = os.path.join(tmpdir.name, "bench.sqlite3")
+        setup_django(args.db)
+
+    if not args.json:
+        print(f"{'store':<7}{'items':>9}{'err':>7}{'wrk':>4}{'pass':>5}{'items/s':>12}{'q/item':>8}"
+              f"{'peak MB':>9}{'ckpts':>7}{'created':>9}{'skipped':>9}{'failed':>8}")
+    try:
+        for store_kind in args.store:
+            for items in args.items:
+                for error_rate in args.error_rate:
+                    for result in run_scenario(
+                            store_kind=store_kind,
+                            items=items,
+                            error_rate=error_rate,
+                            passes=args.passes,
+                            workers=args.workers,
+                            batch=args.batch,
+                            buffered=not args.unbuffered,
+                            trace_memory=not args.no_memory,
+                            checkpoint_save_every=args.checkpoint_save_every,
+                            instrument=args.instrument,
+                    ):
+                        print(json.dumps(asdict(result)) if args.json else _format_row(result), flush=True)
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
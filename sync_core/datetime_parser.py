@@ -0,0 +1,211 @@
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Optional, Sequence
+
+DEFAULT_DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+)
+
+_ISO = "iso"
+_TIMESTAMP = "timestamp"
+# строка, которую запомненный _TIMESTAMP может взять без проверки ISO: секунды 1973..2286 (9-10 цифр)
+_TIMESTAMP_SHAPE = re.compile(r"\d{9,10}(?:\.\d+)?")
+
+
+def _parse_iso(token: str) -> datetime:
+    return datetime.fromisoformat(token)
+
+
+def _parse_timestamp(token: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(float(token), tz=timezone.utc)
+    except (OverflowError, OSError) as exc:
+        raise ValueError(str(exc)) from exc
+
+
+_FAST_DIRECTIVES = {
+    "Y": ("year", r"(\d{4})"),
+    "m": ("month", r"(\d{1,2})"),
+    "d": ("day", r"(\d{1,2})"),
+    "H": ("hour", r"(\d{1,2})"),
+    "M": ("minute", r"(\d{1,2})"),
+    "S": ("second", r"(\d{1,2})"),
+    "f": ("microsecond", r"(\d{1,6})"),
+}
+_DATETIME_ARGS = (("year", 1900), ("month", 1), ("day", 1), ("hour", 0), ("minute", 0), ("second", 0))
+
+
+@lru_cache(maxsize=64)
+def _compile_format(fmt: str) -> Optional[Callable[[str], datetime]]:
+    """Формат из %Y %m %d %H %M %S %f и литералов -> разбор регуляркой без strptime (в разы быстрее).
+    Пробелы, как и в strptime, совпадают с любым непустым пробельным промежутком.
+    Для остальных форматов (%z, %b, ...) — None, работает обычный strptime."""
+    pattern: list[str] = []
+    names: list[str] = []
+    index = 0
+    while index < len(fmt):
+        char = fmt[index]
+        if char == "%":
+            directive = _FAST_DIRECTIVES.get(fmt[index + 1:index + 2])
+            if directive is None or directive[0] in names:
+                return None
+            names.append(directive[0])
+            pattern.append(directive[1])
+            index += 2
+        elif char.isspace():
+            while index < len(fmt) and fmt[index].isspace():
+                index += 1
+            pattern.append(r"\s+")
+        else:
+            pattern.append(re.escape(char))
+            index += 1
+    match = re.compile("".join(pattern)).fullmatch
+    positions = [(names.index(name) if name in names else None, default) for name, default in _DATETIME_ARGS]
+    microsecond_at = names.index("microsecond") if "microsecond" in names else None
+
+    def _parse(token: str) -> datetime:
+        found = match(token)
+        if found is None:
+            raise ValueError(f"time data {token!r} does not match format {fmt!r}")
+        groups = found.groups()
+        args = [int(groups[at]) if at is not None else default for at, default in positions]
+        if microsecond_at is not None:
+            args.append(int(groups[microsecond_at].ljust(6, "0")))
+        return datetime(*args, tzinfo=timezone.utc)  # datetime() сам проверит диапазоны
+
+    return _parse
+
+
+class DateTimeParser:
+    """
+    Разбор дат из строк источника: ISO 8601, unix-timestamp, затем форматы strptime по очереди.
+
+    Запоминает, какой способ сработал последним для каждого context (например, поле источника),
+    и следующей строке с тем же context пробует его первым — на фиде в одном формате промахов
+    (и исключений) почти нет. parse_many разбирает целую страницу одним способом.
+    Без context способ не запоминается (общий парсер видит разные фиды); timestamp запоминается
+    и применяется первым только к строкам вида секунд (иначе "20240101" ушёл бы в 1970 год).
+    Даты без зоны считаются UTC.
+    """
+
+    def __init__(self, formats: Sequence[str] = DEFAULT_DATETIME_FORMATS):
+        self.formats = tuple(formats)
+        self._last_strategy: dict[Hashable, str] = {}  # context -> _ISO / _TIMESTAMP / формат strptime
+
+    def parse(self, token: str, *, context: Hashable = None) -> datetime:
+        return self._detect(self._clean(token), context)[0]
+
+    def parse_value(self, value: Any, *, context: Hashable = None) -> datetime:
+        """datetime/timestamp/строка -> aware datetime (без зоны — UTC)."""
+        if isinstance(value, datetime):
+            dt = value
+        elif isinstance(value, (int, float)):
+            dt = datetime.fromtimestamp(float(value), tz=timezone.utc)
+        elif isinstance(value, str):
+            dt = self.parse(value, context=context)
+        else:
+            raise ValueError("expected datetime/str/timestamp")
+
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+
+    def parse_many(self, values: Iterable[Any], *, context: Hashable = None) -> list[datetime]:
+        """Пакетный parse_value: строки страницы разбираются способом, подобранным по первой из них;
+        если отдельная строка в него не влезла — для неё обычный parse."""
+        values = list(values)
+        first = next((self._clean(v) for v in values if isinstance(v, str)), None)
+        if first is None:
+            return [self.parse_value(value, context=context) for value in values]
+
+        strategy = self._detect(first, context)[1]  # подбирает (и при context запоминает) способ
+        apply = self._strategy_callable(strategy)
+        result: list[datetime] = []
+        append = result.append
+        for value in values:
+            if isinstance(value, str):
+                cleaned = self._clean(value)
+                try:
+                    if strategy == _TIMESTAMP and not _TIMESTAMP_SHAPE.fullmatch(cleaned):
+                        raise ValueError("not a timestamp")
+                    dt = apply(cleaned)
+                except ValueError:
+                    dt = self._detect(cleaned, context)[0]
+                if dt.tzinfo is None:
+                    dt = dt.replace(tzinfo=timezone.utc)
+                append(dt)
+            else:
+                append(self.parse_value(value, context=context))
+        return result
+
+    @staticmethod
+    def format(dt: datetime) -> str:
+        """aware/naive datetime -> ISO-строка в UTC (формат версий и чекпоинтов)."""
+        aware = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+        return aware.astimezone(timezone.utc).isoformat()
+
+    def _detect(self, cleaned: str, context: Hashable) -> tuple[datetime, str]:
+        """(дата, сработавший способ): сначала запомненный для context, затем все по порядку."""
+        strategy = self._last_strategy.get(context)
+        if strategy == _TIMESTAMP and not _TIMESTAMP_SHAPE.fullmatch(cleaned):
+            strategy = None  # "20240101" — ISO-дата, а не секунды
+        if strategy is not None:
+            try:
+                return self._apply(strategy, cleaned), strategy
+            except ValueError:
+                pass
+
+        for candidate in self._strategies():
+            if candidate == strategy:
+                continue
+            try:
+                dt = self._apply(candidate, cleaned)
+            except ValueError:
+                continue
+            if context is not None and (candidate != _TIMESTAMP or _TIMESTAMP_SHAPE.fullmatch(cleaned)):
+                self._last_strategy[context] = candidate
+            return dt, candidate
+
+        raise ValueError("cannot parse datetime")
+
+    def _strategies(self) -> Iterable[str]:
+        yield _ISO
+        yield _TIMESTAMP
+        yield from self.formats
+
+    def _apply(self, strategy: str, cleaned: str) -> datetime:
+        return self._strategy_callable(strategy)(cleaned)
+
+    @staticmethod
+    def _strategy_callable(strategy: str) -> Callable[[str], datetime]:
+        if strategy == _ISO:
+            return _parse_iso
+        if strategy == _TIMESTAMP:
+            return _parse_timestamp
+        fast = _compile_format(strategy)
+        if fast is not None:
+            return fast
+
+        def _parse_format(token: str) -> datetime:
+            dt = datetime.strptime(token, strategy)
+            return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+        return _parse_format
+
+    @staticmethod
+    def _clean(token: str) -> str:
+        cleaned = token.strip()
+        if cleaned.endswith("Z"):
+            cleaned = f"{cleaned[:-1]}+00:00"
+        return cleaned
+
+
+default_datetime_parser = DateTimeParser()
+
@@ -2,7 +2,10 @@ from .payload import Payload
 from .binding import Binding
 from .external_key import ExternalKey
 from .keybinding import KeyBinding
+from .key_batch import KeyBatch
 from .projection import Projection
 from .sync_result import SyncResult
 from .sync_item_state import SyncItemState
-from .sync_item_status import SyncItemStatus
\ No newline at end of file
+from .sync_item_status import SyncItemStatus
+from .lease import Lease
+from .retry_entry import RetryEntry
\ No newline at end of file
@@ -0,0 +1,4 @@
+import sys
+
+# dataclass(slots=True) есть с 3.10; на старых версиях DTO остаются с __dict__
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -1,14 +1,16 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
 
 from . import Payload
+from ._slots import SLOTS
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class Binding:
     """Связка внешней сущности с внутренней: ID + версия."""
     internal_id: str
     version: Optional[str] = None  # e.g. etag/updated_at/hash
+    fingerprints: Optional[Mapping[str, str]] = field(default=None, compare=False)  # отпечатки полей на момент bind
 
     def is_up_to_date_for(self, payload: Payload) -> bool:
         """Версия внешних данных уже синхронизирована."""
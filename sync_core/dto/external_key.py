@@ -1,10 +1,29 @@
+import sys
 import typing
 from dataclasses import replace, dataclass
 from typing import Any, Mapping, Optional
 from datetime import datetime
 
 
-@dataclass(frozen=True)
-class ExternalKey:  # стабильный ключ во внешней системе
+@dataclass(frozen=True)
+class ExternalKey:  # стабильный ключ во внешней системе
+    """
+    __slots__ без __dict__, system интернируется (один объект строки на систему),
+    хэш считается один раз — ключи миллионами лежат в set/dict при дедупе и поиске удалённых.
+    Хэш и равенство — как у обычного frozen dataclass по (system, key).
+    """
+    __slots__ = ("system", "key", "_hash")
+
     system: str
     key: str
+
+    def __post_init__(self):
+        system = sys.intern(self.system) if type(self.system) is str else self.system
+        object.__setattr__(self, "system", system)
+        object.__setattr__(self, "_hash", hash((system, self.key)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (self.system, self.key)
@@ -0,0 +1,47 @@
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from . import ExternalKey
+from ._slots import SLOTS
+
+
+@dataclass(frozen=True, **SLOTS)
+class KeyBatch:
+    """Ключи одной системы в колоночном виде: system один раз + кортеж ключей.
+    Для bulk-операций (IN (...), пакетные удаления) без миллиона отдельных ExternalKey."""
+    system: str
+    keys: tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "system", sys.intern(self.system))
+        if type(self.keys) is not tuple:
+            object.__setattr__(self, "keys", tuple(self.keys))
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[ExternalKey], *, size: Optional[int] = None) -> list["KeyBatch"]:
+        """Группирует ключи по system (порядок первого появления, без дублей) и режет на пачки по size."""
+        by_system: dict[str, dict[str, None]] = {}
+        for key in keys:
+            by_system.setdefault(key.system, {})[key.key] = None
+        batches: list[KeyBatch] = []
+        for system, ext_keys in by_system.items():
+            batches.extend(cls(system, tuple(ext_keys)).chunks(size))
+        return batches
+
+    def chunks(self, size: Optional[int]) -> Iterator["KeyBatch"]:
+        if not size or len(self.keys) <= size:
+            yield self
+            return
+        for start in range(0, len(self.keys), size):
+            yield KeyBatch(self.system, self.keys[start:start + size])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[ExternalKey]:
+        system = self.system
+        return (ExternalKey(system, key) for key in self.keys)
+
+    def __contains__(self, item: object) -> bool:
+        return isinstance(item, ExternalKey) and item.system == self.system and item.key in self.keys
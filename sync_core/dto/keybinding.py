@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 
 from . import ExternalKey, Binding
+from ._slots import SLOTS
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class KeyBinding:
     key: ExternalKey
     binding: Binding
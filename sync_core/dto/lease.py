@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from ._slots import SLOTS
+
+
+@dataclass(frozen=True, **SLOTS)
+class Lease:
+    """Аренда потока воркером. token — fencing token: растёт при каждом захвате потока."""
+    stream: str
+    owner: str
+    token: int
+    expires_at: datetime
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
-from datetime import datetime, timezone
-import hashlib
-import json
-from typing import Any, Optional, Generic, TypeVar, Union
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Hashable, Iterable, Mapping, Optional, Generic, TypeVar, Union
+
+from ..datetime_parser import DateTimeParser, default_datetime_parser
+from ..hashing import CanonicalHasher, DEFAULT_HASH_ALGORITHM, project_fields, field_fingerprints, changed_fields
 
 TSource = TypeVar("TSource")
 SelfPayload = TypeVar("SelfPayload", bound="Payload")
@@ -15,21 +16,22 @@ class Payload(Generic[TSource]):
     """Нормализованные данные из источника."""
     data: TSource
     version: Optional[str] = None  # etag/updated_at/hash
-
-    _FALLBACK_DATETIME_FORMATS = (
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%d %H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%d %H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S.%f%z",
-    )
+    # отпечатки полей {путь: хэш} — чтобы знать, какие поля поменялись с прошлой синхронизации
+    fingerprints: Optional[Mapping[str, str]] = field(default=None, compare=False)
 
     @classmethod
-    def with_version_from_datetime(cls, data: TSource, dt: VersionValue) -> SelfPayload:
-        """Фабрика Payload с версией, рассчитанной из datetime/ts/строки."""
-        version = cls.version_from_datetime(dt)
+    def with_version_from_datetime(
+            cls,
+            data: TSource,
+            dt: VersionValue,
+            *,
+            context: Hashable = None,
+            parser: Optional[DateTimeParser] = None,
+    ) -> SelfPayload:
+        """Фабрика Payload с версией, рассчитанной из datetime/ts/строки.
+        parser — парсер источника (BaseSource.datetime_parser), по умолчанию общий;
+        context (например, имя поля) — ключ кэша формата в нём, без context формат не запоминается."""
+        version = cls.version_from_datetime(dt, context=context, parser=parser)
         return cls(data=data, version=version)
 
     @classmethod
@@ -39,18 +41,51 @@ class Payload(Generic[TSource]):
         return cls(data=data, version=version)
 
     @classmethod
-    def with_version_from_hash(cls, data: TSource) -> SelfPayload:
-        """Фабрика Payload с версией, рассчитанной по sha256 от сериализуемых данных."""
-        serialized_payload: JsonValue = cls._resolve_hash_payload(data)
-        version = cls.version_from_hash(serialized_payload)
-        return cls(data=data, version=version)
+    def with_version_from_hash(
+            cls,
+            data: TSource,
+            *,
+            algorithm: str = DEFAULT_HASH_ALGORITHM,
+            fields: Optional[Iterable[str]] = None,
+            exclude: Optional[Iterable[str]] = None,
+            fingerprints: bool = False,
+    ) -> SelfPayload:
+        """Фабрика Payload с версией по хэшу канонического JSON данных (см. sync_core.hashing).
+
+        fields/exclude — какие поля учитывать в версии (пути через точку: "CONTACT.NAME"),
+        чтобы изменения служебных полей (счётчики, last_seen) не давали новую версию.
+        fingerprints=True — дополнительно сохранить отпечатки полей для changed_fields().
+        """
+        if fields is None and exclude is None and not fingerprints:
+            return cls(data=data, version=cls._hash_payload(data, algorithm))
+
+        projected = project_fields(cls._resolve_mapping(data), fields, exclude)
+        version = cls.version_from_hash(projected, algorithm=algorithm)
+        field_prints = field_fingerprints(projected, fields) if fingerprints else None
+        return cls(data=data, version=version, fingerprints=field_prints)
+
+    def changed_fields(self, previous: Optional[Mapping[str, str]]) -> Optional[frozenset[str]]:
+        """Поля, изменившиеся относительно прошлых отпечатков; None — отпечатков нет, считаем всё изменённым."""
+        return changed_fields(self.fingerprints, previous)
 
     @staticmethod
-    def version_from_datetime(value: VersionValue) -> str:
+    def version_from_datetime(
+            value: VersionValue, *, context: Hashable = None, parser: Optional[DateTimeParser] = None) -> str:
         """Форматирует дату/время (str/datetime/timestamp) в ISO-строку под Payload.version."""
-        dt = Payload._parse_datetime_value(value)
+        dt = Payload._parse_datetime_value(value, context, parser)
         return Payload._format_datetime(dt)
 
+    @staticmethod
+    def versions_from_datetimes(
+            values: Iterable[VersionValue],
+            *,
+            context: Hashable = None,
+            parser: Optional[DateTimeParser] = None,
+    ) -> list[str]:
+        """version_from_datetime для целой страницы: формат подбирается один раз (DateTimeParser.parse_many)."""
+        parsed = (parser or default_datetime_parser).parse_many(values, context=context)
+        return [DateTimeParser.format(dt) for dt in parsed]
+
     @staticmethod
     def version_from_monotonic(value: VersionValue) -> str:
         """Форматирует монотонный id в строку версии (проверяет на неотрицательное)."""
@@ -60,19 +95,22 @@ class Payload(Generic[TSource]):
         return str(int_value)
 
     @staticmethod
-    def version_from_hash(payload: Any) -> str:
-        """Вычисляет sha256 от JSON-представления payload для версионирования без updated_at."""
+    def version_from_hash(payload: Any, *, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+        """Хэш JSON-представления payload для версионирования без updated_at.
+
+        sha256 по умолчанию совпадает со старой схемой sha256(json.dumps(sort_keys=True)).
+        """
         try:
-            dump = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+            return CanonicalHasher(algorithm).update(payload).hexdigest()
         except (TypeError, ValueError) as exc:
             raise ValueError(f"cannot hash payload: {exc}") from exc
-        return hashlib.sha256(dump.encode("utf-8")).hexdigest()
 
     @staticmethod
-    def _resolve_hash_payload(data: Any) -> JsonValue:
+    def _hash_payload(data: Any, algorithm: str) -> str:
+        """Один проход сериализации: сначала сами данные, потом их version_payload/serialize/to_dict."""
+        hasher = CanonicalHasher(algorithm)  # неизвестный algorithm — ValueError сразу, а не «не сериализуется»
         try:
-            json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
-            return data
+            return hasher.update(data).hexdigest()
         except (TypeError, ValueError):
             pass
 
@@ -85,52 +123,29 @@ class Payload(Generic[TSource]):
             if callable(factory):
                 payload = factory()
                 try:
-                    json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+                    return CanonicalHasher(algorithm).update(payload).hexdigest()
                 except (TypeError, ValueError):
                     continue
-                return payload
 
         raise ValueError("payload is not JSON-serializable and no serializer found")
 
     @staticmethod
-    def _parse_datetime_value(value: VersionValue) -> datetime:
-        if isinstance(value, datetime):
-            dt = value
-        elif isinstance(value, (int, float)):
-            dt = datetime.fromtimestamp(float(value), tz=timezone.utc)
-        elif isinstance(value, str):
-            dt = Payload._parse_datetime_token(value)
-        else:
-            raise ValueError("expected datetime/str/timestamp")
-
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+    def _resolve_mapping(data: Any) -> Mapping[str, Any]:
+        if isinstance(data, Mapping):
+            return data
+        for name in ("version_payload", "serialize", "to_dict"):
+            factory = getattr(data, name, None)
+            if callable(factory):
+                payload = factory()
+                if isinstance(payload, Mapping):
+                    return payload
+        raise ValueError("field-projected hashing requires a mapping payload")
 
     @staticmethod
-    def _parse_datetime_token(token: str) -> datetime:
-        cleaned = token.strip()
-        if cleaned.endswith("Z"):
-            cleaned = f"{cleaned[:-1]}+00:00"
-        try:
-            return datetime.fromisoformat(cleaned)
-        except ValueError:
-            pass
-
-        try:
-            return datetime.fromtimestamp(float(cleaned), tz=timezone.utc)
-        except ValueError:
-            pass
-
-        for fmt in Payload._FALLBACK_DATETIME_FORMATS:
-            try:
-                return datetime.strptime(cleaned, fmt).replace(tzinfo=timezone.utc)
-            except ValueError:
-                continue
-
-        raise ValueError("cannot parse datetime")
+    def _parse_datetime_value(
+            value: VersionValue, context: Hashable = None, parser: Optional[DateTimeParser] = None) -> datetime:
+        return (parser or default_datetime_parser).parse_value(value, context=context)
 
     @staticmethod
     def _format_datetime(dt: datetime) -> str:
-        aware = dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-        return aware.astimezone(timezone.utc).isoformat()
+        return DateTimeParser.format(dt)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Mapping, Generic, TypeVar
+from typing import Any, FrozenSet, Mapping, Generic, Optional, TypeVar
 
 TTarget = TypeVar("TTarget")  # что нужен Target'у
 
@@ -8,4 +8,7 @@ TTarget = TypeVar("TTarget")  # что нужен Target'у
 class Projection(Generic[TTarget]):
     """Что писать в приёмник."""
     kind: str
-    data: TTarget  # вместо dict fields
\ No newline at end of file
+    data: TTarget  # вместо dict fields
+    # поля источника, изменившиеся с прошлой синхронизации (по Payload.fingerprints);
+    # None — неизвестно, приёмник пишет сущность целиком
+    changed_fields: Optional[FrozenSet[str]] = None
\ No newline at end of file
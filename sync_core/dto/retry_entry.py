@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from . import ExternalKey
+from ._slots import SLOTS
+
+
+@dataclass(frozen=True, **SLOTS)
+class RetryEntry:
+    """Ключ в очереди ретраев потока: сколько попыток уже было и когда следующая."""
+    key: ExternalKey
+    attempts: int
+    next_attempt_at: datetime
@@ -3,9 +3,10 @@ from dataclasses import dataclass
 
 from . import ExternalKey
 from .sync_item_status import SyncItemStatus
+from ._slots import SLOTS
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **SLOTS)
 class SyncItemState:
     key: ExternalKey
     version: Optional[str]
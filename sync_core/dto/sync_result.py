@@ -12,10 +12,11 @@ class SyncResult:
     updated: int = 0
     skipped: int = 0
     failed: int = 0
+    deleted: int = 0
     started_at: datetime = datetime.utcnow()  # при необходимости можно заменить на default_factory  # TODO
 
     def inc(self, *, created: int = 0, updated: int = 0, skipped: int = 0, failed: int = 0,
-            ) -> SelfSyncResult:
+            deleted: int = 0) -> SelfSyncResult:
         """Возвращает новый SyncResult с увеличенными счётчиками."""
         return replace(
             self,
@@ -23,6 +24,12 @@ class SyncResult:
             updated=self.updated + updated,
             skipped=self.skipped + skipped,
             failed=self.failed + failed,
+            deleted=self.deleted + deleted,
         )
 
+    def merge(self, other: "SyncResult") -> SelfSyncResult:
+        """Складывает счётчики двух результатов (started_at остаётся от self)."""
+        return self.inc(created=other.created, updated=other.updated, skipped=other.skipped, failed=other.failed,
+                        deleted=other.deleted)
+
 
@@ -55,4 +55,16 @@ class TemporaryStateError(StateError, TemporaryError):
 
 
 class PermanentStateError(StateError, PermanentError):
-    """Постоянная ошибка хранилища состояния."""
+    """Постоянная ошибка хранилища состояния."""
+
+
+class LeaseError(StateError):
+    """Ошибка аренды потока."""
+
+
+class LeaseBusyError(LeaseError):
+    """Поток уже обрабатывает другой воркер (аренда не истекла)."""
+
+
+class LeaseLostError(LeaseError):
+    """Аренда истекла или перехвачена другим воркером — писать чекпоинт нельзя."""
@@ -0,0 +1,226 @@
+"""Канонический хэш JSON-данных для Payload.version.
+
+Байты, которые уходят в хэш, совпадают с
+json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8"),
+поэтому sha256-версии, посчитанные раньше через json.dumps, остаются валидными.
+
+Строка целиком не собирается: верхние уровни структуры обходятся здесь, а поддеревья глубже
+chunk_depth сериализуются C-энкодером json по одному и сразу скармливаются хэшу.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+_SEPARATORS = (",", ":")
+_encode_chunk = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=_SEPARATORS).encode
+_encode_string = json.encoder.encode_basestring  # то же экранирование, что и при ensure_ascii=False
+
+_FLOAT_CONSTANTS = {float("inf"): "Infinity", float("-inf"): "-Infinity"}
+
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+
+def _new_hasher(algorithm: str) -> Any:
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=32)
+    if algorithm == "xxh3":
+        try:
+            import xxhash
+        except ImportError as exc:  # опциональная зависимость
+            raise ValueError("xxh3 hashing requires the 'xxhash' package") from exc
+        return xxhash.xxh3_128()
+    raise ValueError(f"unknown hash algorithm: {algorithm}")
+
+
+def _float_repr(value: float) -> str:
+    if value != value:
+        return "NaN"
+    return _FLOAT_CONSTANTS.get(value) or float.__repr__(value)
+
+
+def _encode_key(key: Any) -> str:
+    """Ключ dict в строку по правилам json.dumps."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, float):
+        return _float_repr(key)
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+class CanonicalHasher:
+    """
+    Потоковый хэш канонического JSON.
+
+    algorithm:
+    - "sha256" — совместим со старыми версиями, результат без префикса;
+    - "blake2b" — быстрее sha256 на больших данных, версия вида "blake2b:<hex>";
+    - "xxh3" — некриптографический, самый быстрый, нужен пакет xxhash; версия "xxh3:<hex>".
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_HASH_ALGORITHM, *, chunk_depth: int = 2):
+        self.algorithm = algorithm
+        self.chunk_depth = chunk_depth
+        self._hasher = _new_hasher(algorithm)
+        self._update: Callable[[bytes], None] = self._hasher.update
+
+    def update(self, value: Any) -> "CanonicalHasher":
+        """Добавляет JSON-значение целиком. TypeError/ValueError — если значение не сериализуется."""
+        self._walk(value, 0, set())
+        return self
+
+    def update_raw(self, text: str) -> "CanonicalHasher":
+        """Добавляет уже готовый кусок канонического JSON (скобки, ключи, разделители)."""
+        self._update(text.encode("utf-8"))
+        return self
+
+    def hexdigest(self) -> str:
+        digest = self._hasher.hexdigest()
+        return digest if self.algorithm == "sha256" else f"{self.algorithm}:{digest}"
+
+    def _walk(self, value: Any, depth: int, markers: set) -> None:
+        if depth >= self.chunk_depth or not isinstance(value, (dict, list, tuple)) or not value:
+            self._update(_encode_chunk(value).encode("utf-8"))
+            return
+
+        marker = id(value)
+        if marker in markers:
+            raise ValueError("Circular reference detected")
+        markers.add(marker)
+        update = self._update
+        if isinstance(value, dict):
+            separator = b"{"
+            for key, item in sorted(value.items()):
+                update(separator + _encode_string(_encode_key(key)).encode("utf-8") + b":")
+                self._walk(item, depth + 1, markers)
+                separator = b","
+            update(b"}")
+        else:
+            separator = b"["
+            for item in value:
+                update(separator)
+                self._walk(item, depth + 1, markers)
+                separator = b","
+            update(b"]")
+        markers.discard(marker)
+
+
+def canonical_hash(value: Any, algorithm: str = DEFAULT_HASH_ALGORITHM) -> str:
+    return CanonicalHasher(algorithm).update(value).hexdigest()
+
+
+def legacy_hash(value: Any) -> str:
+    """Исходная схема: sha256 от полной строки json.dumps. Для сверки и миграций версий."""
+    dump = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=_SEPARATORS)
+    return hashlib.sha256(dump.encode("utf-8")).hexdigest()
+
+
+
+_MISSING = object()
+
+
+def _split_paths(paths: Iterable[str]) -> dict:
+    """["a.b", "a.c", "d"] -> {"a": {"b": {}, "c": {}}, "d": {}}; пустой словарь — поле целиком."""
+    tree: dict = {}
+    for path in paths:
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            if node.get(part, None) == {}:
+                break  # родитель уже выбран целиком
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = {}
+    return tree
+
+
+def _select(value: Any, tree: dict) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, (list, tuple)):  # путь через список применяется к каждому элементу
+        selected = (_select(item, tree) for item in value)
+        return [item for item in selected if item is not _MISSING]  # скаляры без вложенных полей — мимо
+    if not isinstance(value, Mapping):
+        return _MISSING
+    result = {}
+    for name, subtree in tree.items():
+        if name in value:
+            selected = _select(value[name], subtree)
+            if selected is not _MISSING:
+                result[name] = selected
+    return result
+
+
+def _drop(value: Any, tree: dict) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_drop(item, tree) for item in value]
+    if not isinstance(value, Mapping):
+        return value
+    result = {}
+    for name, item in value.items():
+        subtree = tree.get(name)
+        if subtree is None:
+            result[name] = item
+        elif subtree:
+            result[name] = _drop(item, subtree)
+    return result
+
+
+def project_fields(
+        data: Mapping[str, Any],
+        fields: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Оставляет в data только поля fields и убирает exclude. Пути — через точку ("CONTACT.NAME");
+    сегмент, попавший на список, применяется к каждому его элементу. Отсутствующие поля пропускаются.
+    """
+    result = data
+    if fields is not None:
+        tree = _split_paths(fields)
+        result = _select(data, tree) if tree else {}
+    if exclude is not None:
+        result = _drop(result, _split_paths(exclude))
+    return dict(result)
+
+
+def field_fingerprints(
+        data: Mapping[str, Any],
+        fields: Optional[Iterable[str]] = None,
+        *,
+        digest_size: int = 8,
+) -> dict[str, str]:
+    """
+    Короткие отпечатки полей: {путь: blake2b(канонический JSON значения)}.
+    fields=None — по всем полям верхнего уровня. Нужны, чтобы понять, какие поля поменялись.
+    """
+    paths = list(fields) if fields is not None else list(data)
+    result: dict[str, str] = {}
+    for path in paths:
+        selected = _select(data, _split_paths([path]))
+        if not selected:
+            continue  # поля нет в данных
+        hasher = hashlib.blake2b(digest_size=digest_size)
+        hasher.update(_encode_chunk(selected).encode("utf-8"))
+        result[path] = hasher.hexdigest()
+    return result
+
+
+def changed_fields(
+        current: Optional[Mapping[str, str]],
+        previous: Optional[Mapping[str, str]],
+) -> Optional[frozenset[str]]:
+    """Поля, у которых отпечаток изменился, появился или пропал; None — сравнить не с чем."""
+    if current is None or previous is None:
+        return None
+    keys = set(current) | set(previous)
+    return frozenset(key for key in keys if current.get(key) != previous.get(key))
@@ -0,0 +1,292 @@
+"""
+Инструментация SyncJob: время по стадиям и профили самых медленных элементов.
+
+SyncJob(instrumentation=SyncInstrumentation()) оборачивает source/mapper/target/state в прокси,
+которые замеряют каждый вызов; без instrumentation ничего не оборачивается и накладных расходов нет.
+"""
+import cProfile
+import heapq
+import io
+import itertools
+import pstats
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+STAGE_FETCH = "fetch"                      # source.fetch и ожидание каждого следующего элемента
+STAGE_RETRY_FETCH = "retry.fetch"          # source.fetch_by_keys в SyncJob.run_retries()
+STAGE_SOURCE_VALIDATE = "source.validate"
+STAGE_MAPPER_VALIDATE = "mapper.validate"
+STAGE_MAP = "map"
+STAGE_TARGET_VALIDATE = "target.validate"
+STAGE_TARGET_UPSERT = "target.upsert"      # upsert и upsert_many
+STAGE_TARGET_DELETE = "target.delete"      # delete и delete_many
+STAGE_STATE_READ = "state.read"
+STAGE_STATE_WRITE = "state.write"
+STAGE_CHECKPOINT = "checkpoint"
+
+_SOURCE_STAGES = {"fetch": STAGE_FETCH, "fetch_by_keys": STAGE_RETRY_FETCH, "validate": STAGE_SOURCE_VALIDATE}
+_MAPPER_STAGES = {"validate": STAGE_MAPPER_VALIDATE, "map": STAGE_MAP}
+_TARGET_STAGES = {
+    "validate": STAGE_TARGET_VALIDATE,
+    "upsert": STAGE_TARGET_UPSERT,
+    "upsert_many": STAGE_TARGET_UPSERT,
+    "delete": STAGE_TARGET_DELETE,
+    "delete_many": STAGE_TARGET_DELETE,
+}
+_STATE_STAGES = {
+    "get_checkpoint": STAGE_STATE_READ,
+    "get_binding": STAGE_STATE_READ,
+    "get_bindings_bulk": STAGE_STATE_READ,
+    "get_item_state": STAGE_STATE_READ,
+    "get_item_states_bulk": STAGE_STATE_READ,
+    "iter_bindings": STAGE_STATE_READ,
+    "bind": STAGE_STATE_WRITE,
+    "unbind": STAGE_STATE_WRITE,
+    "save_item_state": STAGE_STATE_WRITE,
+    "flush": STAGE_STATE_WRITE,
+    "due_retries": STAGE_STATE_READ,
+    "schedule_retry": STAGE_STATE_WRITE,
+    "drop_retries": STAGE_STATE_WRITE,
+    "save_checkpoint": STAGE_CHECKPOINT,
+}
+
+
+@dataclass(frozen=True)
+class StageStats:
+    count: int
+    total: float    # секунды
+    max: float
+    errors: int
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class SyncInstrumentation:
+    """
+    Агрегат времени по стадиям: count/total/max/errors на стадию.
+
+    Каждый поток пишет в свой словарь без блокировок; snapshot() складывает их. Снимок во время
+    run() с workers > 1 приблизительный (потоки продолжают писать), после run() — точный.
+    profiler — необязательный SlowItemProfiler для профилей самых медленных элементов.
+    """
+
+    def __init__(self, *, profiler: Optional["SlowItemProfiler"] = None, clock: Callable[[], float] = time.perf_counter):
+        self.profiler = profiler
+        self.clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._per_thread: list[dict[str, list]] = []
+
+    def record(self, stage: str, elapsed: float, *, error: bool = False) -> None:
+        try:
+            stats = self._local.stats
+        except AttributeError:
+            stats = self._local.stats = {}
+            with self._lock:
+                self._per_thread.append(stats)
+        entry = stats.get(stage)
+        if entry is None:
+            entry = stats[stage] = [0, 0.0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+        if error:
+            entry[3] += 1
+
+    def snapshot(self, *, reset: bool = False) -> dict[str, StageStats]:
+        merged: dict[str, list] = {}
+        with self._lock:
+            for stats in self._per_thread:
+                for stage, (count, total, longest, errors) in list(stats.items()):
+                    entry = merged.setdefault(stage, [0, 0.0, 0.0, 0])
+                    entry[0] += count
+                    entry[1] += total
+                    entry[2] = max(entry[2], longest)
+                    entry[3] += errors
+                if reset:
+                    stats.clear()
+        return {stage: StageStats(*entry) for stage, entry in merged.items()}
+
+    def reset(self) -> None:
+        self.snapshot(reset=True)
+
+    def report(self) -> str:
+        """Таблица по стадиям, самые затратные сверху."""
+        rows = sorted(self.snapshot().items(), key=lambda item: item[1].total, reverse=True)
+        lines = [f"{'stage':<18}{'count':>10}{'total s':>11}{'mean ms':>10}{'max ms':>10}{'errors':>8}"]
+        for stage, stats in rows:
+            lines.append(
+                f"{stage:<18}{stats.count:>10}{stats.total:>11.3f}{stats.mean * 1000:>10.3f}"
+                f"{stats.max * 1000:>10.3f}{stats.errors:>8}")
+        return "\n".join(lines)
+
+    def wrap(self, source: Any, mapper: Any, target: Any, state: Any) -> tuple[Any, Any, Any, Any]:
+        """Прокси с замерами для компонентов SyncJob (отсутствующие необязательные методы остаются отсутствующими)."""
+        return (
+            _TimedSource(source, _SOURCE_STAGES, self),
+            _TimedProxy(mapper, _MAPPER_STAGES, self),
+            _TimedProxy(target, _TARGET_STAGES, self),
+            _TimedProxy(state, _STATE_STAGES, self),
+        )
+
+    def timed_iter(self, items: Iterable, stage: str = STAGE_FETCH) -> Iterator:
+        """Итератор, замеряющий ожидание каждого следующего элемента."""
+        iterator = iter(items)
+        clock, record = self.clock, self.record
+        while True:
+            started = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record(stage, clock() - started)
+                return
+            except BaseException:
+                record(stage, clock() - started, error=True)
+                raise
+            record(stage, clock() - started)
+            yield item
+
+
+class _TimedProxy:
+    """Прокси компонента: методы из stages замеряются, остальные атрибуты отдаются как есть."""
+
+    def __init__(self, inner: Any, stages: dict[str, str], instrumentation: SyncInstrumentation):
+        self._inner = inner
+        self._stages = stages
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._inner, name)
+        stage = self._stages.get(name)
+        if stage is None or not callable(attr):
+            return attr
+        timed = self._timed(attr, stage)
+        setattr(self, name, timed)  # следующий вызов — без __getattr__
+        return timed
+
+    def _timed(self, method: Callable, stage: str) -> Callable:
+        clock, record = self._instrumentation.clock, self._instrumentation.record
+
+        def _call(*args, **kwargs):
+            started = clock()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException:
+                record(stage, clock() - started, error=True)
+                raise
+            record(stage, clock() - started)
+            return result
+
+        return _call
+
+
+class _TimedSource(_TimedProxy):
+    def _timed(self, method: Callable, stage: str) -> Callable:
+        timed = super()._timed(method, stage)
+        if stage == STAGE_RETRY_FETCH:
+            def _fetch_by_keys(*args, **kwargs):
+                return self._instrumentation.timed_iter(timed(*args, **kwargs), stage)
+
+            return _fetch_by_keys
+        if stage != STAGE_FETCH:
+            return timed
+
+        def _fetch(*args, **kwargs):
+            items, checkpoint = timed(*args, **kwargs)
+            return self._instrumentation.timed_iter(items), checkpoint
+
+        return _fetch
+
+
+@dataclass(frozen=True)
+class SlowItem:
+    key: Any
+    seconds: float
+    profile: Any    # cProfile.Profile или объект профайлера из profiler_factory
+
+
+class SlowItemProfiler:
+    """
+    Профилирует каждый sample_every-й элемент и хранит профили top_n самых медленных.
+
+    profiler_factory — cProfile.Profile (по умолчанию) или, например, pyinstrument.Profiler:
+    годится объект с enable()/disable() или start()/stop(). Одновременно профилируется
+    один элемент (cProfile не вкладывается) — при workers > 1 остальные в это время просто выполняются.
+    """
+
+    def __init__(
+            self,
+            top_n: int = 10,
+            *,
+            sample_every: int = 1,
+            profiler_factory: Callable[[], Any] = cProfile.Profile,
+            clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.top_n = max(1, top_n)
+        self.sample_every = max(1, sample_every)
+        self.profiler_factory = profiler_factory
+        self.clock = clock
+        self._counter = itertools.count()
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        self._slowest: list[tuple[float, int, SlowItem]] = []  # min-heap по времени
+
+    def wrap(self, fn: Callable, key_of: Callable[..., Any]) -> Callable:
+        def _profiled(*args, **kwargs):
+            index = next(self._counter)
+            if index % self.sample_every or not self._active.acquire(blocking=False):
+                return fn(*args, **kwargs)
+            try:
+                profiler = self.profiler_factory()
+                start, stop = _profiler_controls(profiler)
+                started = self.clock()
+                start()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    stop()
+                    self._keep(SlowItem(key=key_of(*args, **kwargs), seconds=self.clock() - started, profile=profiler),
+                               index)
+            finally:
+                self._active.release()
+
+        return _profiled
+
+    def slowest(self) -> list[SlowItem]:
+        with self._lock:
+            return [item for _, _, item in sorted(self._slowest, reverse=True)]
+
+    def report(self, limit: int = 20) -> str:
+        """Профили самых медленных элементов: для cProfile — top `limit` функций по cumulative."""
+        parts = []
+        for item in self.slowest():
+            parts.append(f"=== {item.key} {item.seconds * 1000:.1f} ms")
+            parts.append(format_profile(item.profile, limit))
+        return "\n".join(parts)
+
+    def _keep(self, item: SlowItem, index: int) -> None:
+        entry = (item.seconds, index, item)
+        with self._lock:
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, entry)
+            elif entry[:2] > self._slowest[0][:2]:
+                heapq.heapreplace(self._slowest, entry)
+
+
+def _profiler_controls(profiler: Any) -> tuple[Callable[[], Any], Callable[[], Any]]:
+    if hasattr(profiler, "enable"):
+        return profiler.enable, profiler.disable
+    return profiler.start, profiler.stop
+
+
+def format_profile(profile: Any, limit: int = 20) -> str:
+    if hasattr(profile, "output_text"):  # pyinstrument
+        return profile.output_text()
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
@@ -2,4 +2,7 @@ from .source import Source, FetchResult, FetchedItems, CheckpointValue, Deferred
 from .mapper import Mapper
 from .state_store import StateStore
 from .sync_logger import SyncLogger
-from .target import Target
+from .target import Target, UpsertRequest, UpsertResult, DeleteRequest
+from .async_source import AsyncSource, AsyncFetchResult, AsyncFetchedItems
+from .async_state_store import AsyncStateStore
+from .async_target import AsyncTarget
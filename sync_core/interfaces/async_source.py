@@ -0,0 +1,24 @@
+from typing import Protocol, AsyncIterable, Optional, Union
+
+from ..dto import ExternalKey, Payload
+from ..dto.payload import TSource
+from .source import CheckpointValue, DeferredCheckpoint
+
+
+AsyncFetchedItems = AsyncIterable[tuple[ExternalKey, Payload[TSource]]]
+AsyncFetchResult = tuple[AsyncFetchedItems, Union[CheckpointValue, DeferredCheckpoint]]
+
+
+class AsyncSource(Protocol[TSource]):
+    """Асинхронный аналог Source: fetch отдаёт async-итератор изменений."""
+
+    async def fetch(self, since_token: Optional[str]) -> AsyncFetchResult:
+        """Возвращает:
+        - AsyncIterable пар (ExternalKey, Payload) с изменениями после since_token
+        - новый чекпоинт или отложенный чекпоинт (обычный callable), как в Source.fetch.
+        """
+        ...
+
+    def validate(self, key: ExternalKey, payload: Payload[TSource]) -> None:
+        """Проверяет техническую корректность данных источника, кидает SourceError при проблемах."""
+        ...
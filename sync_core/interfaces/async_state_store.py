@@ -0,0 +1,36 @@
+from typing import Protocol, Optional, Mapping
+
+from ..dto import ExternalKey, Binding, SyncItemState
+
+
+class AsyncStateStore(Protocol):
+    """Асинхронный аналог StateStore (семантика методов та же)."""
+
+    async def get_checkpoint(self, stream: str) -> Optional[str]:
+        ...
+
+    async def save_checkpoint(self, stream: str, token: str) -> None:
+        ...
+
+    async def bind(self, key: ExternalKey, internal_id: str, version: Optional[str], *,
+                   fingerprints: Optional[Mapping[str, str]] = None) -> None:
+        ...
+
+    async def get_binding(self, key: ExternalKey) -> Optional[Binding]:
+        ...
+
+    async def validate_binding(self, key: ExternalKey, binding: Binding) -> None:
+        ...
+
+    async def get_item_state(self, key: ExternalKey) -> Optional[SyncItemState]:
+        ...
+
+    async def save_item_state(self, state: SyncItemState) -> None:
+        ...
+
+    # Необязательные методы (async-версии одноимённых методов StateStore). В протоколе не объявлены:
+    # явный наследник получил бы заглушки, и AsyncSyncJob принял бы их за реализацию.
+    #
+    # async def get_bindings_bulk(self, keys: Iterable[ExternalKey]) -> Mapping[ExternalKey, Binding]
+    # async def get_item_states_bulk(self, keys: Iterable[ExternalKey]) -> Mapping[ExternalKey, SyncItemState]
+    # async def flush(self) -> None
@@ -0,0 +1,20 @@
+from typing import Protocol, Optional
+
+from ..dto import ExternalKey, Projection, Binding
+from ..dto.projection import TTarget
+
+
+class AsyncTarget(Protocol[TTarget]):
+    """Асинхронный аналог Target: запись в приёмник через await."""
+
+    async def upsert(self, key: ExternalKey, projection: Projection[TTarget], *, binding: Optional[Binding] = None) -> str:
+        """Создаёт/обновляет сущность по projection и возвращает internal_id (см. Target.upsert)."""
+        ...
+
+    async def delete(self, key: ExternalKey, binding: Binding) -> None:
+        """Удаляет/архивирует сущность в целевой системе по биндингу."""
+        ...
+
+    def validate(self, key: ExternalKey, projection: Projection[TTarget]) -> None:
+        """Проверяет, что проекция пригодна для записи в целевую систему, кидает TargetError."""
+        ...
@@ -24,3 +24,7 @@ class Source(Protocol[TSource]):
     def validate(self, key: ExternalKey, payload: Payload[TSource]) -> None:
         """Проверяет техническую корректность данных источника, кидает SourceError при проблемах."""
         ...
+
+    # Необязательный метод (не объявлен здесь, чтобы наследники BaseSource не получали пустую заглушку):
+    # fetch_by_keys(keys: list[ExternalKey]) -> FetchedItems — текущие данные только этих ключей
+    # (отсутствующие в источнике просто не возвращаются). Нужен SyncJob(retry_queue=True).
@@ -1,6 +1,6 @@
-from typing import Protocol, Iterable, Optional
+from typing import Protocol, Iterable, Optional, Mapping
 
-from ..dto import ExternalKey, Binding, KeyBinding, SyncItemState
+from ..dto import ExternalKey, Binding, KeyBinding, Lease, SyncItemState
 
 
 class StateStore(Protocol):
@@ -16,12 +16,16 @@ class StateStore(Protocol):
         """Возвращает сохранённый чекпоинт для потока stream."""
         ...
 
-    def save_checkpoint(self, stream: str, token: str) -> None:
-        """Сохраняет чекпоинт token для потока stream."""
+    def save_checkpoint(self, stream: str, token: str, *, lease: Optional[Lease] = None) -> None:
+        """Сохраняет чекпоинт token для потока stream.
+        С lease — только если аренда ещё наша (проверка и запись атомарно), иначе LeaseLostError.
+        lease SyncJob передаёт, только если сам работает с арендой (SyncJob(lease_ttl=...))."""
         ...
 
-    def bind(self, key: ExternalKey, internal_id: str, version: Optional[str]) -> None:
-        """Связывает внешний ключ key с internal_id и версией version."""
+    def bind(self, key: ExternalKey, internal_id: str, version: Optional[str], *,
+             fingerprints: Optional[Mapping[str, str]] = None) -> None:
+        """Связывает внешний ключ key с internal_id и версией version.
+        fingerprints (отпечатки полей Payload) SyncJob передаёт, только если они есть у Payload."""
         ...
 
     def get_binding(self, key: ExternalKey) -> Optional[Binding]:
@@ -29,7 +33,8 @@ class StateStore(Protocol):
         ...
 
     def iter_bindings(self, system: str) -> Iterable[KeyBinding]:
-        """Итерация по всем биндингам для системы (нужно для поиска удалённых во внешнем снапшоте)."""
+        """Итерация по всем биндингам для системы (нужно для поиска удалённых во внешнем снапшоте).
+        Должна идти с постоянной памятью и допускать unbind во время обхода."""
         ...
 
     def validate_binding(self, key: ExternalKey, binding: Binding) -> None:
@@ -43,3 +48,29 @@ class StateStore(Protocol):
     def save_item_state(self, state: SyncItemState) -> None:
         """Сохраняет/обновляет состояние обработки по ключу."""
         ...
+
+    # Необязательные методы не объявлены здесь: наследник StateStore получил бы пустую заглушку,
+    # и SyncJob принял бы её за реализацию. SyncJob ищет их через getattr.
+    #
+    # get_bindings_bulk(keys: Iterable[ExternalKey]) -> Mapping[ExternalKey, Binding] — пакетный
+    # get_binding, словарь только по найденным ключам. Без него — get_binding по каждому ключу.
+    # get_item_states_bulk(keys: Iterable[ExternalKey]) -> Mapping[ExternalKey, SyncItemState] — то же
+    # для get_item_state.
+    # flush() -> None — дописывает отложенные (буферизованные) записи bind/save_item_state;
+    # SyncJob вызывает его перед сохранением чекпоинта и в конце run().
+    # unbind(key: ExternalKey) -> None — удаляет связь для key (сущность удалена в приёмнике);
+    # обязателен для SyncJob(detect_deletions=True).
+    #
+    # Аренда потока, все три обязательны для SyncJob(lease_ttl=...):
+    # acquire_lease(stream: str, owner: str, ttl: float) -> Optional[Lease] — захватывает поток на ttl секунд,
+    # если он свободен или аренда истекла; иначе None.
+    # heartbeat_lease(lease: Lease, ttl: float) -> Lease — продлевает аренду; LeaseLostError, если она
+    # истекла или перехвачена.
+    # release_lease(lease: Lease) -> None — освобождает аренду досрочно.
+    #
+    # Очередь ретраев, все три обязательны для SyncJob(retry_queue=True):
+    # schedule_retry(stream: str, key: ExternalKey, attempts: int, delay: float) -> None — ставит
+    # (или переставляет) key в очередь потока, следующая попытка через delay секунд.
+    # due_retries(stream: str, limit: int) -> list[RetryEntry] — до limit ключей, чьё время уже наступило,
+    # самые давние первыми.
+    # drop_retries(stream: str, keys: Iterable[ExternalKey]) -> None — убирает ключи из очереди.
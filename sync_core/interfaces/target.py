@@ -1,7 +1,12 @@
-from typing import Protocol, Optional
+from typing import Protocol, Optional, Union
 
 from ..dto import ExternalKey, Projection, Binding
 from ..dto.projection import TTarget
+from ..errors import SyncError
+
+UpsertRequest = tuple[ExternalKey, Projection[TTarget], Optional[Binding]]
+UpsertResult = Union[str, SyncError]  # internal_id или ошибка конкретного элемента
+DeleteRequest = tuple[ExternalKey, Binding]
 
 
 class Target(Protocol[TTarget]):
@@ -10,6 +15,8 @@ class Target(Protocol[TTarget]):
     def upsert(self, key: ExternalKey, projection: Projection[TTarget], *, binding: Optional[Binding] = None) -> str:
         """Создаёт/обновляет сущность по projection, связав её с key, и возвращает internal_id.
         binding — сохранённый Binding для ключа, если он есть (используется для различения create/update).
+        projection.changed_fields — изменившиеся поля источника (если Payload несёт fingerprints):
+        можно отправить частичное обновление (например, crm.deal.update только с этими полями).
         """
         ...  # возвращает внутренний id
 
@@ -20,3 +27,16 @@ class Target(Protocol[TTarget]):
     def validate(self, key: ExternalKey, projection: Projection[TTarget]) -> None:
         """Проверяет, что проекция пригодна для записи в целевую систему, кидает TargetError."""
         ...
+
+    # Необязательные методы не объявлены здесь: наследник Target получил бы пустую заглушку,
+    # и SyncJob принял бы её за реализацию.
+    #
+    # upsert_many(items: Sequence[UpsertRequest]) -> Sequence[UpsertResult] — пакетный upsert
+    # (Bitrix batch, bulk insert в БД). По одному результату на элемент в том же порядке: internal_id
+    # или исключение (TemporaryTargetError/PermanentTargetError/...), которое обработается так же,
+    # как при upsert. Исключение из самого вызова — ошибка каждого элемента пачки.
+    # Без метода SyncJob пишет элементы по одному через upsert.
+    #
+    # delete_many(items: Sequence[DeleteRequest]) -> Sequence[Optional[SyncError]] — пакетное удаление:
+    # по одному результату на элемент в том же порядке, None (удалено) или исключение этого элемента.
+    # Без метода SyncJob вызывает delete по одному.
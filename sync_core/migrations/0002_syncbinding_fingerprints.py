@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync_core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="syncbinding",
+            name="fingerprints",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
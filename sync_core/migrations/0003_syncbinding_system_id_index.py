@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync_core", "0002_syncbinding_fingerprints"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="syncbinding",
+            index=models.Index(fields=["system", "id"], name="sync_core_syncbinding_sys_id"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync_core", "0003_syncbinding_system_id_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncLease",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stream", models.CharField(max_length=128, unique=True)),
+                ("owner", models.CharField(blank=True, default="", max_length=128)),
+                ("token", models.BigIntegerField(default=0)),
+                ("expires_at", models.DateTimeField()),
+                ("heartbeat_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "sync_lease",
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sync_core", "0004_synclease"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncRetry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stream", models.CharField(max_length=128)),
+                ("system", models.CharField(max_length=64)),
+                ("ext_key", models.CharField(max_length=255)),
+                ("attempts", models.IntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "sync_retry",
+                "unique_together": {("stream", "system", "ext_key")},
+                "indexes": [models.Index(fields=["stream", "next_attempt_at"], name="sync_core_syncretry_due")],
+            },
+        ),
+    ]
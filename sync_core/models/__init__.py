@@ -2,16 +2,24 @@ from .default import (
     AbstractSyncBinding,
     AbstractSyncCheckpoint,
     AbstractSyncItemState,
+    AbstractSyncLease,
+    AbstractSyncRetry,
     SyncBinding,
     SyncCheckpoint,
     SyncItemState,
+    SyncLease,
+    SyncRetry,
 )
 
 __all__ = [
     "AbstractSyncBinding",
     "AbstractSyncCheckpoint",
     "AbstractSyncItemState",
+    "AbstractSyncLease",
+    "AbstractSyncRetry",
     "SyncBinding",
     "SyncCheckpoint",
     "SyncItemState",
+    "SyncLease",
+    "SyncRetry",
 ]
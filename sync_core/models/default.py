@@ -7,10 +7,12 @@ class AbstractSyncBinding(models.Model):
     ext_key = models.CharField(max_length=255, db_index=True)
     internal_id = models.CharField(max_length=64)
     version = models.CharField(max_length=128, blank=True, default="")
+    fingerprints = models.JSONField(null=True, blank=True)  # отпечатки полей Payload на момент bind
 
     class Meta:
         abstract = True
         unique_together = (("system", "ext_key"),)
+        indexes = [models.Index(fields=["system", "id"], name="%(app_label)s_%(class)s_sys_id")]  # iter_bindings
 
     class Admin(admin.ModelAdmin):
         list_display = ("system", "ext_key", "internal_id", "version")
@@ -27,6 +29,40 @@ class AbstractSyncCheckpoint(models.Model):
         list_display = ("stream", "token",)
 
 
+class AbstractSyncLease(models.Model):
+    """Аренда потока: один воркер на stream. token — fencing token, растёт при каждом захвате."""
+    stream = models.CharField(max_length=128, unique=True)
+    owner = models.CharField(max_length=128, blank=True, default="")
+    token = models.BigIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    class Admin(admin.ModelAdmin):
+        list_display = ("stream", "owner", "token", "expires_at", "heartbeat_at")
+
+
+class AbstractSyncRetry(models.Model):
+    """Очередь ретраев TEMP_ERROR: ключ потока и время следующей попытки (SyncJob.run_retries)."""
+    stream = models.CharField(max_length=128)
+    system = models.CharField(max_length=64)
+    ext_key = models.CharField(max_length=255)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+        unique_together = (("stream", "system", "ext_key"),)
+        indexes = [models.Index(fields=["stream", "next_attempt_at"], name="%(app_label)s_%(class)s_due")]
+
+    class Admin(admin.ModelAdmin):
+        list_display = ("stream", "system", "ext_key", "attempts", "next_attempt_at")
+        list_filter = ("stream",)
+        search_fields = ("ext_key",)
+
+
 class AbstractSyncItemState(models.Model):
     system = models.CharField(max_length=64)
     ext_key = models.CharField(max_length=255, db_index=True)
@@ -62,6 +98,16 @@ class SyncCheckpoint(AbstractSyncCheckpoint):
         db_table = "sync_checkpoint"
 
 
+class SyncLease(AbstractSyncLease):
+    class Meta(AbstractSyncLease.Meta):
+        db_table = "sync_lease"
+
+
+class SyncRetry(AbstractSyncRetry):
+    class Meta(AbstractSyncRetry.Meta):
+        db_table = "sync_retry"
+
+
 class SyncItemState(AbstractSyncItemState):
     class Meta(AbstractSyncItemState.Meta):
         db_table = "sync_item_state"
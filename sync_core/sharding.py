@@ -0,0 +1,164 @@
+"""
+Шардирование одного потока: ключи делятся на N шардов по стабильному хэшу ExternalKey.key,
+у каждого шарда свой чекпоинт ("stream#shard") и свой SyncJob, шарды идут в пуле процессов.
+"""
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+from .dto import ExternalKey, SyncResult
+from .interfaces import Source, StateStore
+from .interfaces.source import FetchResult
+
+
+def shard_of(key: Union[ExternalKey, str], shards: int) -> int:
+    """Номер шарда ключа. crc32, а не hash(): hash строк в каждом процессе свой."""
+    raw = key.key if isinstance(key, ExternalKey) else key
+    return zlib.crc32(raw.encode("utf-8")) % shards
+
+
+def shard_stream(stream: str, shard: int) -> str:
+    return f"{stream}#{shard}"
+
+
+class ShardedSource:
+    """
+    Source, отдающий только ключи своего шарда.
+
+    Если у источника есть fetch_shard(since_token, shard, shards) — шард выбирается на стороне API/БД;
+    иначе каждый шард читает всю выдачу и отбрасывает чужие ключи (CPU на маппинг/запись всё равно делится).
+    """
+
+    def __init__(self, source: Source, shard: int, shards: int):
+        if not 0 <= shard < shards:
+            raise ValueError(f"shard must be in [0, {shards})")
+        self.source = source
+        self.shard = shard
+        self.shards = shards
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "source":
+            raise AttributeError(name)  # copy/pickle до __init__
+        return getattr(self.source, name)  # checkpoint_type и прочее — как у исходного источника
+
+    def fetch(self, since_token: Optional[str]) -> FetchResult:
+        fetch_shard = getattr(self.source, "fetch_shard", None)
+        if fetch_shard is not None:
+            return fetch_shard(since_token, self.shard, self.shards)
+        items, checkpoint = self.source.fetch(since_token)
+        shard, shards = self.shard, self.shards
+        return ((key, payload) for key, payload in items if shard_of(key.key, shards) == shard), checkpoint
+
+    def validate(self, key, payload) -> None:
+        self.source.validate(key, payload)
+
+
+JobFactory = Callable[[str, int, int], Any]  # (shard_stream, shard, shards) -> SyncJob
+
+
+def _default_checkpoint_key(token: str) -> Any:
+    """Числа сравниваем как числа, остальное (ISO-даты updated_at) — как строки."""
+    try:
+        return 0, float(token)
+    except ValueError:
+        return 1, token
+
+
+def _run_shard(job_factory: JobFactory, stream: str, shard: int, shards: int) -> SyncResult:
+    job = job_factory(shard_stream(stream, shard), shard, shards)
+    try:
+        return job.run()
+    finally:
+        _close_db_connections()
+
+
+def _close_db_connections() -> None:
+    """Django-соединения не должны пересекать fork и оставаться открытыми в воркерах пула."""
+    try:
+        from django.conf import settings
+        if not settings.configured:
+            return
+        from django.db import connections
+    except ImportError:
+        return
+    connections.close_all()
+
+
+class ShardedSyncJob:
+    """
+    Координатор шардированного потока.
+
+    job_factory(shard_stream, shard, shards) собирает SyncJob шарда: stream=shard_stream,
+    source=ShardedSource(source, shard, shards). Для пула процессов фабрика должна пиклиться
+    (функция модуля или functools.partial от неё), а StateStore — быть общим (БД).
+
+    run():
+    - шард без своего чекпоинта стартует с чекпоинта родительского потока (переход с нешардированного);
+    - шарды работают параллельно, SyncResult'ы складываются;
+    - родительский чекпоинт = минимум чекпоинтов шардов (все шарды его прошли) и только вперёд;
+      для CURSOR-токенов нужен свой checkpoint_key, иначе сравнение бессмысленно;
+    - ошибка шарда пробрасывается после того, как остальные шарды закончили и родитель пересчитан.
+    """
+
+    def __init__(
+            self,
+            stream: str,
+            shards: int,
+            job_factory: JobFactory,
+            state: StateStore,
+            *,
+            executor_factory: Optional[Callable[[int], Executor]] = None,
+            checkpoint_key: Callable[[str], Any] = _default_checkpoint_key,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.stream = stream
+        self.shards = shards
+        self.job_factory = job_factory
+        self.state = state
+        self.executor_factory = executor_factory or (lambda workers: ProcessPoolExecutor(max_workers=workers))
+        self.checkpoint_key = checkpoint_key
+
+    def run(self) -> SyncResult:
+        self._seed_shard_checkpoints()
+        _close_db_connections()
+
+        result = SyncResult()
+        error: Optional[BaseException] = None
+        with self.executor_factory(self.shards) as executor:
+            futures = [
+                executor.submit(_run_shard, self.job_factory, self.stream, shard, self.shards)
+                for shard in range(self.shards)
+            ]
+            for future in futures:
+                try:
+                    result = result.merge(future.result())
+                except BaseException as exc:  # остальные шарды дорабатывают, родителя всё равно пересчитаем
+                    if error is None:
+                        error = exc
+
+        self.advance_parent_checkpoint()
+        if error is not None:
+            raise error
+        return result
+
+    def advance_parent_checkpoint(self) -> Optional[str]:
+        """Сдвигает чекпоинт потока до минимального чекпоинта шардов; возвращает итоговый."""
+        parent = self.state.get_checkpoint(self.stream)
+        tokens = [self.state.get_checkpoint(shard_stream(self.stream, shard)) for shard in range(self.shards)]
+        if any(token is None for token in tokens):
+            return parent  # какой-то шард ещё ничего не прошёл
+        lowest = min(tokens, key=self.checkpoint_key)
+        if parent is None or self.checkpoint_key(lowest) > self.checkpoint_key(parent):
+            self.state.save_checkpoint(self.stream, lowest)
+            return lowest
+        return parent
+
+    def _seed_shard_checkpoints(self) -> None:
+        parent = self.state.get_checkpoint(self.stream)
+        if parent is None:
+            return
+        for shard in range(self.shards):
+            stream = shard_stream(self.stream, shard)
+            if self.state.get_checkpoint(stream) is None:
+                self.state.save_checkpoint(stream, parent)
@@ -1,4 +1,15 @@
-from .base import BaseStateStore
-from .default import DefaultStateStore
+__all__ = ["BaseStateStore", "CachedStateStore", "CacheStats", "DefaultStateStore"]
 
-__all__ = ["BaseStateStore", "DefaultStateStore"]
+
+def __getattr__(name):
+    # base/default тянут Django-модели — импортируем лениво, CachedStateStore Django не нужен
+    if name == "BaseStateStore":
+        from .base import BaseStateStore
+        return BaseStateStore
+    if name == "DefaultStateStore":
+        from .default import DefaultStateStore
+        return DefaultStateStore
+    if name in {"CachedStateStore", "CacheStats"}:
+        from . import cached
+        return getattr(cached, name)
+    raise AttributeError(name)
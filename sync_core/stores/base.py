@@ -1,14 +1,31 @@
-from typing import Iterable, Optional, Type
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Mapping, Optional, Type, Union
 
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import F
+from django.utils import timezone
 
-from ..dto import ExternalKey, Binding, KeyBinding, SyncItemState, SyncItemStatus
-from ..errors import StateError
+from ..dto import ExternalKey, Binding, KeyBatch, KeyBinding, Lease, RetryEntry, SyncItemState, SyncItemStatus
+from ..errors import LeaseLostError, StateError
 from ..interfaces import StateStore
 
 
 class BaseStateStore(StateStore):
-    """Базовая реализация StateStore на Django-моделях."""
+    """Базовая реализация StateStore на Django-моделях.
+
+    buffered=True включает write-behind: bind/save_item_state копятся в памяти и пишутся
+    одним bulk_create(update_conflicts=True) на таблицу в flush(). SyncJob вызывает flush()
+    перед каждой записью чекпоинта; при переполнении буфера flush происходит сам.
+
+    lease_model включает аренду потоков (acquire_lease/heartbeat_lease/release_lease) и
+    save_checkpoint(..., lease=) — запись чекпоинта только пока аренда наша. Сроки аренды считаются
+    по часам воркеров (timezone.now()), поэтому TTL берите с запасом на рассинхрон; от записи
+    устаревшим воркером защищает fencing token, а не время.
+
+    retry_model включает очередь ретраев (schedule_retry/due_retries/drop_retries) для SyncJob(retry_queue=True).
+    """
 
     def __init__(
         self,
@@ -16,52 +33,216 @@ class BaseStateStore(StateStore):
         binding_model: Type[models.Model],
         checkpoint_model: Type[models.Model],
         item_state_model: Type[models.Model],
+        bulk_lookup_size: int = 500,
+        buffered: bool = False,
+        buffer_size: int = 1000,
+        iter_chunk_size: int = 2000,
+        lease_model: Optional[Type[models.Model]] = None,
+        retry_model: Optional[Type[models.Model]] = None,
     ):
         self.binding_model = binding_model
         self.checkpoint_model = checkpoint_model
         self.item_state_model = item_state_model
+        self.lease_model = lease_model
+        self.retry_model = retry_model
+        self.bulk_lookup_size = max(1, bulk_lookup_size)  # размер IN (...) в одном запросе
+        self.buffered = buffered
+        self.buffer_size = max(1, buffer_size)  # сколько записей на таблицу держим до авто-flush
+        self.iter_chunk_size = max(1, iter_chunk_size)  # строк на один запрос в iter_bindings
+        self._buffer_lock = threading.RLock()
+        self._pending_bindings: dict[ExternalKey, Binding] = {}
+        self._pending_item_states: dict[ExternalKey, SyncItemState] = {}
 
     def get_checkpoint(self, stream: str) -> Optional[str]:
         row = self.checkpoint_model.objects.filter(stream=stream).only("token").first()
         return row.token if row else None
 
-    def save_checkpoint(self, stream: str, token: str) -> None:
-        self.checkpoint_model.objects.update_or_create(stream=stream, defaults={"token": token})
+    def save_checkpoint(self, stream: str, token: str, *, lease: Optional[Lease] = None) -> None:
+        if lease is None:
+            self.checkpoint_model.objects.update_or_create(stream=stream, defaults={"token": token})
+            return
+        lease_model = self._require_lease_model()
+        with transaction.atomic(using=lease_model.objects.db):
+            # строка аренды блокируется до коммита: перехватить поток между проверкой и записью нельзя
+            held = (
+                lease_model.objects.select_for_update()
+                .filter(stream=lease.stream, token=lease.token, expires_at__gt=timezone.now())
+                .values_list("id", flat=True)
+                .first()
+            )
+            if held is None:
+                raise LeaseLostError(f"lease on {lease.stream!r} (token {lease.token}) is lost")
+            self.checkpoint_model.objects.update_or_create(stream=stream, defaults={"token": token})
+
+    def acquire_lease(self, stream: str, owner: str, ttl: float) -> Optional[Lease]:
+        """Захватывает поток, если его аренда свободна или истекла; иначе None. Каждый захват — новый token."""
+        lease_model = self._require_lease_model()
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl)
+        self._ensure_lease_row(lease_model, stream, now)
+        with transaction.atomic(using=lease_model.objects.db):
+            taken = lease_model.objects.filter(stream=stream, expires_at__lte=now).update(
+                owner=owner, token=F("token") + 1, expires_at=expires_at, heartbeat_at=now)
+            if not taken:
+                return None
+            token = lease_model.objects.filter(stream=stream).values_list("token", flat=True).get()
+        return Lease(stream=stream, owner=owner, token=token, expires_at=expires_at)
+
+    @staticmethod
+    def _ensure_lease_row(lease_model: Type[models.Model], stream: str, now: datetime) -> None:
+        """Строка аренды создаётся при первом захвате, в своей транзакции: если её одновременно вставил
+        другой воркер, ловим IntegrityError и идём дальше — захват решает условный UPDATE
+        (get_or_create в общей транзакции на MySQL REPEATABLE READ не увидел бы чужую строку)."""
+        if lease_model.objects.filter(stream=stream).exists():
+            return
+        try:
+            with transaction.atomic(using=lease_model.objects.db):
+                lease_model.objects.create(stream=stream, expires_at=now)
+        except IntegrityError:
+            pass
+
+    def heartbeat_lease(self, lease: Lease, ttl: float) -> Lease:
+        """Продлевает аренду на ttl от текущего момента; LeaseLostError, если она уже истекла или перехвачена."""
+        lease_model = self._require_lease_model()
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl)
+        renewed = lease_model.objects.filter(stream=lease.stream, token=lease.token, expires_at__gt=now).update(
+            expires_at=expires_at, heartbeat_at=now)
+        if not renewed:
+            raise LeaseLostError(f"lease on {lease.stream!r} (token {lease.token}) is lost")
+        return replace(lease, expires_at=expires_at)
+
+    def release_lease(self, lease: Lease) -> None:
+        """Освобождает аренду досрочно; чужую (с другим token) не трогает."""
+        self._require_lease_model().objects.filter(stream=lease.stream, token=lease.token).update(
+            expires_at=timezone.now())
+
+    def _require_lease_model(self) -> Type[models.Model]:
+        if self.lease_model is None:
+            raise StateError(f"{type(self).__name__} has no lease_model")
+        return self.lease_model
+
+    def schedule_retry(self, stream: str, key: ExternalKey, attempts: int, delay: float) -> None:
+        self._require_retry_model().objects.update_or_create(
+            stream=stream,
+            system=key.system,
+            ext_key=key.key,
+            defaults={"attempts": attempts, "next_attempt_at": timezone.now() + timedelta(seconds=delay)},
+        )
+
+    def due_retries(self, stream: str, limit: int) -> list[RetryEntry]:
+        rows = (
+            self._require_retry_model().objects.filter(stream=stream, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")
+            .values_list("system", "ext_key", "attempts", "next_attempt_at")[:limit]
+        )
+        return [
+            RetryEntry(key=ExternalKey(system=system, key=ext_key), attempts=attempts, next_attempt_at=next_attempt_at)
+            for system, ext_key, attempts, next_attempt_at in rows
+        ]
+
+    def drop_retries(self, stream: str, keys: Iterable[ExternalKey]) -> None:
+        retry_model = self._require_retry_model()
+        for batch in KeyBatch.from_keys(keys, size=self.bulk_lookup_size):
+            retry_model.objects.filter(stream=stream, system=batch.system, ext_key__in=batch.keys).delete()
+
+    def _require_retry_model(self) -> Type[models.Model]:
+        if self.retry_model is None:
+            raise StateError(f"{type(self).__name__} has no retry_model")
+        return self.retry_model
 
-    def bind(self, key: ExternalKey, internal_id: str, version: Optional[str]) -> None:
+    def bind(self, key: ExternalKey, internal_id: str, version: Optional[str], *,
+             fingerprints: Optional[Mapping[str, str]] = None) -> None:
+        if self.buffered:
+            with self._buffer_lock:
+                self._pending_bindings[key] = Binding(
+                    internal_id=internal_id, version=version or None, fingerprints=fingerprints)
+                overflow = len(self._pending_bindings) >= self.buffer_size
+            if overflow:
+                self.flush()
+            return
         self.binding_model.objects.update_or_create(
             system=key.system,
             ext_key=key.key,
-            defaults={"internal_id": internal_id, "version": version or ""},
+            defaults={"internal_id": internal_id, "version": version or "", "fingerprints": fingerprints},
         )
 
+    def unbind(self, key: ExternalKey) -> None:
+        with self._buffer_lock:
+            self._pending_bindings.pop(key, None)
+        self.binding_model.objects.filter(system=key.system, ext_key=key.key).delete()
+
     def get_binding(self, key: ExternalKey) -> Optional[Binding]:
+        pending = self._pending_bindings.get(key)
+        if pending is not None:
+            return pending
         row = (
             self.binding_model.objects.filter(system=key.system, ext_key=key.key)
-            .only("internal_id", "version")
+            .only("internal_id", "version", "fingerprints")
             .first()
         )
         if not row:
             return None
-        return Binding(internal_id=row.internal_id, version=row.version or None)
+        return Binding(internal_id=row.internal_id, version=row.version or None, fingerprints=row.fingerprints)
 
-    def iter_bindings(self, system: str) -> Iterable[KeyBinding]:
-        qs = (
-            self.binding_model.objects.filter(system=system)
-            .only("ext_key", "internal_id", "version")
-            .iterator()
-        )
-        for row in qs:
-            yield KeyBinding(
-                key=ExternalKey(system=system, key=row.ext_key),
-                binding=Binding(internal_id=row.internal_id, version=row.version or None),
+    def get_bindings_bulk(self, keys: Iterable[ExternalKey]) -> dict[ExternalKey, Binding]:
+        keys = list(keys)
+        result: dict[ExternalKey, Binding] = {}
+        for batch in KeyBatch.from_keys(keys, size=self.bulk_lookup_size):
+            system = batch.system
+            rows = (
+                self.binding_model.objects.filter(system=system, ext_key__in=batch.keys)
+                .values_list("ext_key", "internal_id", "version", "fingerprints")
             )
+            for ext_key, internal_id, version, fingerprints in rows:
+                result[ExternalKey(system=system, key=ext_key)] = Binding(
+                    internal_id=internal_id, version=version or None, fingerprints=fingerprints)
+        with self._buffer_lock:
+            result.update((key, self._pending_bindings[key]) for key in keys if key in self._pending_bindings)
+        return result
+
+    def iter_bindings(
+            self,
+            system: str,
+            *,
+            chunk_size: Optional[int] = None,
+            as_tuples: bool = False,
+    ) -> Iterator[Union[KeyBinding, tuple[str, str, Optional[str]]]]:
+        """
+        Keyset-пагинация по (system, id): каждая пачка — отдельный запрос WHERE id > последний,
+        так что память постоянная на любом драйвере, а удалять биндинги во время обхода безопасно.
+        as_tuples=True отдаёт (ext_key, internal_id, version) без сборки DTO.
+        """
+        self.flush()
+        chunk_size = max(1, chunk_size or self.iter_chunk_size)
+        qs = self.binding_model.objects.filter(system=system).order_by("id")
+        last_id = None
+        while True:
+            page = qs if last_id is None else qs.filter(id__gt=last_id)
+            rows = list(page.values_list("id", "ext_key", "internal_id", "version")[:chunk_size])
+            if not rows:
+                return
+            if as_tuples:
+                for _, ext_key, internal_id, version in rows:
+                    yield ext_key, internal_id, version or None
+            else:
+                for _, ext_key, internal_id, version in rows:
+                    yield KeyBinding(
+                        key=ExternalKey(system=system, key=ext_key),
+                        binding=Binding(internal_id=internal_id, version=version or None),
+                    )
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
 
     def validate_binding(self, key: ExternalKey, binding: Binding) -> None:
         if not binding.internal_id:
             raise StateError(f"empty internal_id for {key}")
 
     def get_item_state(self, key: ExternalKey) -> Optional[SyncItemState]:
+        pending = self._pending_item_states.get(key)
+        if pending is not None:
+            return pending
         row = (
             self.item_state_model.objects.filter(system=key.system, ext_key=key.key)
             .only("version", "status", "attempts", "last_error")
@@ -77,7 +258,36 @@ class BaseStateStore(StateStore):
             last_error=row.last_error or None,
         )
 
+    def get_item_states_bulk(self, keys: Iterable[ExternalKey]) -> dict[ExternalKey, SyncItemState]:
+        keys = list(keys)
+        result: dict[ExternalKey, SyncItemState] = {}
+        for batch in KeyBatch.from_keys(keys, size=self.bulk_lookup_size):
+            system = batch.system
+            rows = (
+                self.item_state_model.objects.filter(system=system, ext_key__in=batch.keys)
+                .values_list("ext_key", "version", "status", "attempts", "last_error")
+            )
+            for ext_key, version, status, attempts, last_error in rows:
+                key = ExternalKey(system=system, key=ext_key)
+                result[key] = SyncItemState(
+                    key=key,
+                    version=version or None,
+                    status=SyncItemStatus(status),
+                    attempts=attempts,
+                    last_error=last_error or None,
+                )
+        with self._buffer_lock:
+            result.update((key, self._pending_item_states[key]) for key in keys if key in self._pending_item_states)
+        return result
+
     def save_item_state(self, state: SyncItemState) -> None:
+        if self.buffered:
+            with self._buffer_lock:
+                self._pending_item_states[state.key] = state
+                overflow = len(self._pending_item_states) >= self.buffer_size
+            if overflow:
+                self.flush()
+            return
         self.item_state_model.objects.update_or_create(
             system=state.key.system,
             ext_key=state.key.key,
@@ -88,3 +298,50 @@ class BaseStateStore(StateStore):
                 "last_error": state.last_error or "",
             },
         )
+
+    def flush(self) -> None:
+        """Пишет накопленные биндинги и состояния: один upsert-запрос на таблицу (пачками по buffer_size)."""
+        with self._buffer_lock:  # буфер чистим только после успешной записи
+            bindings, item_states = self._pending_bindings, self._pending_item_states
+            if bindings:
+                self.binding_model.objects.bulk_create(
+                    [
+                        self.binding_model(
+                            system=key.system,
+                            ext_key=key.key,
+                            internal_id=binding.internal_id,
+                            version=binding.version or "",
+                            fingerprints=binding.fingerprints,
+                        )
+                        for key, binding in bindings.items()
+                    ],
+                    batch_size=self.buffer_size,
+                    **self._upsert_options(self.binding_model, ("internal_id", "version", "fingerprints")),
+                )
+                self._pending_bindings = {}
+            if item_states:
+                self.item_state_model.objects.bulk_create(
+                    [
+                        self.item_state_model(
+                            system=key.system,
+                            ext_key=key.key,
+                            version=state.version or "",
+                            status=state.status.value,
+                            attempts=state.attempts,
+                            last_error=state.last_error or "",
+                        )
+                        for key, state in item_states.items()
+                    ],
+                    batch_size=self.buffer_size,
+                    **self._upsert_options(self.item_state_model, ("version", "status", "attempts", "last_error")),
+                )
+                self._pending_item_states = {}
+
+    @staticmethod
+    def _upsert_options(model: Type[models.Model], update_fields: tuple[str, ...]) -> dict:
+        """bulk_create как upsert по (system, ext_key). MySQL не принимает unique_fields
+        (ON DUPLICATE KEY UPDATE срабатывает на любой уникальный ключ) — передаём их, только где нужны."""
+        options = {"update_conflicts": True, "update_fields": update_fields}
+        if connections[router.db_for_write(model)].features.supports_update_conflicts_with_target:
+            options["unique_fields"] = ("system", "ext_key")
+        return options
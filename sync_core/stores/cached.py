@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Iterable, Mapping, Optional, TypeVar
+
+from ..dto import ExternalKey, Binding, KeyBinding, Lease, SyncItemState
+from ..interfaces import StateStore
+
+TValue = TypeVar("TValue")
+
+_MISS = object()
+
+# необязательные методы StateStore, которым нужен кэш; остальные (lease, retry, flush) отдаются из inner как есть
+_CACHE_AWARE = {
+    "unbind": "_unbind",
+    "get_bindings_bulk": "_get_bindings_bulk",
+    "get_item_states_bulk": "_get_item_states_bulk",
+}
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _LruTtlCache(Generic[TValue]):
+    """LRU с TTL на запись. None — тоже значение (негативный кэш: «в БД такого ключа нет»)."""
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float, clock: Callable[[], float]):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[ExternalKey, tuple[float, Optional[TValue]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ExternalKey) -> Any:
+        """Значение (в т.ч. None) или _MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return _MISS
+
+    def put(self, key: ExternalKey, value: Optional[TValue]) -> None:
+        """Запись (write-through): значение актуальнее всего, что сейчас читается из inner."""
+        with self._lock:
+            self._store(key, value)
+
+    def fill(self, key: ExternalKey, value: Optional[TValue]) -> None:
+        """Значение, прочитанное из inner. Запись, сделанную put, пока читали, не перетираем."""
+        with self._lock:
+            if key not in self._entries:
+                self._store(key, value)
+
+    def discard(self, key: ExternalKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self.hits, misses=self.misses, size=len(self._entries))
+
+    def _store(self, key: ExternalKey, value: Optional[TValue]) -> None:
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CachedStateStore(StateStore):
+    """
+    Кэш в памяти процесса перед другим StateStore: get_binding/get_item_state (и их bulk-версии)
+    для недавно виденных ключей не ходят в БД. Полезно при перекрывающихся окнах updated_at.
+
+    - отдельный LRU+TTL на биндинги и на состояния, ключ — ExternalKey;
+    - промахи тоже кэшируются (negative_ttl, по умолчанию = ttl);
+    - bind/unbind/save_item_state пишут в inner и обновляют кэш (write-through);
+    - необязательные методы (bulk, unbind, lease, retry, flush) есть, только если они есть у inner;
+    - потокобезопасен в пределах процесса; другие процессы кэш не видят — ttl ограничивает
+      время, в течение которого их записи могут быть не видны.
+
+    Включается на поток просто оборачиванием: SyncJob(state=CachedStateStore(store), ...).
+    """
+
+    def __init__(
+        self,
+        inner: StateStore,
+        *,
+        max_entries: int = 10000,
+        ttl: float = 300.0,
+        negative_ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.inner = inner
+        negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._bindings: _LruTtlCache[Binding] = _LruTtlCache(max_entries, ttl, negative_ttl, clock)
+        self._item_states: _LruTtlCache[SyncItemState] = _LruTtlCache(max_entries, ttl, negative_ttl, clock)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "inner":
+            raise AttributeError(name)  # copy/pickle до __init__
+        attr = getattr(self.inner, name)  # нет у inner — нет и у кэша (SyncJob проверяет их через getattr)
+        cached = _CACHE_AWARE.get(name)
+        return getattr(self, cached) if cached is not None else attr
+
+    def stats(self) -> dict[str, CacheStats]:
+        return {"bindings": self._bindings.stats(), "item_states": self._item_states.stats()}
+
+    def invalidate(self, key: Optional[ExternalKey] = None) -> None:
+        """Сбрасывает кэш по ключу или целиком (key=None)."""
+        if key is None:
+            self._bindings.clear()
+            self._item_states.clear()
+            return
+        self._bindings.discard(key)
+        self._item_states.discard(key)
+
+    def get_checkpoint(self, stream: str) -> Optional[str]:
+        return self.inner.get_checkpoint(stream)
+
+    def save_checkpoint(self, stream: str, token: str, *, lease: Optional[Lease] = None) -> None:
+        if lease is None:
+            self.inner.save_checkpoint(stream, token)
+        else:
+            self.inner.save_checkpoint(stream, token, lease=lease)
+
+    def bind(self, key: ExternalKey, internal_id: str, version: Optional[str], *,
+             fingerprints: Optional[Mapping[str, str]] = None) -> None:
+        self._bindings.discard(key)  # если inner упадёт, в кэше не останется старого значения
+        if fingerprints is None:
+            self.inner.bind(key, internal_id, version)
+        else:
+            self.inner.bind(key, internal_id, version, fingerprints=fingerprints)
+        self._bindings.put(key, Binding(internal_id=internal_id, version=version or None, fingerprints=fingerprints))
+
+    def _unbind(self, key: ExternalKey) -> None:
+        self._bindings.discard(key)
+        self.inner.unbind(key)
+        self._bindings.put(key, None)
+
+    def get_binding(self, key: ExternalKey) -> Optional[Binding]:
+        cached = self._bindings.get(key)
+        if cached is not _MISS:
+            return cached
+        binding = self.inner.get_binding(key)
+        self._bindings.fill(key, binding)
+        return binding
+
+    def _get_bindings_bulk(self, keys: Iterable[ExternalKey]) -> dict[ExternalKey, Binding]:
+        return _get_bulk(keys, self._bindings, self.inner.get_bindings_bulk)
+
+    def iter_bindings(self, system: str, **kwargs: Any) -> Iterable[KeyBinding]:
+        return self.inner.iter_bindings(system, **kwargs)  # chunk_size, as_tuples и т.п. — как у inner
+
+    def validate_binding(self, key: ExternalKey, binding: Binding) -> None:
+        self.inner.validate_binding(key, binding)
+
+    def get_item_state(self, key: ExternalKey) -> Optional[SyncItemState]:
+        cached = self._item_states.get(key)
+        if cached is not _MISS:
+            return cached
+        state = self.inner.get_item_state(key)
+        self._item_states.fill(key, state)
+        return state
+
+    def _get_item_states_bulk(self, keys: Iterable[ExternalKey]) -> dict[ExternalKey, SyncItemState]:
+        return _get_bulk(keys, self._item_states, self.inner.get_item_states_bulk)
+
+    def save_item_state(self, state: SyncItemState) -> None:
+        self._item_states.discard(state.key)
+        self.inner.save_item_state(state)
+        self._item_states.put(state.key, state)
+
+
+def _get_bulk(
+        keys: Iterable[ExternalKey],
+        cache: _LruTtlCache[TValue],
+        load_bulk: Callable[[list[ExternalKey]], Mapping[ExternalKey, TValue]],
+) -> dict[ExternalKey, TValue]:
+    """Берёт из кэша что есть, остальное — одним bulk-запросом, и кэширует в т.ч. промахи."""
+    result: dict[ExternalKey, TValue] = {}
+    missing: list[ExternalKey] = []
+    for key in dict.fromkeys(keys):
+        cached = cache.get(key)
+        if cached is _MISS:
+            missing.append(key)
+        elif cached is not None:
+            result[key] = cached
+    if not missing:
+        return result
+
+    loaded = load_bulk(missing)
+    for key in missing:
+        value = loaded.get(key)
+        cache.fill(key, value)
+        if value is not None:
+            result[key] = value
+    return result
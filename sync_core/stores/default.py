@@ -1,13 +1,16 @@
-from ..models import SyncBinding, SyncCheckpoint, SyncItemState
+from ..models import SyncBinding, SyncCheckpoint, SyncItemState, SyncLease, SyncRetry
 from .base import BaseStateStore
 
 
 class DefaultStateStore(BaseStateStore):
     """Готовый StateStore на дефолтных моделях utils."""
 
-    def __init__(self):
+    def __init__(self, **options):
         super().__init__(
             binding_model=SyncBinding,
             checkpoint_model=SyncCheckpoint,
             item_state_model=SyncItemState,
+            lease_model=SyncLease,
+            retry_model=SyncRetry,
+            **options,
         )
@@ -1,15 +1,55 @@
-from typing import Optional, Iterable, Callable
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Optional, Iterable, Callable, Iterator, Collection
 
-from .dto import SyncResult, Binding, Projection, ExternalKey, Payload, SyncItemState, SyncItemStatus
-from .errors import SyncError, TemporaryError, PermanentError, TemporarySourceError, PermanentSourceError
+from .datetime_parser import default_datetime_parser
+from .dto import (
+    SyncResult, Binding, KeyBinding, Lease, Projection, ExternalKey, Payload, SyncItemState, SyncItemStatus,
+)
+from .errors import (
+    SyncError, TemporaryError, PermanentError, TemporarySourceError, PermanentSourceError, TemporaryTargetError,
+    LeaseBusyError, LeaseLostError,
+)
+from .instrumentation import SyncInstrumentation
 from .interfaces import Source, Mapper, Target, StateStore, SyncLogger
+from .sharding import ShardedSource, shard_of
+
+if TYPE_CHECKING:  # sync_core не тянет пакет метрик, пока метрики не передали
+    from ..metrics.sync import SyncMetrics
+
+
+@dataclass
+class WorkItem:
+    """Элемент источника на пути через SyncJob."""
+    seq: int                                      # порядковый номер в выдаче источника
+    key: ExternalKey
+    payload: Payload
+    checkpoint: Optional[str]                     # отложенный чекпоинт сразу после выдачи элемента
+    stored_state: Optional[SyncItemState] = None
+    binding: Optional[Binding] = None
+    prefetched: bool = False                      # False — читаем состояние из StateStore в момент обработки
+
+
+ItemOutcome = tuple[SyncResult, bool]  # (приращение счётчиков, нужен ли ещё ретрай по TEMP_ERROR)
 
 
 class SyncJob:
     # https://chatgpt.com/c/690e4884-b0e0-832e-8bdd-0296f3498a42
     def __init__(self, stream: str, source: Source, mapper: Mapper, target: Target,
                  state: StateStore, logger: SyncLogger, max_attempts: int = 3,
-                 checkpoint_save_every: int = 1000):
+                 checkpoint_save_every: int = 1000, fetch_chunk_size: int = 500, workers: int = 1,
+                 target_batch_size: int = 50, detect_deletions: bool = False, delete_batch_size: int = 500,
+                 instrumentation: Optional[SyncInstrumentation] = None, metrics: Optional["SyncMetrics"] = None,
+                 lease_ttl: Optional[float] = None, lease_owner: Optional[str] = None,
+                 retry_queue: bool = False, retry_backoff: float = 60.0, retry_backoff_max: float = 3600.0,
+                 retry_batch_size: int = 500):
         self.stream = stream          # имя потока синка, для чекпоинта
         self.source = source          # откуда читаем внешние данные
         self.mapper = mapper          # чем преобразуем во внутреннюю проекцию
@@ -18,103 +58,363 @@ class SyncJob:
         self.logger = logger          # логирование событий синка
         self.max_attempts = max_attempts
         self.checkpoint_save_every = max(1, checkpoint_save_every)
+        self.fetch_chunk_size = max(1, fetch_chunk_size)  # сколько элементов источника обрабатываем пачкой
+        # >1 — элементы обрабатываются пулом потоков; mapper/target/state/logger должны быть потокобезопасны
+        self.workers = max(1, workers)
+        # если у target есть upsert_many — пишем пачками такого размера (Bitrix batch: до 50 команд)
+        self.target_batch_size = max(1, target_batch_size)
+        # снапшот-режим: после полного прохода удаляем в приёмнике сущности, которых не было в выдаче
+        if detect_deletions and getattr(source, "checkpoint_type", "none") != "none":
+            raise ValueError("detect_deletions requires a snapshot source (CheckpointType.NONE)")
+        if detect_deletions and getattr(state, "unbind", None) is None:
+            raise ValueError("detect_deletions requires a StateStore with unbind")
+        # шард видит только свои ключи: чужие биндинги при удалении пропускаем (разбиение — shard_of)
+        self._deletion_shard: Optional[tuple[int, int]] = None
+        if detect_deletions and isinstance(source, ShardedSource):
+            if getattr(source.source, "fetch_shard", None) is not None:
+                raise ValueError("detect_deletions requires a ShardedSource partitioned by shard_of, not fetch_shard")
+            self._deletion_shard = (source.shard, source.shards)
+        self.detect_deletions = detect_deletions
+        self.delete_batch_size = max(1, delete_batch_size)
+        self._seen_keys: Optional[_SeenKeys] = None
+        self._fetch_completed = False
+        # замеры по стадиям: компоненты подменяются прокси с таймерами, без instrumentation — как есть
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            self.source, self.mapper, self.target, self.state = instrumentation.wrap(source, mapper, target, state)
+            profiler = instrumentation.profiler
+            if profiler is not None:
+                if self._batch_upsert_enabled():  # в пакетном режиме единица профиля — пачка
+                    self._sync_items = profiler.wrap(
+                        self._sync_items, lambda items: items[0].key if len(items) == 1 else tuple(i.key for i in items))
+                else:
+                    self._sync_item = profiler.wrap(self._sync_item, lambda item: item.key)
+        # метрики Prometheus: время элемента + итоги run() и чекпоинт; без metrics — ничего не оборачиваем
+        self.metrics = metrics
+        self._checkpoint_is_time = getattr(source, "checkpoint_type", None) == "updated_at"
+        if metrics is not None:
+            if self._batch_upsert_enabled():
+                self._sync_items = metrics.time_items(stream, self._sync_items, len)
+            else:
+                self._sync_item = metrics.time_items(stream, self._sync_item, lambda item: 1)
+        # аренда потока: run() без неё не стартует (LeaseBusyError), чекпоинт пишется только под ней,
+        # продление — раз в lease_ttl / 3 между пачками; пачка дольше lease_ttl означает потерю аренды
+        if lease_ttl is not None and not _implements(state, "acquire_lease", "heartbeat_lease", "release_lease"):
+            raise ValueError("lease_ttl requires a StateStore with acquire_lease/heartbeat_lease/release_lease")
+        self.lease_ttl = lease_ttl
+        self.lease_owner = lease_owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lease: Optional[Lease] = None
+        self._lease_renew_at = 0.0
+        # очередь ретраев: TEMP_ERROR не держит чекпоинт, ключ ставится в очередь с экспоненциальной
+        # задержкой и перечитывается отдельным run_retries() через source.fetch_by_keys
+        if retry_queue and not (_implements(source, "fetch_by_keys")
+                                and _implements(state, "schedule_retry", "due_retries", "drop_retries")):
+            raise ValueError(
+                "retry_queue requires Source.fetch_by_keys and a StateStore with schedule_retry/due_retries/drop_retries")
+        self.retry_queue = retry_queue
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.retry_batch_size = max(1, retry_batch_size)
+        self._retry_attempts: dict[ExternalKey, int] = {}  # ключи текущего run_retries и их попытки
+        self._rescheduled: set[ExternalKey] = set()
         self._last_fetch_checkpoint: Optional[str] = None
         self._checkpoint_getter: Optional[Callable[[], Optional[str]]] = None
         self._last_saved_checkpoint: Optional[str] = None
         self._processed_since_save = 0
+        self._sync_result = SyncResult()
+        self._has_retryable_temp_errors = False  # есть ли что ретраить
 
     def run(self) -> SyncResult:
-        checkpoint: Optional[str] = self.state.get_checkpoint(self.stream)
-        sync_result = SyncResult()
-        has_retryable_temp_errors = False  # есть ли что ретраить
+        self._acquire_lease()
+        self._sync_result = SyncResult()
+        self._has_retryable_temp_errors = False
         self._checkpoint_getter = None
         self._last_saved_checkpoint = None
         self._processed_since_save = 0
+        self._seen_keys = _SeenKeys() if self.detect_deletions else None
+        self._fetch_completed = False
+        started = time.monotonic()
+        completed = False
+
+        try:
+            checkpoint: Optional[str] = self.state.get_checkpoint(self.stream)
+            items: Iterable[tuple[ExternalKey, Payload]] = self._iter_source_items(checkpoint)
+            if self.workers > 1:
+                self._run_concurrent(items)
+            else:
+                self._run_sequential(items)
 
-        items: Iterable[tuple[ExternalKey, Payload]] = self._iter_source_items(checkpoint)
-        for key, payload in items:
+            # чекпоинт двигаем только если не осталось TEMP_ERROR с незакрытыми ретраями
+            self._save_checkpoint_progress(self._has_retryable_temp_errors, force=True)
+            if self._last_fetch_checkpoint is not None and not self._has_retryable_temp_errors:
+                self._persist_checkpoint(self._last_fetch_checkpoint)
+
+            if self._seen_keys is not None:
+                self._delete_unseen(self._seen_keys)
+            completed = True
+        finally:
             try:
-                stored_state: Optional[SyncItemState] = self.state.get_item_state(key)
-                prev_state: Optional[SyncItemState] = (
-                    stored_state
-                    if stored_state is not None and stored_state.version == payload.version
-                    else None
-                )
-
-                if prev_state is not None:  # не трогаем PERM_ERROR и превышенные попытки
-                    if prev_state.status is SyncItemStatus.PERM_ERROR:
-                        self.logger.on_skipped(key, "perm_error")
-                        sync_result = sync_result.inc(skipped=1)
-                        continue
-                    if prev_state.status is SyncItemStatus.TEMP_ERROR and prev_state.attempts >= self.max_attempts:
-                        self.logger.on_skipped(key, "max_attempts")
-                        sync_result = sync_result.inc(skipped=1)
-                        continue
+                self._flush_state()  # отложенные записи не теряем и при падении источника
+            finally:
+                self._release_lease()
+            if self.metrics is not None:
+                self.metrics.observe_run(
+                    self.stream, self._sync_result, time.monotonic() - started, success=completed)
+        return self._sync_result
 
-                try:
-                    sync_result = self._process_item(
-                        key=key, payload=payload, prev_state=prev_state, sync_result=sync_result)
-
-                except TemporaryError as exc:
-                    # посчитаем попытку и решим, нужен ли ещё ретрай
-                    attempts_before = prev_state.attempts if prev_state else 0
-                    attempts_after = attempts_before + 1
-                    if attempts_after < self.max_attempts:
-                        has_retryable_temp_errors = True
-
-                    self._save_failed_state(
-                        key=key, payload=payload, prev_state=prev_state, status=SyncItemStatus.TEMP_ERROR, exc=exc)
-                    sync_result = sync_result.inc(failed=1)
-                    self.logger.on_error(key, exc)
-                    continue
+    def run_retries(self, limit: Optional[int] = None) -> SyncResult:
+        """Проход по очереди ретраев: до limit (retry_batch_size) ключей, чьё время пришло, перечитываются
+        через source.fetch_by_keys и обрабатываются как обычно. Чекпоинт потока не трогается.
+        Снова упавшие с TEMP_ERROR переставляются с большей задержкой, остальные уходят из очереди."""
+        if not self.retry_queue:
+            raise ValueError("run_retries requires SyncJob(retry_queue=True)")
+        self._acquire_lease()
+        self._sync_result = SyncResult()
+        self._has_retryable_temp_errors = False
+        self._checkpoint_getter = None
+        self._seen_keys = None
+        self._rescheduled = set()
+        due: list = []
+        completed = False
 
-                except PermanentError as exc:
-                    self._save_failed_state(
-                        key=key, payload=payload, prev_state=prev_state, status=SyncItemStatus.PERM_ERROR, exc=exc)
-                    sync_result = sync_result.inc(failed=1)
-                    self.logger.on_error(key, exc)
-                    continue
+        try:
+            due = self.state.due_retries(self.stream, limit or self.retry_batch_size)
+            self._retry_attempts = {entry.key: entry.attempts for entry in due}
+            if self._retry_attempts:
+                items = self._iter_retry_items(list(self._retry_attempts))
+                if self.workers > 1:
+                    self._run_concurrent(items)
+                else:
+                    self._run_sequential(items)
+                self._flush_state()  # из очереди убираем только после записи состояния элементов
+                # не вернувшиеся из источника ключи тоже убираем: ретраить нечего
+                self.state.drop_retries(
+                    self.stream, [key for key in self._retry_attempts if key not in self._rescheduled])
+            completed = True
+        finally:
+            self._retry_attempts = {}
+            try:
+                self._flush_state()
+            finally:
+                self._release_lease()
+            if self.metrics is not None:
+                self.metrics.observe_retries(self.stream, self._sync_result, len(due), success=completed)
+        return self._sync_result
+
+    def _run_sequential(self, items: Iterable[tuple[ExternalKey, Payload]]) -> None:
+        batched = self._batch_upsert_enabled()
+        for chunk in self._iter_chunks(items):
+            self._prefetch_chunk(chunk)
+            if batched:
+                for item, (sync_result, retryable) in zip(chunk, self._sync_items(chunk)):
+                    self._complete_item(item, sync_result, retryable)
+                continue
+            for item in chunk:
+                sync_result, retryable = self._sync_item(item)
+                self._complete_item(item, sync_result, retryable)
+
+    def _run_concurrent(self, items: Iterable[tuple[ExternalKey, Payload]]) -> None:
+        unit_size = self.target_batch_size if self._batch_upsert_enabled() else 1
+        pool = _ItemWorkerPool(
+            self, workers=self.workers, queue_size=max(1, self.fetch_chunk_size // (self.workers * unit_size)))
+        try:
+            for chunk in self._iter_chunks(items):
+                self._prefetch_chunk(chunk, busy_keys=pool.busy_keys)
+                if unit_size == 1:
+                    for item in chunk:
+                        pool.submit([item])
+                else:
+                    # пачка для upsert_many собирается из ключей одного потока, чтобы не ломать порядок по ключу
+                    by_worker: dict[int, list[WorkItem]] = {}
+                    for item in chunk:
+                        by_worker.setdefault(pool.worker_for(item.key), []).append(item)
+                    for worker_items in by_worker.values():
+                        for start in range(0, len(worker_items), unit_size):
+                            pool.submit(worker_items[start:start + unit_size])
+                if pool.failed:
+                    break  # дальше не читаем: ошибку пробросит close()
+        finally:
+            pool.close()  # дожидаемся уже выданных элементов, в т.ч. при ошибке источника
 
+    def _sync_item(self, item: WorkItem) -> ItemOutcome:
+        """Обрабатывает элемент и возвращает (приращение счётчиков, нужен ли ещё ретрай по TEMP_ERROR)."""
+        prev_state, outcome = self._check_item_state(item)
+        if outcome is not None:
+            return outcome
+
+        try:
+            return self._process_item(item=item, prev_state=prev_state, sync_result=SyncResult()), False
+        except SyncError as exc:
+            return self._fail_item(item, prev_state, exc)
+
+    def _sync_items(self, items: list[WorkItem]) -> list[ItemOutcome]:
+        """Обрабатывает элементы по порядку; при наличии target.upsert_many пишет их пачками."""
+        upsert_many = getattr(self.target, "upsert_many", None) if self._batch_upsert_enabled() else None
+        if upsert_many is None:
+            return [self._sync_item(item) for item in items]
+
+        outcomes: list[Optional[ItemOutcome]] = [None] * len(items)
+        batch: list[tuple[int, WorkItem, Optional[SyncItemState], Optional[Binding], Projection]] = []
+        batch_keys: set[ExternalKey] = set()
+        for index, item in enumerate(items):
+            if item.key in batch_keys:  # повтор ключа: сначала дописываем предыдущее вхождение
+                self._upsert_batch(upsert_many, batch, outcomes)
+                batch, batch_keys = [], set()
+
+            prev_state, outcome = self._check_item_state(item)
+            if outcome is None:
+                try:
+                    prepared = self._prepare_item(item, prev_state)
                 except SyncError as exc:
-                    # todo должно отличаться от PermanentError
-                    self._save_failed_state(
-                        key=key, payload=payload, prev_state=prev_state, status=SyncItemStatus.PERM_ERROR, exc=exc)
-                    sync_result = sync_result.inc(failed=1)
-                    self.logger.on_error(key, exc)
-                    continue
+                    outcome = self._fail_item(item, prev_state, exc)
+                else:
+                    if prepared is None:
+                        outcome = SyncResult().inc(skipped=1), False
+                    else:
+                        bound, projection = prepared
+                        batch.append((index, item, prev_state, bound, projection))
+                        batch_keys.add(item.key)
+            outcomes[index] = outcome
 
-            finally:
-                self._save_checkpoint_progress(has_retryable_temp_errors)
+            if len(batch) >= self.target_batch_size:
+                self._upsert_batch(upsert_many, batch, outcomes)
+                batch, batch_keys = [], set()
+
+        if batch:
+            self._upsert_batch(upsert_many, batch, outcomes)
+        return outcomes
+
+    def _upsert_batch(
+            self,
+            upsert_many: Callable,
+            batch: list[tuple[int, WorkItem, Optional[SyncItemState], Optional[Binding], Projection]],
+            outcomes: list[Optional[ItemOutcome]],
+    ) -> None:
+        """Один вызов target.upsert_many; ошибки по элементам разбираются так же, как при поштучном upsert."""
+        try:
+            results = list(upsert_many([(item.key, projection, bound) for _, item, _, bound, projection in batch]))
+            if len(results) != len(batch):
+                raise TemporaryTargetError(
+                    f"upsert_many returned {len(results)} results for {len(batch)} items")
+        except SyncError as exc:  # ошибка всей пачки — ошибка каждого её элемента
+            results = [exc] * len(batch)
+
+        for (index, item, prev_state, bound, _), result in zip(batch, results):
+            if isinstance(result, SyncError):
+                outcomes[index] = self._fail_item(item, prev_state, result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            try:
+                outcomes[index] = self._finish_item(item, prev_state, bound, result, SyncResult()), False
+            except SyncError as exc:
+                outcomes[index] = self._fail_item(item, prev_state, exc)
+
+    def _batch_upsert_enabled(self) -> bool:
+        return self.target_batch_size > 1 and callable(getattr(self.target, "upsert_many", None))
+
+    def _check_item_state(self, item: WorkItem) -> tuple[Optional[SyncItemState], Optional[ItemOutcome]]:
+        """Возвращает prev_state (состояние той же версии) и исход, если элемент пропускается по состоянию."""
+        key, payload = item.key, item.payload
+        stored_state: Optional[SyncItemState] = (
+            item.stored_state if item.prefetched else self.state.get_item_state(key))
+        prev_state: Optional[SyncItemState] = (
+            stored_state
+            if stored_state is not None and stored_state.version == payload.version
+            else None
+        )
+
+        if prev_state is not None:  # не трогаем PERM_ERROR и превышенные попытки
+            if prev_state.status is SyncItemStatus.PERM_ERROR:
+                self.logger.on_skipped(key, "perm_error")
+                return prev_state, (SyncResult().inc(skipped=1), False)
+            if prev_state.status is SyncItemStatus.TEMP_ERROR and prev_state.attempts >= self.max_attempts:
+                self.logger.on_skipped(key, "max_attempts")
+                return prev_state, (SyncResult().inc(skipped=1), False)
+        return prev_state, None
+
+    def _fail_item(self, item: WorkItem, prev_state: Optional[SyncItemState], exc: SyncError) -> ItemOutcome:
+        key, payload = item.key, item.payload
+        sync_result = SyncResult().inc(failed=1)
+        if isinstance(exc, TemporaryError):
+            # посчитаем попытку и решим, нужен ли ещё ретрай
+            attempts_before = prev_state.attempts if prev_state else 0
+            attempts_after = attempts_before + 1
+
+            self._save_failed_state(
+                key=key, payload=payload, prev_state=prev_state, status=SyncItemStatus.TEMP_ERROR, exc=exc)
+            self.logger.on_error(key, exc)
+            return sync_result, attempts_after < self.max_attempts
+
+        if isinstance(exc, PermanentError):
+            self._save_failed_state(
+                key=key, payload=payload, prev_state=prev_state, status=SyncItemStatus.PERM_ERROR, exc=exc)
+            self.logger.on_error(key, exc)
+            return sync_result, False
+
+        # todo должно отличаться от PermanentError
+        self._save_failed_state(
+            key=key, payload=payload, prev_state=prev_state, status=SyncItemStatus.PERM_ERROR, exc=exc)
+        self.logger.on_error(key, exc)
+        return sync_result, False
 
-        # чекпоинт двигаем только если не осталось TEMP_ERROR с незакрытыми ретраями
-        self._save_checkpoint_progress(has_retryable_temp_errors, force=True)
-        if self._last_fetch_checkpoint is not None and not has_retryable_temp_errors:
-            self.state.save_checkpoint(self.stream, self._last_fetch_checkpoint)
-        return sync_result
+    def _complete_item(self, item: WorkItem, sync_result: SyncResult, retryable: bool) -> None:
+        """Учитывает обработанный элемент; вызывается строго в порядке выдачи источника."""
+        self._sync_result = self._sync_result.merge(sync_result)
+        if retryable:
+            if self.retry_queue:  # до сохранения чекпоинта, который пройдёт мимо этого элемента
+                self._schedule_retry(item.key)
+            else:
+                self._has_retryable_temp_errors = True
+        self._save_checkpoint_progress(self._has_retryable_temp_errors, item.checkpoint)
 
     def _process_item(
             self, *,
-            key: ExternalKey,
-            payload: Payload,
+            item: WorkItem,
             prev_state: Optional[SyncItemState],
             sync_result: SyncResult,
     ) -> SyncResult:
+        prepared = self._prepare_item(item, prev_state)
+        if prepared is None:
+            return sync_result.inc(skipped=1)
+        bound, projection = prepared
+        # создаём/обновляем сущность в целевой системе
+        internal_id = self.target.upsert(item.key, projection, binding=bound)
+        return self._finish_item(item, prev_state, bound, internal_id, sync_result)
+
+    def _prepare_item(
+            self, item: WorkItem, prev_state: Optional[SyncItemState],
+    ) -> Optional[tuple[Optional[Binding], Projection]]:
+        """Всё до записи в приёмник: (binding, projection) или None, если версия уже синхронизирована."""
+        key, payload = item.key, item.payload
         self.source.validate(key, payload)  # 1. техническая проверка сырья
 
-        bound: Optional[Binding] = self.state.get_binding(key)
+        bound: Optional[Binding] = item.binding if item.prefetched else self.state.get_binding(key)
         if bound:
             self.state.validate_binding(key, bound)  # проверка консистентности StateStore
 
         if bound and bound.is_up_to_date_for(payload):
             self.logger.on_skipped(key, "same_version")
             self._save_success_state(key, payload, prev_state)
-            return sync_result.inc(skipped=1)
+            return None
 
         self.mapper.validate(key, payload)  # 2. бизнес-валидация входных данных
         projection: Projection = self.mapper.map(key, payload)  # строим проекцию под целевую систему
+        if bound and projection.changed_fields is None:  # что поменялось — для частичного обновления в приёмнике
+            projection = replace(projection, changed_fields=payload.changed_fields(bound.fingerprints))
         self.target.validate(key, projection)  # 3. валидация перед записью в приёмник
-        internal_id = self.target.upsert(key, projection, binding=bound)  # создаём/обновляем сущность в целевой системе
-        self.state.bind(key, internal_id, payload.version)  # сохраняем связь ExternalKey ↔ internal_id, version
+        return bound, projection
+
+    def _finish_item(
+            self,
+            item: WorkItem,
+            prev_state: Optional[SyncItemState],
+            bound: Optional[Binding],
+            internal_id: str,
+            sync_result: SyncResult,
+    ) -> SyncResult:
+        key, payload = item.key, item.payload
+        self._bind(key, internal_id, payload)  # сохраняем связь ExternalKey ↔ internal_id, version
 
         self._save_success_state(key, payload, prev_state)
 
@@ -125,6 +425,12 @@ class SyncJob:
             self.logger.on_created(key, internal_id)
             return sync_result.inc(created=1)
 
+    def _bind(self, key: ExternalKey, internal_id: str, payload: Payload) -> None:
+        if payload.fingerprints is None:  # StateStore без поддержки fingerprints тоже годится
+            self.state.bind(key, internal_id, payload.version)
+        else:
+            self.state.bind(key, internal_id, payload.version, fingerprints=payload.fingerprints)
+
     def _save_success_state(self, key: ExternalKey, payload: Payload, prev_state: Optional[SyncItemState]) -> None:
         attempts = (prev_state.attempts + 1) if prev_state else 1
         self.state.save_item_state(
@@ -157,6 +463,61 @@ class SyncJob:
             )
         )
 
+    def _iter_chunks(self, items: Iterable[tuple[ExternalKey, Payload]]) -> Iterator[list[WorkItem]]:
+        """Режет поток источника на пачки по fetch_chunk_size.
+        Отложенный чекпоинт снимаем сразу после выдачи каждого элемента — так он не убегает
+        вперёд необработанной части пачки."""
+        chunk: list[WorkItem] = []
+        seq = 0
+        try:
+            for key, payload in items:
+                if self._seen_keys is not None:
+                    self._seen_keys.add(key)
+                item_checkpoint = self._checkpoint_getter() if self._checkpoint_getter is not None else None
+                chunk.append(WorkItem(seq=seq, key=key, payload=payload, checkpoint=item_checkpoint))
+                seq += 1
+                if len(chunk) >= self.fetch_chunk_size:
+                    self._renew_lease()
+                    yield chunk
+                    chunk = []
+        except LeaseLostError:
+            raise  # поток перехватил другой воркер: недописанную пачку не пишем
+        except Exception:
+            if chunk:  # уже полученное до ошибки источника обрабатываем, как и раньше
+                yield chunk
+            raise
+        if chunk:
+            self._renew_lease()
+            yield chunk
+
+    def _prefetch_chunk(self, chunk: list[WorkItem], busy_keys: Collection[ExternalKey] = ()) -> None:
+        """Один bulk-запрос на таблицу вместо get_item_state/get_binding по каждому элементу.
+        Повтор ключа в пачке и ключи, ещё находящиеся в обработке (busy_keys), не префетчим:
+        их состояние читается в момент обработки, уже после предыдущего вхождения."""
+        keys: dict[ExternalKey, None] = {}
+        for item in chunk:
+            if item.key in keys or item.key in busy_keys:
+                continue
+            keys[item.key] = None
+            item.prefetched = True
+
+        get_states_bulk = getattr(self.state, "get_item_states_bulk", None)
+        if get_states_bulk is not None:
+            states = get_states_bulk(list(keys))
+        else:
+            states = {key: self.state.get_item_state(key) for key in keys}
+
+        get_bindings_bulk = getattr(self.state, "get_bindings_bulk", None)
+        if get_bindings_bulk is not None:
+            bindings = get_bindings_bulk(list(keys))
+        else:
+            bindings = {key: self.state.get_binding(key) for key in keys}
+
+        for item in chunk:
+            if item.prefetched:
+                item.stored_state = states.get(item.key)
+                item.binding = bindings.get(item.key)
+
     def _iter_source_items(self, checkpoint: Optional[str]) -> Iterable[tuple[ExternalKey, Payload]]:
         """Обёртка над source.fetch с обработкой ошибок источника."""
         try:
@@ -168,17 +529,94 @@ class SyncJob:
                 self._checkpoint_getter = None
                 self._last_fetch_checkpoint = new_checkpoint          # запоминаем чекпоинт
                 yield from items                                      # остаёмся генератором
+            self._fetch_completed = True  # источник отдал всё без ошибки
+        except (TemporarySourceError, PermanentSourceError) as exc:
+            self._log_fetch_error(exc)
+            raise
+
+    def _iter_retry_items(self, keys: list[ExternalKey]) -> Iterable[tuple[ExternalKey, Payload]]:
+        try:
+            yield from self.source.fetch_by_keys(keys)
         except (TemporarySourceError, PermanentSourceError) as exc:
             self._log_fetch_error(exc)
             raise
 
-    def _save_checkpoint_progress(self, has_retryable_temp_errors: bool, force: bool = False) -> None:
+    def _schedule_retry(self, key: ExternalKey) -> None:
+        # попытки берём и из состояния элемента: основной run() не знает, что ключ уже в очереди
+        stored = self.state.get_item_state(key)
+        attempts = max(self._retry_attempts.get(key, 0) + 1, stored.attempts if stored is not None else 0)
+        delay = min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempts - 1))
+        self.state.schedule_retry(self.stream, key, attempts, delay)
+        self._rescheduled.add(key)
+
+    def _delete_unseen(self, seen: "_SeenKeys") -> None:
+        """Снапшот-режим: биндинги систем из выдачи, ключей которых в выдаче не было, удаляем пачками.
+        Только после полного прохода источника и не по пустому снапшоту (скорее сбой, чем «удалили всё»)."""
+        if not self._fetch_completed or not seen:
+            return
+        seen.freeze()
+        self._flush_state()  # iter_bindings должен видеть bind'ы этого прогона
+        for system in sorted(seen.systems):
+            batch: list[KeyBinding] = []
+            for key_binding in self.state.iter_bindings(system):
+                if key_binding.key in seen or not self._owns_for_deletion(key_binding.key):
+                    continue
+                batch.append(key_binding)
+                if len(batch) >= self.delete_batch_size:
+                    self._renew_lease()
+                    self._delete_batch(batch)
+                    batch = []
+            if batch:
+                self._renew_lease()
+                self._delete_batch(batch)
+
+    def _owns_for_deletion(self, key: ExternalKey) -> bool:
+        if self._deletion_shard is None:
+            return True
+        shard, shards = self._deletion_shard
+        return shard_of(key, shards) == shard
+
+    def _delete_batch(self, batch: list[KeyBinding]) -> None:
+        delete_many = getattr(self.target, "delete_many", None)
+        if delete_many is not None:
+            try:
+                errors = list(delete_many([(kb.key, kb.binding) for kb in batch]))
+                if len(errors) != len(batch):
+                    raise TemporaryTargetError(
+                        f"delete_many returned {len(errors)} results for {len(batch)} items")
+            except SyncError as exc:
+                errors = [exc] * len(batch)
+        else:
+            errors = [self._delete_one(kb) for kb in batch]
+
+        for key_binding, error in zip(batch, errors):
+            if error is not None:
+                self.logger.on_error(key_binding.key, error)
+                self._sync_result = self._sync_result.inc(failed=1)
+                continue
+            self.state.unbind(key_binding.key)
+            self.logger.on_deleted(key_binding.key, key_binding.binding.internal_id)
+            self._sync_result = self._sync_result.inc(deleted=1)
+
+    def _delete_one(self, key_binding: KeyBinding) -> Optional[SyncError]:
+        try:
+            self.target.delete(key_binding.key, key_binding.binding)
+        except SyncError as exc:
+            return exc
+        return None
+
+    def _save_checkpoint_progress(
+            self,
+            has_retryable_temp_errors: bool,
+            item_checkpoint: Optional[str] = None,
+            force: bool = False,
+    ) -> None:
         if self._checkpoint_getter is None:
             return
         self._processed_since_save += 1
         if not force and self._processed_since_save < self.checkpoint_save_every:
             return
-        checkpoint = self._checkpoint_getter()
+        checkpoint = self._checkpoint_getter() if force else item_checkpoint
         if checkpoint is None:
             return
         self._last_fetch_checkpoint = checkpoint
@@ -188,11 +626,192 @@ class SyncJob:
         if checkpoint == self._last_saved_checkpoint:
             self._processed_since_save = 0
             return
-        self.state.save_checkpoint(self.stream, checkpoint)
+        self._persist_checkpoint(checkpoint)
         self._last_saved_checkpoint = checkpoint
         self._processed_since_save = 0
+
+    def _persist_checkpoint(self, checkpoint: str) -> None:
+        """Чекпоинт не должен оказаться в БД раньше состояния элементов, которые он покрывает."""
+        self._flush_state()
+        if self._lease is not None:
+            self.state.save_checkpoint(self.stream, checkpoint, lease=self._lease)
+        else:
+            self.state.save_checkpoint(self.stream, checkpoint)
+        if self.metrics is not None and self._checkpoint_is_time:
+            try:
+                self.metrics.observe_checkpoint(self.stream, default_datetime_parser.parse(checkpoint).timestamp())
+            except ValueError:
+                pass  # нестандартный формат чекпоинта — лаг просто не считаем
+
+    def _acquire_lease(self) -> None:
+        if self.lease_ttl is None:
+            return
+        lease = self.state.acquire_lease(self.stream, self.lease_owner, self.lease_ttl)
+        if lease is None:
+            raise LeaseBusyError(f"stream {self.stream!r} is leased by another worker")
+        self._lease = lease
+        self._lease_renew_at = time.monotonic() + self.lease_ttl / 3
+
+    def _renew_lease(self) -> None:
+        if self._lease is None or time.monotonic() < self._lease_renew_at:
+            return
+        self._lease = self.state.heartbeat_lease(self._lease, self.lease_ttl)
+        self._lease_renew_at = time.monotonic() + self.lease_ttl / 3
+
+    def _release_lease(self) -> None:
+        lease, self._lease = self._lease, None
+        if lease is not None:
+            self.state.release_lease(lease)
+
+    def _flush_state(self) -> None:
+        flush = getattr(self.state, "flush", None)
+        if flush is not None:
+            flush()
 
     def _log_fetch_error(self, exc: SyncError) -> None:
         """Логируем ошибку на уровне fetch без конкретного элемента."""
         error_key = ExternalKey(system=self.stream, key="__fetch__")
         self.logger.on_error(error_key, exc)
+
+
+def _implements(component: object, *names: str) -> bool:
+    """Есть ли у компонента все необязательные методы names (см. комментарии в протоколах)."""
+    return all(callable(getattr(component, name, None)) for name in names)
+
+
+class _SeenKeys:
+    """Ключи снапшота в компактном виде: 64-битные хэши (8 байт на ключ) в отсортированных массивах.
+
+    Хэши копятся в буфере и при заполнении сортируются в отдельный массив (run) — сортировать
+    миллионы ключей одним списком не нужно. Проверка — bisect по каждому run. Коллизия хэшей
+    даёт только ложное «видели», т.е. лишнего не удалим.
+    """
+
+    def __init__(self, run_size: int = 1 << 20):
+        self.run_size = run_size
+        self.systems: set[str] = set()
+        self._runs: list[array] = []
+        self._buffer = array("q")
+
+    def add(self, key: ExternalKey) -> None:
+        self._buffer.append(hash(key))  # у ExternalKey хэш посчитан заранее
+        self.systems.add(key.system)
+        if len(self._buffer) >= self.run_size:
+            self._seal()
+
+    def freeze(self) -> None:
+        if self._buffer:
+            self._seal()
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs) + len(self._buffer)
+
+    def __contains__(self, key: ExternalKey) -> bool:
+        value = hash(key)
+        for run in self._runs:
+            index = bisect_left(run, value)
+            if index < len(run) and run[index] == value:
+                return True
+        return value in self._buffer
+
+    def _seal(self) -> None:
+        self._runs.append(array("q", sorted(self._buffer)))
+        self._buffer = array("q")
+
+
+_SKIPPED = object()  # элемент не обрабатывался: пул уже остановлен из-за ошибки
+
+
+class _ItemWorkerPool:
+    """Пул потоков для SyncJob(workers=N).
+
+    Ключ всегда попадает в один и тот же поток (hash(key) % N), поэтому элементы одного ключа
+    обрабатываются по порядку. Результаты возвращаются в SyncJob строго в порядке выдачи источником
+    (low-watermark), так что чекпоинт не обгоняет незавершённые элементы.
+    """
+
+    def __init__(self, job: SyncJob, *, workers: int, queue_size: int):
+        from ..safe_bd_thread_pool_exec import SafeDBThreadPoolExecutor  # закрывает Django-соединения потоков
+
+        self.job = job
+        self.busy_keys: dict[ExternalKey, int] = {}  # ключ -> сколько его элементов ещё в работе
+        self._inboxes: list[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._results: queue.Queue = queue.Queue()
+        self._abort = threading.Event()
+        self._done: dict[int, tuple[WorkItem, SyncResult, bool]] = {}
+        self._next_seq = 0
+        self._in_flight = 0
+        self._error: Optional[BaseException] = None
+        self._executor = SafeDBThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync-job")
+        for inbox in self._inboxes:
+            self._executor.submit(self._work, inbox)
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def worker_for(self, key: ExternalKey) -> int:
+        return hash(key) % len(self._inboxes)
+
+    def submit(self, items: list[WorkItem]) -> None:
+        """Ставит в очередь потока пачку элементов; все ключи пачки должны относиться к одному потоку."""
+        for item in items:
+            self.busy_keys[item.key] = self.busy_keys.get(item.key, 0) + 1
+        self._in_flight += len(items)
+        self._inboxes[self.worker_for(items[0].key)].put(items)  # backpressure: очередь ограничена
+        self.collect(block=False)
+
+    def collect(self, *, block: bool) -> None:
+        """Забирает готовые результаты и продвигает low-watermark; block=True — до последнего элемента."""
+        while self._in_flight:
+            try:
+                item, sync_result, retryable, error = self._results.get(block=block)
+            except queue.Empty:
+                return
+            self._in_flight -= 1
+            left = self.busy_keys[item.key] - 1
+            if left:
+                self.busy_keys[item.key] = left
+            else:
+                del self.busy_keys[item.key]
+
+            if error is not None:
+                if error is not _SKIPPED and self._error is None:
+                    self._error = error
+                    self._abort.set()
+                continue
+
+            self._done[item.seq] = (item, sync_result, retryable)
+            while self._next_seq in self._done:
+                done_item, done_result, done_retryable = self._done.pop(self._next_seq)
+                self._next_seq += 1
+                self.job._complete_item(done_item, done_result, done_retryable)
+
+    def close(self) -> None:
+        try:
+            for inbox in self._inboxes:
+                inbox.put(None)
+            self.collect(block=True)
+        finally:
+            self._executor.shutdown(wait=True)
+        if self._error is not None:
+            raise self._error
+
+    def _work(self, inbox: queue.Queue) -> None:
+        while True:
+            items: Optional[list[WorkItem]] = inbox.get()
+            if items is None:
+                return
+            if self._abort.is_set():
+                for item in items:
+                    self._results.put((item, None, False, _SKIPPED))
+                continue
+            try:
+                outcomes = self.job._sync_items(items)
+            except BaseException as exc:  # отдаём в основной поток, там и пробросим
+                self._results.put((items[0], None, False, exc))
+                for item in items[1:]:
+                    self._results.put((item, None, False, _SKIPPED))
+            else:
+                for item, (sync_result, retryable) in zip(items, outcomes):
+                    self._results.put((item, sync_result, retryable, None))
@@ -0,0 +1,86 @@
+"""
+Общие фейки для тестов sync_core. Маппер, логгер и StateStore в памяти — те же, что у бенчмарков
+(sync_core/benchmarks/fakes.py); здесь — источник из списка, приёмник с заданными ошибками и make_job.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Iterable, Optional
+
+from sync_utils.sync_core.benchmarks.fakes import EchoMapper, MemoryStateStore, NullLogger
+from sync_utils.sync_core.dto import ExternalKey, Payload
+from sync_utils.sync_core.errors import PermanentTargetError, TemporaryTargetError
+from sync_utils.sync_core.sync_job import SyncJob
+
+__all__ = [
+    "EchoMapper", "ListSource", "MemoryStateStore", "MemoryTarget", "NullLogger", "RecordingStateStore", "key",
+    "make_job",
+]
+
+SYSTEM = "sys"
+
+
+def key(value, system: str = SYSTEM) -> ExternalKey:
+    return ExternalKey(system=system, key=str(value))
+
+
+class ListSource:
+    """Ключи по списку, data = ключ. version=None — у каждого элемента своя версия (повтор ключа — обновление)."""
+
+    def __init__(self, keys: Iterable, *, version: Optional[str] = "1", checkpoint: Optional[str] = None):
+        self.keys = [str(k) for k in keys]
+        self.version = version
+        self.checkpoint = checkpoint
+
+    def fetch(self, since_token):
+        items = [(key(k), Payload(data=k, version=self.version or f"v{i}")) for i, k in enumerate(self.keys)]
+        return iter(items), self.checkpoint
+
+    def validate(self, key, payload):
+        return None
+
+
+class MemoryTarget:
+    """upsert отдаёт internal-<key>; ключи из temp_fail/perm_fail падают Temporary/PermanentTargetError."""
+
+    def __init__(self, *, temp_fail: Iterable = (), perm_fail: Iterable = ()):
+        self.temp_fail = {str(k) for k in temp_fail}
+        self.perm_fail = {str(k) for k in perm_fail}
+        self.lock = threading.Lock()
+        self.upserted: list[str] = []
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        if key.key in self.temp_fail:
+            raise TemporaryTargetError("temporary failure")
+        if key.key in self.perm_fail:
+            raise PermanentTargetError("rejected")
+        with self.lock:
+            self.upserted.append(key.key)
+        return f"internal-{key.key}"
+
+
+class RecordingStateStore(MemoryStateStore):
+    """MemoryStateStore, запоминающий каждую запись чекпоинта по порядку."""
+
+    def __init__(self):
+        super().__init__()
+        self.saved_checkpoints: list[str] = []
+
+    def save_checkpoint(self, stream, token):
+        self.saved_checkpoints.append(token)
+        super().save_checkpoint(stream, token)
+
+
+def make_job(source, target, state, *, stream: str = "s", mapper=None, logger=None, **kwargs) -> SyncJob:
+    return SyncJob(
+        stream=stream,
+        source=source,
+        mapper=mapper or EchoMapper(),
+        target=target,
+        state=state,
+        logger=logger or NullLogger(),
+        **kwargs,
+    )
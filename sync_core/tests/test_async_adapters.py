@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from sync_utils.sync_core import async_adapters
+from sync_utils.sync_core.async_adapters import AsyncSourceAdapter, AsyncStateStoreAdapter
+from sync_utils.sync_core.dto import ExternalKey, Payload
+
+
+class ThreadRecordingSource:
+    def __init__(self, count: int):
+        self.count = count
+        self.threads: set[str] = set()
+
+    def fetch(self, since_token):
+        self.threads.add(threading.current_thread().name)
+
+        def _iter():
+            for i in range(self.count):
+                self.threads.add(threading.current_thread().name)
+                yield ExternalKey(system="sys", key=str(i)), Payload(data=i)
+
+        return _iter(), None
+
+    def validate(self, key, payload):
+        return None
+
+
+class ThreadRecordingStateStore:
+    def __init__(self):
+        self.threads: list[str] = []
+
+    def get_checkpoint(self, stream):
+        self.threads.append(threading.current_thread().name)
+        return "token"
+
+
+async def collect(items):
+    return [key.key async for key, _ in items]
+
+
+class AsyncAdaptersTest(unittest.TestCase):
+    def test_state_calls_run_in_adapter_pool_and_close_connections(self):
+        state = ThreadRecordingStateStore()
+        with mock.patch.object(async_adapters, "_close_db_connections") as close:
+            token = asyncio.run(AsyncStateStoreAdapter(state).get_checkpoint("s"))
+
+        self.assertEqual(token, "token")
+        self.assertTrue(state.threads[0].startswith("sync-async"))
+        close.assert_called_once_with(only_old=True)
+
+    def test_source_is_read_in_one_thread_and_released(self):
+        source = ThreadRecordingSource(5)
+        with mock.patch.object(async_adapters, "_close_db_connections") as close:
+            async def _run():
+                items, _ = await AsyncSourceAdapter(source, pull_size=2).fetch(None)
+                return await collect(items)
+
+            keys = asyncio.run(_run())
+
+        self.assertEqual(keys, ["0", "1", "2", "3", "4"])
+        self.assertEqual(len(source.threads), 1)
+        self.assertTrue(next(iter(source.threads)).startswith("sync-async-source"))
+        close.assert_called_once_with()
+
+    def test_source_released_when_consumer_stops_early(self):
+        source = ThreadRecordingSource(10)
+        with mock.patch.object(async_adapters, "_close_db_connections") as close:
+            async def _run():
+                items, _ = await AsyncSourceAdapter(source, pull_size=2).fetch(None)
+                async for _ in items:
+                    break
+                await items.aclose()
+
+            asyncio.run(_run())
+
+        close.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import unittest
+
+from sync_utils.sync_core.async_sync_job import AsyncSyncJob
+from sync_utils.sync_core.dto import Payload, SyncItemStatus
+from sync_utils.sync_core.errors import TemporaryError
+from sync_utils.sync_core.tests.fakes import EchoMapper, MemoryStateStore, NullLogger, key
+
+
+class DummySource:
+    def __init__(self, keys: list[str]):
+        self.keys = keys
+        self.pulled = 0
+
+    def fetch(self, since_token):
+        def _iter():
+            for i, k in enumerate(self.keys, start=1):
+                self.pulled = i
+                yield key(k), Payload(data=i, version=str(i))
+
+        return _iter(), lambda: str(self.pulled)
+
+    def validate(self, key, payload):
+        return None
+
+
+class AsyncTarget:
+    def __init__(self, temp_fail: set[int] = frozenset()):
+        self.temp_fail = temp_fail
+        self.seen: dict[str, list[int]] = {}
+        self.finished: set[int] = set()
+        self.active = 0
+        self.max_active = 0
+
+    def validate(self, key, projection):
+        return None
+
+    async def upsert(self, key, projection, *, binding=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(random.random() / 1000)
+        finally:
+            self.active -= 1
+        self.seen.setdefault(key.key, []).append(projection.data)
+        self.finished.add(projection.data)
+        if projection.data in self.temp_fail:
+            raise TemporaryError("temp")
+        return f"internal-{key.key}"
+
+
+class CheckpointAuditStore(MemoryStateStore):
+    """Проверяет, что на момент записи чекпоинта все элементы до него уже обработаны."""
+
+    def __init__(self, target: AsyncTarget):
+        super().__init__()
+        self.target = target
+        self.saved_checkpoints: list[str] = []
+        self.violations: list[str] = []
+
+    def save_checkpoint(self, stream, token):
+        if any(i not in self.target.finished for i in range(1, int(token) + 1)):
+            self.violations.append(token)
+        self.saved_checkpoints.append(token)
+
+
+class AsyncSyncJobTest(unittest.TestCase):
+    def test_sync_source_and_store_through_adapters(self):
+        target = AsyncTarget()
+        state = CheckpointAuditStore(target)
+        job = AsyncSyncJob(
+            stream="s",
+            source=DummySource([str(i % 13) for i in range(200)]),
+            mapper=EchoMapper(),
+            target=target,
+            state=state,
+            logger=NullLogger(),
+            checkpoint_save_every=20,
+            fetch_chunk_size=30,
+            concurrency=5,
+        )
+
+        result = asyncio.run(job.run())
+
+        self.assertEqual(result.created, 13)
+        self.assertEqual(result.updated, 187)
+        self.assertLessEqual(target.max_active, 5)
+        for seen in target.seen.values():
+            self.assertEqual(seen, sorted(seen))
+        self.assertEqual(state.violations, [])
+        self.assertEqual(state.saved_checkpoints[-1], "200")
+
+    def test_retryable_error_blocks_checkpoint(self):
+        target = AsyncTarget(temp_fail={7})
+        state = CheckpointAuditStore(target)
+        job = AsyncSyncJob(
+            stream="s",
+            source=DummySource([str(i) for i in range(20)]),
+            mapper=EchoMapper(),
+            target=target,
+            state=state,
+            logger=NullLogger(),
+            checkpoint_save_every=5,
+        )
+
+        result = asyncio.run(job.run())
+
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(state.saved_checkpoints, ["5"])
+        self.assertEqual(state.item_states[key("6")].status, SyncItemStatus.TEMP_ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from sync_utils.sync_core.base_source import BaseSource, CheckpointType
+from sync_utils.sync_core.dto import Payload
+from sync_utils.sync_core.errors import PermanentSourceError, TemporarySourceError
+from sync_utils.sync_core.tests.fakes import MemoryTarget, RecordingStateStore, key, make_job
+
+PAGES = {None: ([1, 2], "a"), "a": ([3, 4], "b"), "b": ([5], None)}
+
+
+class PagedSource(BaseSource):
+    def __init__(self):
+        super().__init__(checkpoint_type=CheckpointType.CURSOR, checkpoint_required=False)
+
+    def _fetch(self, parsed_checkpoint):
+        return [], None
+
+
+class StreamingSource(BaseSource):
+    """9 элементов, по 3 на страницу; токен страницы — "p<номер следующей страницы>"."""
+
+    def __init__(self):
+        super().__init__(checkpoint_type=CheckpointType.CURSOR, checkpoint_required=False)
+        self.requested: list = []
+
+    def _fetch(self, parsed_checkpoint):
+        return self.paginate_iter(parsed_checkpoint, self._fetch_page)
+
+    def _fetch_page(self, token):
+        self.requested.append(token)
+        page = int(token[1:]) if token else 0
+        items = [
+            (key(i), Payload(data=i, version="1"))
+            for i in range(page * 3 + 1, page * 3 + 4)
+        ]
+        return items, (f"p{page + 1}" if page < 2 else None)
+
+    def validate(self, key, payload):
+        return None
+
+
+class SnapshotSource(StreamingSource):
+    """Полная выгрузка без чекпоинта, те же 3 страницы."""
+
+    def __init__(self):
+        super().__init__()
+        self.checkpoint_type = CheckpointType.NONE
+        self.checkpoint_required = False
+
+
+class CrashingTarget:
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        if projection.data == 8:
+            raise RuntimeError("worker killed")
+        return key.key
+
+
+class PaginateIterTest(unittest.TestCase):
+    def test_checkpoint_is_live_and_tracks_consumed_pages(self):
+        source = StreamingSource()
+        items, checkpoint = source.paginate_iter(None, source._fetch_page)
+
+        self.assertIsNone(checkpoint())
+        seen = [(key.key, checkpoint()) for key, _ in items]
+
+        self.assertEqual([cp for _, cp in seen], [None, None, None, "p1", "p1", "p1", "p2", "p2", "p2"])
+        self.assertEqual(checkpoint(), "p2")
+
+    def test_sync_job_resumes_from_page_boundary(self):
+        source = StreamingSource()
+        state = RecordingStateStore()
+        job = make_job(source, CrashingTarget(), state, checkpoint_save_every=1, fetch_chunk_size=1)
+
+        with self.assertRaises(RuntimeError):
+            job.run()
+
+        self.assertEqual(state.saved_checkpoints, ["p1", "p2"])
+        source.requested.clear()
+        with self.assertRaises(RuntimeError):
+            job.run()
+        self.assertEqual(source.requested, ["p2"])  # заново грузится только страница с упавшим элементом
+
+    def test_snapshot_source_has_no_checkpoint(self):
+        source = SnapshotSource()
+        state = RecordingStateStore()
+        target = MemoryTarget()
+        job = make_job(source, target, state, checkpoint_save_every=1, fetch_chunk_size=2)
+
+        job.run()
+
+        self.assertEqual(len(target.upserted), 9)
+        self.assertEqual(source.requested, [None, "p1", "p2"])
+        self.assertEqual(state.saved_checkpoints, [])
+        self.assertIsNone(source.paginate_iter(None, source._fetch_page)[1])
+
+    def test_cursor_that_does_not_advance(self):
+        items, _ = StreamingSource().paginate_iter("x", lambda token: ([1], "x"))
+
+        with self.assertRaises(PermanentSourceError):
+            list(items)
+
+    def test_eager_returns_last_token(self):
+        source = StreamingSource()
+
+        items, token = source.paginate_eager(None, source._fetch_page)
+
+        self.assertEqual(len(items), 9)
+        self.assertEqual(token, "p2")
+
+
+class PaginatePrefetchTest(unittest.TestCase):
+    def test_pages_in_order_with_live_checkpoint(self):
+        items, checkpoint = PagedSource().paginate_prefetch(None, lambda token: PAGES[token], prefetch=1)
+
+        seen = [(item, checkpoint()) for item in items]
+
+        self.assertEqual(seen, [(1, None), (2, None), (3, "a"), (4, "a"), (5, "b")])
+        self.assertEqual(checkpoint(), "b")
+
+    def test_fetch_error_becomes_temporary_source_error(self):
+        def fetch_page(token):
+            if token == "a":
+                raise ConnectionError("boom")
+            return PAGES[token]
+
+        items, checkpoint = PagedSource().paginate_prefetch(None, fetch_page)
+
+        with self.assertRaises(TemporarySourceError):
+            list(items)
+        self.assertEqual(checkpoint(), "a")
+
+    def test_offset_pages_fetched_in_parallel_and_yielded_in_order(self):
+        total = 95
+        lock = threading.Lock()
+        active = [0, 0]  # сейчас, максимум
+        gate = threading.Barrier(3, timeout=5)
+
+        def fetch_page(offset):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            if 10 <= offset <= 30:
+                gate.wait()  # страницы 10, 20, 30 должны грузиться одновременно
+            with lock:
+                active[0] -= 1
+            return list(range(offset, min(offset + 10, total))), total
+
+        items, checkpoint = PagedSource().paginate_offset_prefetch(fetch_page, page_size=10, workers=3)
+
+        self.assertEqual(list(items), list(range(total)))
+        self.assertGreaterEqual(active[1], 3)
+        self.assertEqual(checkpoint(), 95)
+
+    def test_offset_pages_without_total(self):
+        items, checkpoint = PagedSource().paginate_offset_prefetch(
+            lambda offset: (list(range(offset, min(offset + 10, 25))), None), page_size=10, start_offset=10)
+
+        self.assertEqual(list(items), list(range(10, 25)))
+        self.assertEqual(checkpoint(), 25)
+
+    def test_offset_checkpoint_after_partial_and_empty_last_page(self):
+        for total in (7, 10):
+            items, checkpoint = PagedSource().paginate_offset_prefetch(
+                lambda offset: (list(range(offset, min(offset + 5, total))), None), page_size=5)
+
+            self.assertEqual(list(items), list(range(total)))
+            self.assertEqual(checkpoint(), total)  # 7: страница из 2; 10: последняя страница пустая
+
+
+if __name__ == "__main__":
+    unittest.main()
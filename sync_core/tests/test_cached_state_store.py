@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import unittest
+
+from sync_utils.sync_core.dto import Binding, ExternalKey, SyncItemState, SyncItemStatus
+from sync_utils.sync_core.stores.cached import CachedStateStore
+from sync_utils.sync_core.tests.fakes import key
+
+
+class CountingStateStore:
+    def __init__(self):
+        self.bindings: dict[ExternalKey, Binding] = {}
+        self.item_states: dict[ExternalKey, SyncItemState] = {}
+        self.reads: list[str] = []
+
+    def get_checkpoint(self, stream):
+        return None
+
+    def save_checkpoint(self, stream, token):
+        return None
+
+    def bind(self, key, internal_id, version):
+        self.bindings[key] = Binding(internal_id=internal_id, version=version)
+
+    def unbind(self, key):
+        self.bindings.pop(key, None)
+
+    def get_binding(self, key):
+        self.reads.append(f"binding:{key.key}")
+        return self.bindings.get(key)
+
+    def get_bindings_bulk(self, keys):
+        keys = list(keys)
+        self.reads.append("bindings:" + ",".join(k.key for k in keys))
+        return {k: self.bindings[k] for k in keys if k in self.bindings}
+
+    def get_item_state(self, key):
+        self.reads.append(f"state:{key.key}")
+        return self.item_states.get(key)
+
+    def save_item_state(self, state):
+        self.item_states[state.key] = state
+
+    def iter_bindings(self, system, *, chunk_size=1000, as_tuples=False):
+        return [(system, chunk_size, as_tuples)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CachedStateStoreTest(unittest.TestCase):
+    def test_hits_misses_and_negative_cache(self):
+        inner = CountingStateStore()
+        inner.bindings[key("a")] = Binding(internal_id="1", version="v1")
+        store = CachedStateStore(inner)
+
+        for _ in range(3):
+            self.assertEqual(store.get_binding(key("a")).internal_id, "1")
+            self.assertIsNone(store.get_binding(key("missing")))
+
+        self.assertEqual(inner.reads, ["binding:a", "binding:missing"])
+        stats = store.stats()["bindings"]
+        self.assertEqual((stats.hits, stats.misses, stats.size), (4, 2, 2))
+
+    def test_write_through(self):
+        inner = CountingStateStore()
+        store = CachedStateStore(inner)
+        self.assertIsNone(store.get_binding(key("a")))  # промах закэширован
+
+        store.bind(key("a"), "1", "v1")
+        store.save_item_state(SyncItemState(key=key("a"), version="v1", status=SyncItemStatus.SUCCESS))
+
+        self.assertEqual(store.get_binding(key("a")), Binding(internal_id="1", version="v1"))
+        self.assertEqual(store.get_item_state(key("a")).status, SyncItemStatus.SUCCESS)
+        self.assertEqual(inner.bindings[key("a")].internal_id, "1")
+        self.assertEqual(inner.reads, ["binding:a"])
+
+        store.unbind(key("a"))
+        self.assertIsNone(store.get_binding(key("a")))
+        self.assertNotIn(key("a"), inner.bindings)
+
+    def test_ttl_and_lru_eviction(self):
+        inner = CountingStateStore()
+        clock = FakeClock()
+        store = CachedStateStore(inner, max_entries=2, ttl=10, negative_ttl=1, clock=clock)
+
+        store.bind(key("a"), "1", None)
+        store.get_binding(key("missing"))
+        clock.now = 5
+        store.get_binding(key("missing"))  # негативная запись истекла
+        store.bind(key("b"), "2", None)  # вытесняет a (давно не трогали)
+        store.get_binding(key("a"))
+        clock.now = 20
+        store.get_binding(key("b"))  # истёк ttl
+
+        self.assertEqual(inner.reads, ["binding:missing", "binding:missing", "binding:a", "binding:b"])
+
+    def test_bulk_reads_only_uncached_keys(self):
+        inner = CountingStateStore()
+        inner.bindings[key("a")] = Binding(internal_id="1")
+        inner.bindings[key("b")] = Binding(internal_id="2")
+        store = CachedStateStore(inner)
+        store.get_binding(key("a"))
+
+        first = store.get_bindings_bulk([key("a"), key("b"), key("c")])
+        second = store.get_bindings_bulk([key("a"), key("b"), key("c")])
+
+        self.assertEqual(first, second)
+        self.assertEqual(sorted(k.key for k in first), ["a", "b"])
+        self.assertEqual(inner.reads, ["binding:a", "bindings:b,c"])
+
+    def test_optional_methods_only_when_inner_has_them(self):
+        store = CachedStateStore(CountingStateStore())
+
+        self.assertTrue(callable(getattr(store, "get_bindings_bulk", None)))
+        self.assertTrue(callable(getattr(store, "unbind", None)))
+        for name in ("get_item_states_bulk", "flush", "acquire_lease", "schedule_retry"):
+            self.assertIsNone(getattr(store, name, None), name)
+
+    def test_passthrough_of_inner_optional_methods(self):
+        inner = CountingStateStore()
+        inner.flushed = 0
+        inner.flush = lambda: setattr(inner, "flushed", inner.flushed + 1)
+        store = CachedStateStore(inner)
+
+        store.flush()
+
+        self.assertEqual(inner.flushed, 1)
+
+    def test_iter_bindings_forwards_options(self):
+        store = CachedStateStore(CountingStateStore())
+
+        self.assertEqual(list(store.iter_bindings("sys", chunk_size=10, as_tuples=True)), [("sys", 10, True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
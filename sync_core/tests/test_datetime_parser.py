@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timezone
+
+from sync_utils.sync_core.datetime_parser import DateTimeParser
+from sync_utils.sync_core.dto import Payload
+
+
+class DateTimeParserTest(unittest.TestCase):
+    def test_remembers_last_format_per_context(self):
+        parser = DateTimeParser(("%d.%m.%Y %H:%M:%S", "%Y/%m/%d"))
+
+        self.assertEqual(
+            parser.parse("01.02.2024 10:11:12", context="DATE_MODIFY"),
+            datetime(2024, 2, 1, 10, 11, 12, tzinfo=timezone.utc))
+        self.assertEqual(parser.parse("2024/03/04", context="BEGINDATE"), datetime(2024, 3, 4, tzinfo=timezone.utc))
+        self.assertEqual(parser._last_strategy, {"DATE_MODIFY": "%d.%m.%Y %H:%M:%S", "BEGINDATE": "%Y/%m/%d"})
+
+    def test_parse_many_falls_back_per_value(self):
+        parser = DateTimeParser(("%d.%m.%Y %H:%M:%S.%f",))
+
+        result = parser.parse_many(["01.02.2024 10:11:12.5", "2024-01-01T00:00:00Z", 0])
+
+        self.assertEqual(result, [
+            datetime(2024, 2, 1, 10, 11, 12, 500000, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(1970, 1, 1, tzinfo=timezone.utc),
+        ])
+
+    def test_invalid_value(self):
+        with self.assertRaises(ValueError):
+            DateTimeParser().parse("31.02.2024")
+
+    def test_payload_versions(self):
+        self.assertEqual(
+            Payload.versions_from_datetimes(["2024-05-05 01:02:03", "1700000000"]),
+            ["2024-05-05T01:02:03+00:00", "2023-11-14T22:13:20+00:00"])
+        self.assertEqual(Payload.version_from_datetime("2024-01-01T03:00:00+03:00"), "2024-01-01T00:00:00+00:00")
+
+    def test_cached_timestamp_does_not_take_iso_dates(self):
+        parser = DateTimeParser()
+
+        self.assertEqual(parser.parse("1700000000", context="f"), datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc))
+        self.assertEqual(parser.parse_value("20240101", context="f"), datetime(2024, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(parser.parse_many(["1700000000", "20240101"], context="f")[1],
+                         datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_short_digit_string_does_not_cache_timestamp(self):
+        parser = DateTimeParser()
+
+        parser.parse("5", context="f")
+
+        self.assertNotIn("f", parser._last_strategy)
+
+    def test_no_context_is_not_remembered(self):
+        parser = DateTimeParser(("%d.%m.%Y",))
+
+        parser.parse("01.02.2024")
+
+        self.assertEqual(parser._last_strategy, {})
+
+    def test_format_whitespace_matches_like_strptime(self):
+        parser = DateTimeParser(("%d.%m.%Y %H:%M:%S",))
+
+        self.assertEqual(parser.parse("01.02.2024  10:00:00", context="f"),
+                         datetime(2024, 2, 1, 10, tzinfo=timezone.utc))
+        self.assertEqual(DateTimeParser().parse("2024-01-01  10:00:00"), datetime(2024, 1, 1, 10, tzinfo=timezone.utc))
+
+    def test_payload_uses_given_parser(self):
+        parser = DateTimeParser(("%d.%m.%Y",))
+
+        payload = Payload.with_version_from_datetime({}, "01.02.2024", context="DATE_MODIFY", parser=parser)
+
+        self.assertEqual(payload.version, "2024-02-01T00:00:00+00:00")
+        self.assertEqual(parser._last_strategy, {"DATE_MODIFY": "%d.%m.%Y"})
+        self.assertEqual(Payload.versions_from_datetimes(["02.02.2024"], parser=parser), ["2024-02-02T00:00:00+00:00"])
+
+
+if __name__ == "__main__":
+    unittest.main()
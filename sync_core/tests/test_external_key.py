@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pickle
+import unittest
+from dataclasses import replace
+
+from sync_utils.sync_core.dto import ExternalKey, KeyBatch
+
+
+class ExternalKeyTest(unittest.TestCase):
+    def test_dataclass_semantics_kept(self):
+        key = ExternalKey(system="".join(["b", "x"]), key="1")
+
+        self.assertEqual(key, ExternalKey("bx", "1"))
+        self.assertNotEqual(key, ("bx", "1"))
+        self.assertEqual(hash(key), hash(("bx", "1")))
+        self.assertIs(key.system, ExternalKey("bx", "2").system)  # интернирована
+        self.assertEqual(replace(key, key="2"), ExternalKey("bx", "2"))
+        self.assertEqual(pickle.loads(pickle.dumps(key)), key)
+        self.assertFalse(hasattr(key, "__dict__"))
+        with self.assertRaises(AttributeError):
+            key.key = "2"
+
+
+class KeyBatchTest(unittest.TestCase):
+    def test_groups_by_system_without_duplicates(self):
+        keys = [ExternalKey("a", "1"), ExternalKey("b", "1"), ExternalKey("a", "2"), ExternalKey("a", "1"),
+                ExternalKey("a", "3")]
+
+        batches = KeyBatch.from_keys(keys, size=2)
+
+        self.assertEqual(batches, [KeyBatch("a", ("1", "2")), KeyBatch("a", ("3",)), KeyBatch("b", ("1",))])
+        self.assertEqual(list(batches[0]), [ExternalKey("a", "1"), ExternalKey("a", "2")])
+        self.assertIn(ExternalKey("a", "2"), batches[0])
+        self.assertNotIn(ExternalKey("b", "2"), batches[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import unittest
+
+from sync_utils.sync_core.dto import Payload, Projection
+from sync_utils.sync_core.hashing import canonical_hash, legacy_hash, project_fields
+from sync_utils.sync_core.tests.fakes import EchoMapper, MemoryStateStore, MemoryTarget, key, make_job
+
+
+class DealDTO:
+    def to_dict(self):
+        return {"ID": "1", "TITLE": "deal"}
+
+
+class PayloadHashTest(unittest.TestCase):
+    def test_sha256_matches_legacy_json_dumps_scheme(self):
+        values = [
+            {"b": 1, "a": [1, 2.5, {"z": None, "y": True}], "é": "ü\n\"\\\x01"},
+            {"x": {"y": {"z": [float("inf"), -0.0, 1e100, (1, 2), {}, []]}}},
+            {2: "int key", 1.5: "float key"},
+            [],
+            "plain",
+        ]
+        for value in values:
+            self.assertEqual(canonical_hash(value), legacy_hash(value))
+            self.assertEqual(Payload.with_version_from_hash(value).version, legacy_hash(value))
+
+    def test_serializer_fallback(self):
+        payload = Payload.with_version_from_hash(DealDTO())
+
+        self.assertEqual(payload.version, legacy_hash({"ID": "1", "TITLE": "deal"}))
+
+    def test_alternative_algorithm_is_prefixed(self):
+        version = Payload.version_from_hash({"a": 1}, algorithm="blake2b")
+
+        self.assertTrue(version.startswith("blake2b:"))
+        self.assertNotEqual(version, Payload.version_from_hash({"a": 2}, algorithm="blake2b"))
+
+    def test_excluded_fields_do_not_change_version(self):
+        first = Payload.with_version_from_hash(
+            {"TITLE": "deal", "VIEWS": 1, "CONTACT": {"NAME": "a", "LAST_SEEN": 1}}, exclude=["VIEWS", "CONTACT.LAST_SEEN"])
+        second = Payload.with_version_from_hash(
+            {"TITLE": "deal", "VIEWS": 9, "CONTACT": {"NAME": "a", "LAST_SEEN": 5}}, exclude=["VIEWS", "CONTACT.LAST_SEEN"])
+
+        self.assertEqual(first.version, second.version)
+
+    def test_selected_fields_and_changed_fields(self):
+        fields = ["TITLE", "CONTACT.NAME"]
+        first = Payload.with_version_from_hash(
+            {"TITLE": "deal", "STAGE": "new", "CONTACT": {"NAME": "a", "PHONE": "1"}}, fields=fields, fingerprints=True)
+        second = Payload.with_version_from_hash(
+            {"TITLE": "deal", "STAGE": "won", "CONTACT": {"NAME": "b", "PHONE": "2"}}, fields=fields, fingerprints=True)
+
+        self.assertEqual(set(first.fingerprints), {"TITLE", "CONTACT.NAME"})
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(second.changed_fields(first.fingerprints), frozenset({"CONTACT.NAME"}))
+        self.assertIsNone(second.changed_fields(None))
+
+    def test_path_through_list_skips_scalar_elements(self):
+        data = {"ITEMS": [{"ID": 1, "PRICE": 10}, "legacy", 7, {"PRICE": 5}]}
+
+        self.assertEqual(project_fields(data, ["ITEMS.ID"]), {"ITEMS": [{"ID": 1}, {}]})
+        Payload.with_version_from_hash(data, fields=["ITEMS.ID"], fingerprints=True)
+
+    def test_sync_job_does_not_mutate_mapper_projection(self):
+        shared = Projection(kind="deal", data={})
+        old = Payload.with_version_from_hash({"TITLE": "a", "STAGE": "new"}, fingerprints=True)
+        new = Payload.with_version_from_hash({"TITLE": "a", "STAGE": "won"}, fingerprints=True)
+        state = MemoryStateStore()
+        state.bind(key(1), "internal-1", old.version, fingerprints=old.fingerprints)
+        received = []
+
+        class Source:
+            def fetch(self, since_token):
+                return [(key(1), new)], None
+
+            def validate(self, key, payload):
+                return None
+
+        class CachingMapper(EchoMapper):
+            def map(self, key, payload):
+                return shared  # одна проекция на все ключи (кэш маппера)
+
+        class RecordingTarget(MemoryTarget):
+            def upsert(self, key, projection, binding=None):
+                received.append(projection.changed_fields)
+                return super().upsert(key, projection, binding)
+
+        make_job(Source(), RecordingTarget(), state, mapper=CachingMapper()).run()
+
+        self.assertEqual(received, [frozenset({"STAGE"})])
+        self.assertIsNone(shared.changed_fields)
+
+    def test_not_serializable(self):
+        with self.assertRaises(ValueError):
+            Payload.with_version_from_hash({"a": object()})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import copy
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from sync_utils.sync_core.dto import ExternalKey, Payload
+from sync_utils.sync_core.sharding import ShardedSource, ShardedSyncJob, shard_of, shard_stream
+from sync_utils.sync_core.tests.fakes import MemoryStateStore, MemoryTarget, key, make_job
+
+
+class IdSource:
+    """Отдаёт ключи с id > since_token; чекпоинт — максимальный id выдачи (monotonic_id)."""
+    checkpoint_type = "monotonic_id"
+
+    def __init__(self, total):
+        self.total = total
+
+    def fetch(self, since_token):
+        since = int(since_token or 0)
+        items = [(key(i), Payload(data=i, version="1")) for i in range(since + 1, self.total + 1)]
+        return items, str(self.total)
+
+    def validate(self, key, payload):
+        return None
+
+
+def shard_job(source, target, state, stream, shard, shards):
+    return make_job(ShardedSource(source, shard, shards), target, state, stream=stream)
+
+
+def thread_pool(workers):
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+class ShardOfTest(unittest.TestCase):
+    def test_stable_and_spread(self):
+        self.assertEqual(shard_of("deal-42", 8), shard_of(ExternalKey(system="other", key="deal-42"), 8))
+        self.assertEqual(shard_of("deal-42", 8), 3)  # не зависит от PYTHONHASHSEED
+        counts = [0] * 4
+        for i in range(4000):
+            counts[shard_of(str(i), 4)] += 1
+        self.assertTrue(all(800 < c < 1200 for c in counts), counts)
+
+    def test_sharded_source_partitions_items_and_keeps_checkpoint(self):
+        source = IdSource(50)
+        seen = []
+        for shard in range(3):
+            items, checkpoint = ShardedSource(source, shard, 3).fetch(None)
+            keys = [key.key for key, _ in items]
+            self.assertTrue(all(shard_of(k, 3) == shard for k in keys))
+            self.assertEqual(checkpoint, "50")
+            seen.extend(keys)
+        self.assertEqual(sorted(seen, key=int), [str(i) for i in range(1, 51)])
+        self.assertEqual(ShardedSource(source, 0, 3).checkpoint_type, "monotonic_id")
+
+    def test_sharded_source_survives_copy_and_pickle(self):
+        sharded = ShardedSource(IdSource(5), 1, 3)
+
+        for clone in (copy.copy(sharded), pickle.loads(pickle.dumps(sharded))):
+            self.assertEqual((clone.shard, clone.shards, clone.source.total), (1, 3, 5))
+
+
+class ShardedSyncJobTest(unittest.TestCase):
+    def test_merges_results_and_advances_parent_checkpoint(self):
+        state, target = MemoryStateStore(), MemoryTarget()
+        factory = partial(shard_job, IdSource(30), target, state)
+        job = ShardedSyncJob("deals", 3, factory, state, executor_factory=thread_pool)
+
+        result = job.run()
+
+        self.assertEqual(result.created, 30)
+        self.assertEqual(sorted(target.upserted, key=int), [str(i) for i in range(1, 31)])
+        for shard in range(3):
+            self.assertEqual(state.checkpoints[shard_stream("deals", shard)], "30")
+        self.assertEqual(state.checkpoints["deals"], "30")
+
+    def test_shards_start_from_parent_and_parent_waits_for_slowest_shard(self):
+        state = MemoryStateStore()
+        state.checkpoints["deals"] = "10"
+        failing = next(str(i) for i in range(11, 21) if shard_of(str(i), 2) == 1)
+        target = MemoryTarget(temp_fail={failing})
+        factory = partial(shard_job, IdSource(20), target, state)
+
+        result = ShardedSyncJob("deals", 2, factory, state, executor_factory=thread_pool).run()
+
+        self.assertEqual(result.created, 9)
+        self.assertEqual(result.failed, 1)
+        self.assertTrue(all(int(k) > 10 for k in target.upserted))
+        self.assertEqual(state.checkpoints[shard_stream("deals", 0)], "20")
+        self.assertEqual(state.checkpoints[shard_stream("deals", 1)], "10")  # шард 1 не прошёл упавший ключ
+        self.assertEqual(state.checkpoints["deals"], "10")
+
+    def test_parent_not_moved_until_every_shard_has_checkpoint(self):
+        state = MemoryStateStore()
+        state.checkpoints[shard_stream("deals", 0)] = "7"
+        job = ShardedSyncJob("deals", 2, shard_job, state)
+
+        self.assertIsNone(job.advance_parent_checkpoint())
+        state.checkpoints[shard_stream("deals", 1)] = "12"
+        self.assertEqual(job.advance_parent_checkpoint(), "7")
+        self.assertEqual(state.checkpoints["deals"], "7")
+
+
+if __name__ == "__main__":
+    unittest.main()
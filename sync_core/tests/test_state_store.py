@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+
+if not settings.configured:  # без проекта: sqlite в памяти, таблицы — из миграций sync_core
+    settings.configure(
+        INSTALLED_APPS=["sync_utils.sync_core"],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        DEFAULT_AUTO_FIELD="django.db.models.BigAutoField",
+        USE_TZ=True,
+    )
+    django.setup()
+    call_command("migrate", "sync_core", verbosity=0)
+
+from django.db import connection  # noqa: E402
+from django.test import TestCase  # noqa: E402
+
+from sync_utils.sync_core.dto import Binding, KeyBinding, SyncItemState, SyncItemStatus  # noqa: E402
+from sync_utils.sync_core.errors import LeaseLostError  # noqa: E402
+from sync_utils.sync_core.models import SyncBinding, SyncItemState as SyncItemStateRow, SyncLease  # noqa: E402
+from sync_utils.sync_core.stores import DefaultStateStore  # noqa: E402
+from sync_utils.sync_core.tests.fakes import key  # noqa: E402
+
+
+class FrozenTime:
+    """timezone.now() стора под ручными часами."""
+
+    def __init__(self, test: unittest.TestCase):
+        self.now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        patcher = mock.patch("sync_utils.sync_core.stores.base.timezone.now", lambda: self.now)
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+    def tick(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+class BulkReadTest(TestCase):
+    def test_bindings_bulk_batches_by_system_and_sees_buffer(self):
+        store = DefaultStateStore(bulk_lookup_size=2, buffered=True)
+        for i in range(3):
+            store.bind(key(i), f"internal-{i}", "v1")
+        store.bind(key("x", system="other"), "internal-x", "v1")
+        store.flush()
+        store.bind(key(0), "internal-0", "v2")  # ещё в буфере
+
+        with self.assertNumQueries(3):  # sys: 2 пачки по 2, other: 1
+            bindings = store.get_bindings_bulk([key(0), key(1), key(2), key("x", system="other"), key("missing")])
+
+        self.assertEqual(len(bindings), 4)
+        self.assertEqual(bindings[key(0)].version, "v2")
+        self.assertEqual(bindings[key("x", system="other")].internal_id, "internal-x")
+
+    def test_item_states_bulk(self):
+        store = DefaultStateStore()
+        store.save_item_state(SyncItemState(
+            key=key(1), version="v1", status=SyncItemStatus.TEMP_ERROR, attempts=2, last_error="timeout"))
+        store.save_item_state(SyncItemState(key=key(2), version="v1", status=SyncItemStatus.SUCCESS))
+
+        with self.assertNumQueries(1):
+            states = store.get_item_states_bulk([key(1), key(2), key(3)])
+
+        self.assertEqual(set(states), {key(1), key(2)})
+        self.assertEqual((states[key(1)].status, states[key(1)].attempts, states[key(1)].last_error),
+                         (SyncItemStatus.TEMP_ERROR, 2, "timeout"))
+        self.assertIsNone(states[key(2)].last_error)
+
+
+class IterBindingsTest(TestCase):
+    def setUp(self):
+        self.store = DefaultStateStore()
+        for i in range(5):
+            self.store.bind(key(i), f"internal-{i}", "v1")
+        self.store.bind(key("x", system="other"), "internal-x", "v1")
+
+    def test_keyset_pages(self):
+        with self.assertNumQueries(3):  # 2 + 2 + 1
+            bindings = list(self.store.iter_bindings("sys", chunk_size=2))
+
+        self.assertEqual([b.key.key for b in bindings], ["0", "1", "2", "3", "4"])
+        self.assertEqual(bindings[0], KeyBinding(key=key(0), binding=Binding(internal_id="internal-0", version="v1")))
+        self.assertEqual(
+            next(iter(self.store.iter_bindings("other", as_tuples=True))), ("x", "internal-x", "v1"))
+
+    def test_unbind_during_iteration(self):
+        seen = []
+        for key_binding in self.store.iter_bindings("sys", chunk_size=2):
+            seen.append(key_binding.key.key)
+            self.store.unbind(key_binding.key)
+
+        self.assertEqual(seen, ["0", "1", "2", "3", "4"])
+        self.assertEqual(list(SyncBinding.objects.values_list("ext_key", flat=True)), ["x"])
+
+
+class LeaseTest(TestCase):
+    def setUp(self):
+        self.clock = FrozenTime(self)
+        self.store = DefaultStateStore()
+
+    def test_acquire_heartbeat_release(self):
+        lease = self.store.acquire_lease("deals", "worker-1", 60)
+
+        self.assertEqual((lease.owner, lease.token), ("worker-1", 1))
+        self.assertIsNone(self.store.acquire_lease("deals", "worker-2", 60))
+        self.clock.tick(50)
+        lease = self.store.heartbeat_lease(lease, 60)
+        self.clock.tick(50)
+        self.assertIsNone(self.store.acquire_lease("deals", "worker-2", 60))  # продлили — ещё наша
+
+        self.store.release_lease(lease)
+        self.assertEqual(self.store.acquire_lease("deals", "worker-2", 60).token, 2)
+
+    def test_checkpoint_only_while_lease_is_held(self):
+        lease = self.store.acquire_lease("deals", "worker-1", 60)
+        self.store.save_checkpoint("deals", "10", lease=lease)
+
+        self.clock.tick(61)
+        other = self.store.acquire_lease("deals", "worker-2", 60)
+        with self.assertRaises(LeaseLostError):
+            self.store.save_checkpoint("deals", "20", lease=lease)
+        with self.assertRaises(LeaseLostError):
+            self.store.heartbeat_lease(lease, 60)
+        self.store.release_lease(lease)  # чужую аренду не снимает
+
+        self.assertEqual(self.store.get_checkpoint("deals"), "10")
+        self.assertIsNone(self.store.acquire_lease("deals", "worker-3", 60))
+        self.store.save_checkpoint("deals", "20", lease=other)
+        self.assertEqual(self.store.get_checkpoint("deals"), "20")
+
+    def test_lease_row_created_concurrently(self):
+        self.store.release_lease(self.store.acquire_lease("deals", "worker-1", 60))
+
+        # строку аренды успел вставить соседний воркер: наша вставка падает с IntegrityError
+        with mock.patch("django.db.models.query.QuerySet.exists", return_value=False):
+            lease = self.store.acquire_lease("deals", "worker-2", 60)
+
+        self.assertEqual((lease.owner, lease.token), ("worker-2", 2))
+        self.assertEqual(SyncLease.objects.filter(stream="deals").count(), 1)
+
+
+class RetryQueueTest(TestCase):
+    def setUp(self):
+        self.clock = FrozenTime(self)
+        self.store = DefaultStateStore(bulk_lookup_size=2)
+
+    def test_due_retries_in_order_of_next_attempt(self):
+        self.store.schedule_retry("deals", key(1), 1, delay=30)
+        self.store.schedule_retry("deals", key(2), 1, delay=10)
+        self.store.schedule_retry("deals", key(3), 1, delay=120)
+        self.store.schedule_retry("leads", key(4), 1, delay=0)
+        self.store.schedule_retry("deals", key(1), 2, delay=20)  # перепланирование той же записи
+
+        self.clock.tick(60)
+        due = self.store.due_retries("deals", limit=10)
+
+        self.assertEqual([(entry.key.key, entry.attempts) for entry in due], [("2", 1), ("1", 2)])
+        self.assertEqual(due[0].next_attempt_at, datetime(2024, 1, 1, 0, 0, 10, tzinfo=timezone.utc))
+        self.assertEqual(len(self.store.due_retries("deals", limit=1)), 1)
+
+    def test_drop_retries(self):
+        for i in range(3):
+            self.store.schedule_retry("deals", key(i), 1, delay=0)
+        self.store.schedule_retry("leads", key(0), 1, delay=0)
+
+        self.store.drop_retries("deals", [key(0), key(1), key(2)])
+
+        self.assertEqual(self.store.due_retries("deals", limit=10), [])
+        self.assertEqual([entry.key for entry in self.store.due_retries("leads", limit=10)], [key(0)])
+
+
+class BufferedFlushTest(TestCase):
+    def test_flush_inserts_and_updates_in_one_upsert(self):
+        store = DefaultStateStore(buffered=True)
+        store.bind(key(1), "internal-1", "v1")
+        store.flush()
+
+        store.bind(key(1), "internal-1", "v2", fingerprints={"TITLE": "abc"})
+        store.bind(key(2), "internal-2", "v1")
+        store.save_item_state(SyncItemState(key=key(1), version="v2", status=SyncItemStatus.SUCCESS))
+        self.assertFalse(SyncBinding.objects.filter(ext_key="2").exists())  # пока только в буфере
+        with self.assertNumQueries(2):  # по запросу на таблицу
+            store.flush()
+
+        rows = dict(SyncBinding.objects.values_list("ext_key", "version"))
+        self.assertEqual(rows, {"1": "v2", "2": "v1"})
+        self.assertEqual(SyncBinding.objects.get(ext_key="1").fingerprints, {"TITLE": "abc"})
+        self.assertEqual(SyncItemStateRow.objects.get(ext_key="1").status, SyncItemStatus.SUCCESS.value)
+        self.assertEqual(
+            DefaultStateStore().get_binding(key(1)), Binding(internal_id="internal-1", version="v2",
+                                                             fingerprints={"TITLE": "abc"}))
+
+    def test_buffer_overflow_flushes(self):
+        store = DefaultStateStore(buffered=True, buffer_size=2)
+
+        store.bind(key(1), "internal-1", "v1")
+        store.bind(key(2), "internal-2", "v1")
+
+        self.assertEqual(SyncBinding.objects.count(), 2)
+
+    def test_unique_fields_only_where_backend_supports_conflict_target(self):
+        store = DefaultStateStore(buffered=True)
+        store.bind(key(1), "internal-1", "v1")
+
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False), \
+                mock.patch.object(SyncBinding.objects, "bulk_create") as bulk_create:
+            store.flush()  # как на MySQL: ON DUPLICATE KEY UPDATE без списка полей
+
+        self.assertNotIn("unique_fields", bulk_create.call_args.kwargs)
+        self.assertTrue(bulk_create.call_args.kwargs["update_conflicts"])
+
+
+if __name__ == "__main__":
+    unittest.main()
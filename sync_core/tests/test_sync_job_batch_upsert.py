@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import unittest
+
+from sync_utils.sync_core.dto import SyncItemStatus
+from sync_utils.sync_core.errors import PermanentTargetError, TemporaryTargetError
+from sync_utils.sync_core.interfaces import Target
+from sync_utils.sync_core.tests.fakes import ListSource, MemoryStateStore, key, make_job
+
+
+class BatchTarget:
+    def __init__(self, item_errors: dict[str, Exception] | None = None, batch_error: Exception | None = None):
+        self.item_errors = item_errors or {}
+        self.batch_error = batch_error
+        self.lock = threading.Lock()
+        self.batches: list[list[str]] = []
+        self.single_calls = 0
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        self.single_calls += 1
+        return f"internal-{key.key}"
+
+    def upsert_many(self, items):
+        with self.lock:
+            self.batches.append([key.key for key, _, _ in items])
+        if self.batch_error is not None:
+            raise self.batch_error
+        return [self.item_errors.get(key.key, f"internal-{key.key}") for key, _, _ in items]
+
+
+class SingleTarget(Target):
+    """Явный наследник Target только с upsert — как BxActivityTarget в sync_core/test.py."""
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, *, binding=None):
+        return f"internal-{key.key}"
+
+
+class SyncJobBatchUpsertTest(unittest.TestCase):
+    def test_items_grouped_into_batches(self):
+        target = BatchTarget()
+        state = MemoryStateStore()
+        source = ListSource([str(i) for i in range(7)], version=None)
+
+        result = make_job(source, target, state, target_batch_size=3).run()
+
+        self.assertEqual(target.batches, [["0", "1", "2"], ["3", "4", "5"], ["6"]])
+        self.assertEqual(target.single_calls, 0)
+        self.assertEqual(result.created, 7)
+        self.assertEqual(state.bindings[key("6")].internal_id, "internal-6")
+
+    def test_per_item_errors_map_to_item_states(self):
+        target = BatchTarget(item_errors={"1": TemporaryTargetError("busy"), "2": PermanentTargetError("bad")})
+        state = MemoryStateStore()
+
+        result = make_job(ListSource(["0", "1", "2"], version=None), target, state).run()
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(state.item_states[key("1")].status, SyncItemStatus.TEMP_ERROR)
+        self.assertEqual(state.item_states[key("2")].status, SyncItemStatus.PERM_ERROR)
+        self.assertNotIn(key("1"), state.bindings)
+
+    def test_batch_call_error_fails_every_item(self):
+        target = BatchTarget(batch_error=TemporaryTargetError("timeout"))
+        state = MemoryStateStore()
+
+        result = make_job(ListSource(["0", "1"], version=None), target, state).run()
+
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(
+            {s.status for s in state.item_states.values()}, {SyncItemStatus.TEMP_ERROR})
+
+    def test_repeated_key_starts_new_batch(self):
+        target = BatchTarget()
+        state = MemoryStateStore()
+
+        result = make_job(ListSource(["a", "b", "a"], version=None), target, state).run()
+
+        self.assertEqual(target.batches, [["a", "b"], ["a"]])
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.updated, 1)
+
+    def test_target_subclass_without_upsert_many_writes_one_by_one(self):
+        state = MemoryStateStore()
+
+        result = make_job(ListSource(["0", "1", "2"], version=None), SingleTarget(), state).run()
+
+        self.assertEqual(result.created, 3)
+        self.assertEqual(state.bindings[key("2")].internal_id, "internal-2")
+
+    def test_batches_with_workers(self):
+        target = BatchTarget()
+        state = MemoryStateStore()
+        source = ListSource([str(i % 20) for i in range(100)], version=None)
+
+        result = make_job(source, target, state, workers=3, target_batch_size=4, fetch_chunk_size=25).run()
+
+        self.assertEqual(result.created, 20)
+        self.assertEqual(result.updated, 80)
+        self.assertTrue(all(len(batch) <= 4 for batch in target.batches))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,8 @@ from __future__ import annotations
 
 import unittest
 
-from sync_utils.sync_core.dto import ExternalKey, Payload, Projection, SyncItemState, SyncItemStatus
-from sync_utils.sync_core.errors import TemporaryError
-from sync_utils.sync_core.sync_job import SyncJob
+from sync_utils.sync_core.dto import Payload, SyncItemStatus
+from sync_utils.sync_core.tests.fakes import MemoryTarget, RecordingStateStore, key, make_job
 
 
 class DummySource:
@@ -16,7 +15,7 @@ class DummySource:
         def _iter():
             for i in range(1, self.count + 1):
                 self.last_checkpoint = f"cp-{i}"
-                yield ExternalKey(system="sys", key=str(i)), Payload(data=f"item-{i}", version=str(i))
+                yield key(i), Payload(data=f"item-{i}", version=str(i))
 
         return _iter(), lambda: self.last_checkpoint
 
@@ -24,108 +23,55 @@ class DummySource:
         return None
 
 
-class DummyMapper:
-    def validate(self, key, payload):
-        return None
-
-    def map(self, key, payload):
-        return Projection(kind="kind", data=payload.data)
-
-
-class DummyTarget:
-    def __init__(self, fail_on: str | None = None):
-        self.fail_on = fail_on
-
-    def validate(self, key, projection):
-        return None
-
-    def upsert(self, key, projection, binding=None):
-        if key.key == self.fail_on:
-            raise TemporaryError("temp fail")
-        return f"internal-{key.key}"
-
-
-class DummyStateStore:
+class BufferedStateStore(RecordingStateStore):
     def __init__(self):
-        self.saved_checkpoints: list[str] = []
-        self.item_states: dict[str, SyncItemState] = {}
-
-    def get_checkpoint(self, stream):
-        return None
+        super().__init__()
+        self.events: list[str] = []
+        self.pending: list[str] = []
 
     def save_checkpoint(self, stream, token):
-        self.saved_checkpoints.append(token)
-
-    def bind(self, key, internal_id, version):
-        return None
-
-    def get_binding(self, key):
-        return None
-
-    def iter_bindings(self, system):
-        return []
-
-    def validate_binding(self, key, binding):
-        return None
-
-    def get_item_state(self, key):
-        return self.item_states.get(key.key)
+        self.events.append(f"checkpoint:{token}")
+        super().save_checkpoint(stream, token)
 
     def save_item_state(self, state):
-        self.item_states[state.key.key] = state
-
-
-class DummyLogger:
-    def on_skipped(self, key, reason):
-        return None
-
-    def on_created(self, key, internal_id):
-        return None
-
-    def on_updated(self, key, internal_id):
-        return None
+        self.pending.append(state.key.key)
+        super().save_item_state(state)
 
-    def on_error(self, key, exc):
-        return None
+    def flush(self):
+        if self.pending:
+            self.events.append("flush:" + ",".join(self.pending))
+            self.pending = []
 
 
 class SyncJobCheckpointTest(unittest.TestCase):
     def test_deferred_checkpoint_saved_in_batches(self):
-        state = DummyStateStore()
-        job = SyncJob(
-            stream="s",
-            source=DummySource(count=5),
-            mapper=DummyMapper(),
-            target=DummyTarget(),
-            state=state,
-            logger=DummyLogger(),
-            checkpoint_save_every=3,
-        )
+        state = RecordingStateStore()
+        job = make_job(DummySource(count=5), MemoryTarget(), state, checkpoint_save_every=3)
 
         job.run()
 
         self.assertEqual(state.saved_checkpoints, ["cp-3", "cp-5", "cp-5"])
 
     def test_retryable_temp_error_blocks_checkpoint(self):
-        state = DummyStateStore()
-        job = SyncJob(
-            stream="s",
-            source=DummySource(count=2),
-            mapper=DummyMapper(),
-            target=DummyTarget(fail_on="2"),
-            state=state,
-            logger=DummyLogger(),
-            checkpoint_save_every=1,
-        )
+        state = RecordingStateStore()
+        job = make_job(DummySource(count=2), MemoryTarget(temp_fail=["2"]), state, checkpoint_save_every=1)
 
         result = job.run()
 
         self.assertEqual(state.saved_checkpoints, ["cp-1"])
         self.assertEqual(result.failed, 1)
-        saved_state = state.item_states["2"]
+        saved_state = state.item_states[key("2")]
         self.assertEqual(saved_state.status, SyncItemStatus.TEMP_ERROR)
         self.assertEqual(saved_state.attempts, 1)
 
+    def test_buffered_state_flushed_before_checkpoint(self):
+        state = BufferedStateStore()
+        job = make_job(DummySource(count=3), MemoryTarget(), state, checkpoint_save_every=2)
+
+        job.run()
+
+        self.assertEqual(state.events, ["flush:1,2", "checkpoint:cp-2", "flush:3", "checkpoint:cp-3", "checkpoint:cp-3"])
+
 
 if __name__ == "__main__":
     unittest.main()
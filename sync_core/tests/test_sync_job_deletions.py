@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import unittest
+
+from sync_utils.sync_core.dto import Payload
+from sync_utils.sync_core.errors import TemporarySourceError, TemporaryTargetError
+from sync_utils.sync_core.interfaces import StateStore, Target
+from sync_utils.sync_core.sharding import ShardedSource
+from sync_utils.sync_core.tests.fakes import MemoryStateStore, NullLogger, key, make_job
+
+
+class SnapshotSource:
+    checkpoint_type = "none"
+
+    def __init__(self, keys: list[str], fail_after: int | None = None):
+        self.keys = keys
+        self.fail_after = fail_after
+
+    def fetch(self, since_token):
+        return self._iter(), None
+
+    def _iter(self):
+        for i, k in enumerate(self.keys):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise TemporarySourceError("connection lost")
+            yield key(k), Payload(data=k, version="1")
+
+    def validate(self, key, payload):
+        return None
+
+
+class DeletingTarget:
+    def __init__(self, errors: dict[str, Exception] | None = None):
+        self.errors = errors or {}
+        self.deleted_batches: list[list[str]] = []
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        return f"internal-{key.key}"
+
+    def delete(self, key, binding):
+        return None
+
+    def delete_many(self, items):
+        self.deleted_batches.append([key.key for key, _ in items])
+        return [self.errors.get(key.key) for key, _ in items]
+
+
+class SingleDeleteTarget(Target):
+    """Явный наследник Target без delete_many: удаление по одному."""
+
+    def __init__(self):
+        self.deleted: list[str] = []
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, *, binding=None):
+        return f"internal-{key.key}"
+
+    def delete(self, key, binding):
+        self.deleted.append(key.key)
+
+
+class DeletionLogger(NullLogger):
+    def __init__(self):
+        self.deleted: list[str] = []
+
+    def on_deleted(self, key, internal_id):
+        self.deleted.append(internal_id)
+
+
+def bound_store(keys: list[str]) -> MemoryStateStore:
+    state = MemoryStateStore()
+    for k in keys:
+        state.bind(key(k), f"internal-{k}", "1")
+    return state
+
+
+def make_snapshot_job(source, target, state, **kwargs):
+    return make_job(source, target, state, detect_deletions=True, **kwargs)
+
+
+class SyncJobDeletionsTest(unittest.TestCase):
+    def test_unseen_bindings_deleted_in_batches(self):
+        target = DeletingTarget(errors={"d": TemporaryTargetError("locked")})
+        state = bound_store(["a", "b", "c", "d", "e", "f"])
+        logger = DeletionLogger()
+        job = make_snapshot_job(SnapshotSource(["a", "b"]), target, state, logger=logger, delete_batch_size=3)
+
+        result = job.run()
+
+        self.assertEqual(target.deleted_batches, [["c", "d", "e"], ["f"]])
+        self.assertEqual(logger.deleted, ["internal-c", "internal-e", "internal-f"])
+        self.assertEqual(sorted(k.key for k in state.bindings), ["a", "b", "d"])  # ошибка удаления — связь остаётся
+        self.assertEqual((result.deleted, result.failed), (3, 1))
+
+    def test_nothing_deleted_when_fetch_fails(self):
+        target = DeletingTarget()
+        state = bound_store(["a", "b", "c"])
+
+        with self.assertRaises(TemporarySourceError):
+            make_snapshot_job(SnapshotSource(["a", "b"], fail_after=1), target, state).run()
+
+        self.assertEqual(target.deleted_batches, [])
+        self.assertEqual(len(state.bindings), 3)
+
+    def test_empty_snapshot_deletes_nothing(self):
+        target = DeletingTarget()
+        state = bound_store(["a"])
+
+        result = make_snapshot_job(SnapshotSource([]), target, state).run()
+
+        self.assertEqual((target.deleted_batches, result.deleted), ([], 0))
+
+    def test_target_subclass_without_delete_many_deletes_one_by_one(self):
+        target = SingleDeleteTarget()
+        state = bound_store(["a", "b", "c"])
+
+        result = make_snapshot_job(SnapshotSource(["a"]), target, state).run()
+
+        self.assertEqual(target.deleted, ["b", "c"])
+        self.assertEqual(sorted(k.key for k in state.bindings), ["a"])
+        self.assertEqual(result.deleted, 2)
+
+    def test_state_store_subclass_without_unbind_rejected(self):
+        class NoUnbindStateStore(StateStore):
+            def iter_bindings(self, system):
+                return []
+
+        with self.assertRaises(ValueError):
+            make_snapshot_job(SnapshotSource([]), DeletingTarget(), NoUnbindStateStore())
+
+    def test_incremental_source_rejected(self):
+        source = SnapshotSource([])
+        source.checkpoint_type = "datetime"
+
+        with self.assertRaises(ValueError):
+            make_snapshot_job(source, DeletingTarget(), MemoryStateStore())
+
+    def test_sharded_snapshot_deletes_only_own_shard(self):
+        keys = [str(i) for i in range(20)]
+        target = SingleDeleteTarget()
+        state = bound_store(keys + ["gone"])
+        source = SnapshotSource(keys)
+
+        deleted = sum(
+            make_snapshot_job(ShardedSource(source, shard, 2), target, state).run().deleted for shard in range(2))
+
+        self.assertEqual((target.deleted, deleted), (["gone"], 1))  # чужие ключи шард не трогает
+        self.assertEqual(sorted(k.key for k in state.bindings), sorted(keys))
+
+    def test_sharded_source_with_fetch_shard_rejected(self):
+        source = SnapshotSource([])
+        source.fetch_shard = lambda since_token, shard, shards: ([], None)
+
+        with self.assertRaises(ValueError):
+            make_snapshot_job(ShardedSource(source, 0, 2), DeletingTarget(), MemoryStateStore())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+import unittest
+
+from sync_utils.sync_core.errors import PermanentTargetError
+from sync_utils.sync_core.instrumentation import SlowItemProfiler, SyncInstrumentation
+from sync_utils.sync_core.tests.fakes import ListSource, MemoryStateStore, make_job
+
+
+class SlowTarget:
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        if projection.data == "bad":
+            raise PermanentTargetError("rejected")
+        if projection.data == "slow":
+            time.sleep(0.02)
+        return f"internal-{key.key}"
+
+
+class SyncJobInstrumentationTest(unittest.TestCase):
+    def test_stage_timings(self):
+        instrumentation = SyncInstrumentation()
+        state = MemoryStateStore()
+        job = make_job(ListSource(["a", "bad", "c"], checkpoint="end"), SlowTarget(), state,
+                       instrumentation=instrumentation)
+
+        result = job.run()
+        stats = instrumentation.snapshot()
+
+        self.assertEqual((result.created, result.failed), (2, 1))
+        self.assertEqual(stats["fetch"].count, 5)  # вызов fetch + 3 элемента + конец итератора
+        self.assertEqual(stats["map"].count, 3)
+        self.assertEqual((stats["target.upsert"].count, stats["target.upsert"].errors), (3, 1))
+        self.assertEqual(stats["state.write"].count, 5)  # 2 bind + 3 save_item_state
+        self.assertEqual(stats["checkpoint"].count, 1)
+        self.assertEqual(state.checkpoints, {"s": "end"})
+        self.assertIn("target.upsert", instrumentation.report())
+        self.assertFalse(hasattr(job.state, "flush"))  # необязательные методы не появляются
+
+    def test_slowest_items_profiled(self):
+        profiler = SlowItemProfiler(top_n=1)
+        job = make_job(ListSource(["a", "slow", "c"]), SlowTarget(), MemoryStateStore(),
+                       instrumentation=SyncInstrumentation(profiler=profiler))
+
+        job.run()
+
+        slowest = profiler.slowest()
+        self.assertEqual([item.key.key for item in slowest], ["slow"])
+        self.assertGreaterEqual(slowest[0].seconds, 0.02)
+        self.assertIn("upsert", profiler.report())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import unittest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from sync_utils.sync_core.dto import Lease, Payload
+from sync_utils.sync_core.errors import LeaseBusyError, LeaseLostError
+from sync_utils.sync_core.interfaces import StateStore
+from sync_utils.sync_core.tests.fakes import MemoryStateStore, MemoryTarget, key, make_job
+
+
+class IdSource:
+    checkpoint_type = "monotonic_id"
+
+    def __init__(self, total, on_item=None):
+        self.total = total
+        self.on_item = on_item
+        self.fetched = False
+
+    def fetch(self, since_token):
+        self.fetched = True
+        return self._items(), str(self.total)
+
+    def _items(self):
+        for i in range(1, self.total + 1):
+            if self.on_item is not None:
+                self.on_item(i)
+            yield key(i), Payload(data=i, version="1")
+
+    def validate(self, key, payload):
+        return None
+
+
+class LeasingStateStore(MemoryStateStore):
+    """Аренда в памяти с ручными часами — та же семантика, что у BaseStateStore с lease_model."""
+
+    def __init__(self):
+        super().__init__()
+        self.now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.leases: dict[str, Lease] = {}
+        self.tokens: dict[str, int] = {}
+        self.released: list[Lease] = []
+
+    def _held(self, lease):
+        current = self.leases.get(lease.stream)
+        return current is not None and current.token == lease.token and current.expires_at > self.now
+
+    def acquire_lease(self, stream, owner, ttl):
+        current = self.leases.get(stream)
+        if current is not None and current.expires_at > self.now:
+            return None
+        self.tokens[stream] = self.tokens.get(stream, 0) + 1
+        lease = Lease(stream=stream, owner=owner, token=self.tokens[stream], expires_at=self.now + timedelta(seconds=ttl))
+        self.leases[stream] = lease
+        return lease
+
+    def heartbeat_lease(self, lease, ttl):
+        if not self._held(lease):
+            raise LeaseLostError(lease.stream)
+        lease = replace(lease, expires_at=self.now + timedelta(seconds=ttl))
+        self.leases[lease.stream] = lease
+        return lease
+
+    def release_lease(self, lease):
+        self.released.append(lease)
+        if self.leases.get(lease.stream, lease).token == lease.token:
+            self.leases.pop(lease.stream, None)
+
+    def save_checkpoint(self, stream, token, *, lease=None):
+        if lease is not None and not self._held(lease):
+            raise LeaseLostError(stream)
+        super().save_checkpoint(stream, token)
+
+
+def leased_job(source, state, target=None, **kwargs):
+    return make_job(source, target or MemoryTarget(), state, stream="deals", lease_ttl=60, **kwargs)
+
+
+class SyncJobLeaseTest(unittest.TestCase):
+    def test_run_holds_lease_for_checkpoint_and_releases_it(self):
+        state = LeasingStateStore()
+        job = leased_job(IdSource(5), state, lease_owner="worker-1")
+
+        result = job.run()
+
+        self.assertEqual(result.created, 5)
+        self.assertEqual(state.checkpoints["deals"], "5")
+        self.assertEqual([(lease.owner, lease.token) for lease in state.released], [("worker-1", 1)])
+        self.assertNotIn("deals", state.leases)
+        leased_job(IdSource(1), state).run()  # поток снова свободен
+        self.assertEqual(state.released[-1].token, 2)
+
+    def test_second_worker_does_not_start_while_lease_is_held(self):
+        state = LeasingStateStore()
+        state.acquire_lease("deals", "worker-1", 60)
+        source = IdSource(5)
+
+        with self.assertRaises(LeaseBusyError):
+            leased_job(source, state).run()
+
+        self.assertFalse(source.fetched)
+        self.assertEqual(state.leases["deals"].owner, "worker-1")
+
+    def test_checkpoint_is_not_written_after_lease_was_taken_over(self):
+        state = LeasingStateStore()
+
+        def take_over(i):
+            if i == 3:  # воркер «завис» дольше TTL, поток перехватили
+                state.now += timedelta(seconds=120)
+                state.acquire_lease("deals", "worker-2", 60)
+
+        job = leased_job(IdSource(5, on_item=take_over), state, lease_owner="worker-1", checkpoint_save_every=1)
+
+        with self.assertRaises(LeaseLostError):
+            job.run()
+
+        self.assertNotIn("deals", state.checkpoints)
+        self.assertEqual(state.leases["deals"].owner, "worker-2")  # release чужую аренду не снимает
+
+    def test_chunk_is_not_written_when_heartbeat_finds_lease_lost(self):
+        state = LeasingStateStore()
+        target = MemoryTarget()
+
+        def take_over(i):
+            if i == 3:
+                state.now += timedelta(seconds=120)
+                state.acquire_lease("deals", "worker-2", 60)
+                job._lease_renew_at = 0  # heartbeat на границе пачки
+
+        job = leased_job(IdSource(10, on_item=take_over), state, target, fetch_chunk_size=5)
+
+        with self.assertRaises(LeaseLostError):
+            job.run()
+
+        self.assertEqual(target.upserted, [])
+
+    def test_lease_requires_store_support(self):
+        class PlainStore:
+            def get_checkpoint(self, stream):
+                return None
+
+        class SubclassStore(StateStore):
+            def acquire_lease(self, stream, owner, ttl):
+                return None
+
+        with self.assertRaises(ValueError):
+            leased_job(IdSource(1), PlainStore())
+        with self.assertRaises(ValueError):  # heartbeat_lease/release_lease нет — не «поток занят»
+            leased_job(IdSource(1), SubclassStore())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+
+from sync_utils.api_client.dto.transport_stats import TransportStats
+from sync_utils.metrics import ApiClientCollector, Registry, SyncMetrics, generate_text, write_textfile
+from sync_utils.sync_core.tests.fakes import ListSource, MemoryStateStore, MemoryTarget, make_job
+
+
+class UpdatedAtSource(ListSource):
+    checkpoint_type = "updated_at"
+
+    def __init__(self):
+        super().__init__(["a", "bad", "c"], checkpoint="2024-01-01T00:00:00+00:00")
+
+
+class SyncJobMetricsTest(unittest.TestCase):
+    def test_run_exports_counters_histogram_and_checkpoint_lag(self):
+        registry = Registry()
+        metrics = SyncMetrics(registry, clock=lambda: 1704067260.0)  # через минуту после чекпоинта
+        job = make_job(UpdatedAtSource(), MemoryTarget(perm_fail=["bad"]), MemoryStateStore(), stream="deals",
+                       metrics=metrics)
+
+        job.run()
+        text = generate_text(registry)
+
+        self.assertIn('sync_items_total{stream="deals",outcome="created"} 2.0', text)
+        self.assertIn('sync_items_total{stream="deals",outcome="failed"} 1.0', text)
+        self.assertIn('sync_item_duration_seconds_count{stream="deals"} 3', text)
+        self.assertIn('sync_checkpoint_lag_seconds{stream="deals"} 60.0', text)
+        self.assertIn("# TYPE sync_items_total counter", text)
+        self.assertIn('sync_last_success_timestamp_seconds{stream="deals"}', text)
+
+    def test_api_client_collector_and_openmetrics_textfile(self):
+        registry = Registry()
+        stats = TransportStats()
+        stats.record(200, 0.03, method="get", path="/v1/deals/15")
+        stats.record(200, 0.3, method="get", path="/v1/deals/16")
+        collector = ApiClientCollector(buckets=(0.1, 1.0), registry=registry)
+        collector.add_stats("crm", stats)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sync.prom")
+            write_textfile(path, registry, openmetrics=True)
+            with open(path, encoding="utf-8") as fh:
+                text = fh.read()
+
+        labels = 'client="crm",method="GET",path="/v1/deals/{id}",status="200"'
+        self.assertIn(f"api_client_requests_total{{{labels}}} 2.0", text)
+        self.assertIn(f'api_client_request_duration_seconds_bucket{{{labels},le="0.1"}} 1.0', text)
+        self.assertIn(f'api_client_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2.0', text)
+        self.assertIn("# TYPE api_client_requests counter", text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
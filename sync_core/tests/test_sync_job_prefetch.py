@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import unittest
+
+from sync_utils.sync_core.dto import Binding, ExternalKey, SyncItemState, SyncItemStatus
+from sync_utils.sync_core.interfaces import StateStore
+from sync_utils.sync_core.tests.fakes import ListSource, MemoryTarget, key, make_job
+
+
+class PointStateStore:
+    """Хранилище без bulk-методов: SyncJob должен откатиться на поштучные запросы."""
+
+    def __init__(self):
+        self.bindings: dict[ExternalKey, Binding] = {}
+        self.item_states: dict[ExternalKey, SyncItemState] = {}
+        self.point_reads = 0
+
+    def get_checkpoint(self, stream):
+        return None
+
+    def save_checkpoint(self, stream, token):
+        return None
+
+    def bind(self, key, internal_id, version):
+        self.bindings[key] = Binding(internal_id=internal_id, version=version)
+
+    def get_binding(self, key):
+        self.point_reads += 1
+        return self.bindings.get(key)
+
+    def iter_bindings(self, system):
+        return []
+
+    def validate_binding(self, key, binding):
+        return None
+
+    def get_item_state(self, key):
+        self.point_reads += 1
+        return self.item_states.get(key)
+
+    def save_item_state(self, state):
+        self.item_states[state.key] = state
+
+
+class SubclassStateStore(PointStateStore, StateStore):
+    """Явный наследник StateStore без bulk-методов и flush — как DjangoStateStore в sync_core/test.py."""
+
+
+class BulkStateStore(PointStateStore):
+    def __init__(self):
+        super().__init__()
+        self.bulk_calls: list[int] = []
+
+    def get_bindings_bulk(self, keys):
+        keys = list(keys)
+        self.bulk_calls.append(len(keys))
+        return {key: self.bindings[key] for key in keys if key in self.bindings}
+
+    def get_item_states_bulk(self, keys):
+        keys = list(keys)
+        return {key: self.item_states[key] for key in keys if key in self.item_states}
+
+
+class SyncJobPrefetchTest(unittest.TestCase):
+    def test_bulk_lookup_once_per_chunk(self):
+        state = BulkStateStore()
+        job = make_job(ListSource(range(5)), MemoryTarget(), state, fetch_chunk_size=2)
+
+        result = job.run()
+
+        self.assertEqual(state.bulk_calls, [2, 2, 1])
+        self.assertEqual(state.point_reads, 0)
+        self.assertEqual(result.created, 5)
+
+    def test_point_fallback_without_bulk_methods(self):
+        state = PointStateStore()
+        job = make_job(ListSource(["1", "2"]), MemoryTarget(), state)
+
+        result = job.run()
+
+        self.assertEqual(state.point_reads, 4)
+        self.assertEqual(result.created, 2)
+
+    def test_state_store_subclass_without_bulk_methods(self):
+        state = SubclassStateStore()
+
+        result = make_job(ListSource(["1", "2"]), MemoryTarget(), state).run()
+
+        self.assertEqual(state.point_reads, 4)
+        self.assertEqual(result.created, 2)
+
+    def test_duplicate_key_in_chunk_sees_fresh_binding(self):
+        state = BulkStateStore()
+        target = MemoryTarget()
+        job = make_job(ListSource(["1", "1"]), target, state)
+
+        result = job.run()
+
+        self.assertEqual(len(target.upserted), 1)
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(state.item_states[key("1")].status, SyncItemStatus.SUCCESS)
+
+
+if __name__ == "__main__":
+    unittest.main()
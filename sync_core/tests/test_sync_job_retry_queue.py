@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import unittest
+
+from sync_utils.metrics import Registry, SyncMetrics, generate_text
+from sync_utils.sync_core.dto import ExternalKey, Payload, RetryEntry
+from sync_utils.sync_core.instrumentation import STAGE_RETRY_FETCH, SyncInstrumentation
+from sync_utils.sync_core.interfaces import StateStore
+from sync_utils.sync_core.tests.fakes import MemoryStateStore, MemoryTarget, key, make_job
+
+
+class IdSource:
+    checkpoint_type = "monotonic_id"
+
+    def __init__(self, total):
+        self.total = total
+        self.fetched_by_keys: list[list[str]] = []
+
+    def fetch(self, since_token):
+        since = int(since_token or 0)
+        return [(key(i), Payload(data=i, version="1")) for i in range(since + 1, self.total + 1)], str(self.total)
+
+    def fetch_by_keys(self, keys):
+        self.fetched_by_keys.append([k.key for k in keys])
+        return [(k, Payload(data=int(k.key), version="1")) for k in keys if int(k.key) <= self.total]
+
+    def validate(self, key, payload):
+        return None
+
+
+class RetryStateStore(MemoryStateStore):
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+        self.retries: dict[tuple[str, ExternalKey], tuple[int, float]] = {}
+
+    def schedule_retry(self, stream, key, attempts, delay):
+        self.retries[(stream, key)] = (attempts, self.now + delay)
+
+    def due_retries(self, stream, limit):
+        due = [(at, k.key, k, attempts) for (s, k), (attempts, at) in self.retries.items() if s == stream and at <= self.now]
+        return [RetryEntry(key=k, attempts=attempts, next_attempt_at=at) for at, _, k, attempts in sorted(due)[:limit]]
+
+    def drop_retries(self, stream, keys):
+        for k in keys:
+            self.retries.pop((stream, k), None)
+
+
+class SyncJobRetryQueueTest(unittest.TestCase):
+    def make_job(self, source, target, state, **kwargs):
+        options = dict(retry_queue=True, retry_backoff=10, retry_backoff_max=15, max_attempts=3)
+        options.update(kwargs)
+        return make_job(source, target, state, stream="deals", **options)
+
+    def test_temp_error_is_queued_and_checkpoint_keeps_moving(self):
+        state, source = RetryStateStore(), IdSource(5)
+        job = self.make_job(source, MemoryTarget(temp_fail={"3"}), state)
+
+        result = job.run()
+
+        self.assertEqual((result.created, result.failed), (4, 1))
+        self.assertEqual(state.checkpoints["deals"], "5")
+        self.assertEqual(state.retries, {("deals", key(3)): (1, 10)})
+        self.assertEqual(job.run_retries().created, 0)  # время попытки ещё не пришло
+        self.assertEqual(source.fetched_by_keys, [])
+
+    def test_retry_pass_refetches_only_due_keys_and_drops_recovered(self):
+        state, source, target = RetryStateStore(), IdSource(5), MemoryTarget(temp_fail={"2", "4"})
+        job = self.make_job(source, target, state)
+        job.run()
+
+        state.now = 10
+        target.temp_fail = {"4"}
+        result = job.run_retries()
+
+        self.assertEqual(sorted(source.fetched_by_keys[0]), ["2", "4"])
+        self.assertEqual((result.created, result.failed), (1, 1))
+        self.assertEqual(state.retries, {("deals", key(4)): (2, 25)})  # задержка 2 * 10, не больше 15
+        self.assertEqual(state.checkpoints["deals"], "5")
+
+    def test_key_leaves_queue_after_max_attempts_or_when_gone_from_source(self):
+        state, source, target = RetryStateStore(), IdSource(5), MemoryTarget(temp_fail={"4", "5"})
+        job = self.make_job(source, target, state)
+        job.run()
+
+        source.total = 4  # ключ 5 удалили в источнике
+        state.now = 100
+        job.run_retries()
+        self.assertEqual(list(state.retries), [("deals", key(4))])
+
+        state.now = 200
+        result = job.run_retries()  # третья попытка из трёх — больше не ретраим
+
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(state.retries, {})
+
+    def test_main_run_keeps_attempts_of_already_queued_key(self):
+        state, source, target = RetryStateStore(), IdSource(5), MemoryTarget(temp_fail={"3"})
+        job = self.make_job(source, target, state, retry_backoff_max=1000, max_attempts=5)
+        job.run()
+        state.now = 10
+        job.run_retries()
+        self.assertEqual(state.retries[("deals", key(3))], (2, 30))
+
+        state.checkpoints.clear()  # источник снова отдаёт ключ 3 в основном проходе
+        job.run()
+
+        self.assertEqual(state.retries[("deals", key(3))], (3, 50))  # не сброс на первую попытку
+
+    def test_retry_pass_reports_metrics_and_stage_timings(self):
+        registry, instrumentation = Registry(), SyncInstrumentation()
+        state, source = RetryStateStore(), IdSource(3)
+        job = self.make_job(source, MemoryTarget(temp_fail={"2"}), state,
+                            metrics=SyncMetrics(registry, clock=lambda: 1000.0), instrumentation=instrumentation)
+        job.run()
+        state.now = 10
+
+        job.run_retries()
+        text = generate_text(registry)
+
+        self.assertIn('sync_retries_due{stream="deals"} 1.0', text)
+        self.assertIn('sync_last_retries_success_timestamp_seconds{stream="deals"} 1000.0', text)
+        self.assertIn('sync_items_total{stream="deals",outcome="failed"} 2.0', text)
+        self.assertEqual(instrumentation.snapshot()[STAGE_RETRY_FETCH].count, 3)  # вызов, элемент и конец выдачи
+
+    def test_retry_queue_requires_fetch_by_keys(self):
+        class PlainSource(IdSource):
+            fetch_by_keys = None
+
+        with self.assertRaises(ValueError):
+            self.make_job(PlainSource(1), MemoryTarget(), RetryStateStore())
+
+    def test_retry_queue_requires_real_store_methods(self):
+        class SubclassStore(StateStore):
+            def schedule_retry(self, stream, key, attempts, delay):
+                return None
+
+        with self.assertRaises(ValueError):  # due_retries/drop_retries нет — ключи потерялись бы молча
+            self.make_job(IdSource(1), MemoryTarget(), SubclassStore())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+import unittest
+
+from sync_utils.sync_core.dto import Payload, SyncItemStatus
+from sync_utils.sync_core.errors import PermanentError, TemporaryError
+from sync_utils.sync_core.tests.fakes import EchoMapper, MemoryStateStore, key, make_job
+
+
+class DummySource:
+    """Отдаёт ключи по списку (ключи могут повторяться), чекпоинт — номер выданного элемента."""
+
+    def __init__(self, keys: list[str]):
+        self.keys = keys
+        self.pulled = 0
+
+    def fetch(self, since_token):
+        def _iter():
+            for i, k in enumerate(self.keys, start=1):
+                self.pulled = i
+                yield key(k), Payload(data=i, version=str(i))
+
+        return _iter(), lambda: str(self.pulled)
+
+    def validate(self, key, payload):
+        return None
+
+
+class SlowTarget:
+    def __init__(self, temp_fail: set[int] = frozenset(), perm_fail: set[int] = frozenset()):
+        self.temp_fail = temp_fail
+        self.perm_fail = perm_fail
+        self.lock = threading.Lock()
+        self.seen: dict[str, list[int]] = {}
+        self.finished: set[int] = set()
+
+    def validate(self, key, projection):
+        return None
+
+    def upsert(self, key, projection, binding=None):
+        time.sleep(random.random() / 1000)
+        with self.lock:
+            self.seen.setdefault(key.key, []).append(projection.data)
+            self.finished.add(projection.data)
+        if projection.data in self.temp_fail:
+            raise TemporaryError("temp")
+        if projection.data in self.perm_fail:
+            raise PermanentError("perm")
+        return f"internal-{key.key}"
+
+
+class CheckpointAuditStore(MemoryStateStore):
+    """Проверяет, что на момент записи чекпоинта все элементы до него уже обработаны."""
+
+    def __init__(self, target: SlowTarget):
+        super().__init__()
+        self.target = target
+        self.saved_checkpoints: list[str] = []
+        self.violations: list[str] = []
+
+    def save_checkpoint(self, stream, token):
+        with self.target.lock:
+            if any(i not in self.target.finished for i in range(1, int(token) + 1)):
+                self.violations.append(token)
+        self.saved_checkpoints.append(token)
+
+
+class SyncJobWorkersTest(unittest.TestCase):
+    def test_counters_and_per_key_order(self):
+        keys = [str(i % 37) for i in range(400)]
+        target = SlowTarget(perm_fail={5, 77})
+        state = CheckpointAuditStore(target)
+        job = make_job(DummySource(keys), target, state, workers=4, fetch_chunk_size=50, checkpoint_save_every=25)
+
+        result = job.run()
+
+        self.assertEqual(result.created, 37)
+        self.assertEqual(result.updated, 400 - 37 - 2)
+        self.assertEqual(result.failed, 2)
+        for seen in target.seen.values():
+            self.assertEqual(seen, sorted(seen))
+        self.assertEqual(state.violations, [])
+        self.assertEqual(state.saved_checkpoints[-1], "400")
+
+    def test_retryable_error_holds_low_watermark(self):
+        keys = [str(i) for i in range(100)]
+        target = SlowTarget(temp_fail={60})
+        state = CheckpointAuditStore(target)
+        job = make_job(DummySource(keys), target, state, workers=3, fetch_chunk_size=20, checkpoint_save_every=10)
+
+        result = job.run()
+
+        self.assertEqual(result.failed, 1)
+        self.assertEqual(state.violations, [])
+        self.assertEqual(state.saved_checkpoints[-1], "50")
+        self.assertEqual(state.item_states[key("59")].status, SyncItemStatus.TEMP_ERROR)
+
+    def test_unexpected_worker_error_is_raised(self):
+        class BrokenMapper(EchoMapper):
+            def map(self, key, payload):
+                if payload.data == 3:
+                    raise RuntimeError("boom")
+                return super().map(key, payload)
+
+        target = SlowTarget()
+        job = make_job(DummySource([str(i) for i in range(50)]), target, CheckpointAuditStore(target),
+                       mapper=BrokenMapper(), workers=2, fetch_chunk_size=4)
+
+        with self.assertRaises(RuntimeError):
+            job.run()
+
+
+if __name__ == "__main__":
+    unittest.main()